@@ -1,7 +1,8 @@
 import json
 
-from analyzer import RelationshipAnalyzer
-from explorer import get_adapter
+from analyzer import (InclusionDependencyFinder, IndexAnalyzer, RelationshipAnalyzer, RelationshipGraph,
+                      RelationshipValidator)
+from explorer import ConnectionPool, Instrumentation, QueryScheduler, RowCounter, get_adapter
 from writer import OutputWriter
 
 
@@ -13,33 +14,97 @@ def main():
     output_config = config['output']
     options = config.get('options', {})
     ignored_tables = set(options.get('ignored_tables', []))
+    instrumentation = None
+    if options.get('instrumentation'):
+        instrumentation = Instrumentation.from_config(options['instrumentation'])
 
     adapter = get_adapter(db_config['type'], db_config)
+    if instrumentation is not None:
+        instrumentation.attach(adapter)
+    QueryScheduler.from_config(options).attach(adapter)
     adapter.connect()
 
-    analyzer = RelationshipAnalyzer(adapter, ignored_tables)
+    pool = ConnectionPool(adapter, options.get('workers', 1))
+    row_counter = RowCounter.from_config(adapter, options['row_counts']) if options.get('row_counts') else None
+    analyzer = RelationshipAnalyzer(adapter, ignored_tables, pool, row_counter=row_counter,
+                                    inference=options.get('inference'))
     schemas = adapter.get_schemas()
+    name_index = analyzer.get_name_index()
 
-    all_relationships = {}
-    all_inferred = {}
-    all_stats = {}
+    foreign_keys = pool.map(lambda conn, schema: RelationshipAnalyzer(conn, ignored_tables).get_foreign_keys(schema),
+                            schemas)
+    inferred = pool.map(lambda conn, schema: RelationshipAnalyzer(conn, ignored_tables, name_index=name_index)
+                        .infer_relationships(schema), schemas)
 
-    for schema in schemas:
-        foreign_keys = analyzer.get_foreign_keys(schema)
-        all_relationships[schema] = foreign_keys
+    all_relationships = dict(zip(schemas, foreign_keys))
+    all_inferred = dict(zip(schemas, inferred))
+    stats_options = options.get('stats', {})
+    all_stats = {schema: analyzer.get_table_stats(schema, stats_options.get('top_n'), stats_options.get('min_rows'))
+                 for schema in schemas}
 
-        inferred = analyzer.infer_relationships(schema)
-        all_inferred[schema] = inferred
+    all_index_health = None
+    if options.get('index_health'):
+        index_health = pool.map(lambda conn, schema: IndexAnalyzer(conn, ignored_tables)
+                                .analyze(schema, all_relationships[schema]), schemas)
+        all_index_health = dict(zip(schemas, index_health))
 
-        stats = analyzer.get_table_stats(schema)
-        all_stats[schema] = stats
+    validation = options.get('validation')
+    if validation:
+        validator = RelationshipValidator(
+            adapter,
+            pool,
+            sample_rows=validation.get('sample_rows', 1000),
+            time_budget=validation.get('time_budget_seconds', 60),
+            query_timeout=validation.get('query_timeout_seconds', 5),
+        )
+        all_inferred = {schema: validator.validate(schema, inferred) for schema, inferred in all_inferred.items()}
 
-    writer = OutputWriter(output_config.get('format', 'json'))
-    writer.write(all_relationships, output_config.get('relationships_file', 'db_relationships'))
-    writer.write(all_inferred, f"{output_config.get('relationships_file', 'db_relationships')}_inferred")
-    writer.write(all_stats, output_config.get('stats_file', 'db_stats'))
+    discovery = options.get('inclusion_discovery')
+    all_discovered = None
+    all_skipped = None
+    if discovery:
+        finder = InclusionDependencyFinder(
+            adapter,
+            pool,
+            sample_rows=discovery.get('sample_rows', 2000),
+            sketch_size=discovery.get('sketch_size', 64),
+            min_containment=discovery.get('min_containment', 0.95),
+            max_candidates=discovery.get('max_candidates', 3),
+            query_timeout=discovery.get('query_timeout_seconds', 30),
+            scan_rows=discovery.get('scan_rows', 1000000),
+        )
+        all_discovered = {schema: analyzer.discover_relationships(schema, finder) for schema in schemas}
+        all_skipped = finder.skipped
 
+    writer = OutputWriter(
+        output_config.get('format', 'json'),
+        output_config.get('human_readable_sizes', True),
+        output_config.get('store_file', 'db_catalog'),
+    )
+    relationships_file = output_config.get('relationships_file', 'db_relationships')
+    writer.write(all_relationships, relationships_file, 'declared')
+    writer.write(all_inferred, f"{relationships_file}_inferred", 'inferred')
+    writer.write_stats(all_stats, output_config.get('stats_file', 'db_stats'))
+    if all_discovered is not None:
+        writer.write(all_discovered, f"{relationships_file}_discovered", 'discovered')
+    if all_skipped:
+        writer.write(all_skipped, f"{relationships_file}_discovered_skipped", 'discovered_skipped')
+    if options.get('relationship_graph'):
+        graph = RelationshipGraph.from_relationships(
+            declared=all_relationships,
+            inferred=all_inferred,
+            discovered=all_discovered,
+        )
+        writer.write(graph.to_dict(), f"{relationships_file}_graph", 'graph')
+    if all_index_health is not None:
+        writer.write_index_health(all_index_health, output_config.get('index_health_file', 'db_index_health'))
+
+    if row_counter is not None:
+        row_counter.close()
+    pool.close()
     adapter.close()
+    if instrumentation is not None:
+        instrumentation.save()
 
 
 if __name__ == "__main__":
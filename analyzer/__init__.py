@@ -1 +1,8 @@
-from .relationship_analyzer import RelationshipAnalyzer
\ No newline at end of file
+from .relationship_analyzer import RelationshipAnalyzer
+from .relationship_validator import RelationshipValidator
+from .inclusion_dependency import InclusionDependencyFinder
+from .column_profiler import ColumnProfiler
+from .schema_diff import FileCatalogSource, LiveCatalogSource, SchemaDiff
+from .relationship_graph import RelationshipGraph
+from .name_index import NameIndex
+from .index_analyzer import IndexAnalyzer
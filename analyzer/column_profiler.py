@@ -0,0 +1,111 @@
+import time
+
+from explorer import ConnectionPool
+
+ORDERED_TYPES = {
+    'smallint', 'integer', 'int', 'bigint', 'tinyint', 'mediumint', 'decimal', 'numeric', 'real', 'float', 'double',
+    'double precision', 'money', 'smallmoney', 'date', 'time', 'datetime', 'datetime2', 'smalldatetime',
+    'datetimeoffset', 'timestamp', 'timestamp without time zone', 'timestamp with time zone',
+    'time without time zone', 'time with time zone', 'interval', 'year', 'char', 'character', 'varchar',
+    'character varying', 'nchar', 'nvarchar', 'text',
+}
+UNCOMPARABLE_TYPES = {
+    'json', 'xml', 'point', 'line', 'lseg', 'box', 'path', 'polygon', 'circle', 'ntext', 'image', 'geometry',
+    'geography', 'sql_variant',
+}
+
+
+class ColumnProfiler:
+    def __init__(self, adapter, pool=None, sample_rows=10000, time_budget=60, query_timeout=10, most_common=5):
+        self.adapter = adapter
+        self.pool = pool or ConnectionPool(adapter)
+        self.sample_rows = sample_rows
+        self.query_timeout = query_timeout
+        self.most_common = most_common
+        self.deadline = time.monotonic() + time_budget
+
+    def profile(self, schema, tables):
+        try:
+            statistics = self.adapter.get_column_statistics(schema)
+        except Exception:
+            self.adapter._reset()
+            statistics = {}
+
+        profiles = {}
+        pending = []
+        for table_name, table_data in tables.items():
+            table_statistics = statistics.get(table_name, {})
+            profiles[table_name] = {}
+            missing = []
+            for column in table_data['columns']:
+                if column[0] in table_statistics:
+                    profile = dict(table_statistics[column[0]], source='statistics')
+                    profile['most_common_values'] = profile['most_common_values'][:self.most_common]
+                else:
+                    profile = self._empty_profile()
+                    missing.append(column)
+                profiles[table_name][column[0]] = profile
+            if missing and table_data['type'] == 'BASE TABLE':
+                pending.append((table_name, table_data['row_count'], missing))
+
+        results = self.pool.map(lambda adapter, task: self._sample(adapter, schema, *task), pending)
+        for (table_name, _, _), sampled in zip(pending, results):
+            profiles[table_name].update(sampled)
+        return profiles
+
+    def _sample(self, adapter, schema, table_name, row_estimate, columns):
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            return {}
+
+        specs = [(column[0], self._distinct(column[1]), self._ordered(column[1])) for column in columns]
+        try:
+            row = adapter.get_profile_sample(schema, table_name, specs, self.sample_rows, row_estimate=row_estimate,
+                                             timeout=min(self.query_timeout, remaining))
+        except Exception:
+            adapter._reset()
+            if len(columns) == 1:
+                return {}
+            adapter._note_retry('get_profile_sample', len(columns))
+            sampled = {}
+            for column in columns:
+                sampled.update(self._sample(adapter, schema, table_name, row_estimate, [column]))
+            return sampled
+
+        total = row[0]
+        sampled = {}
+        for position, column in enumerate(columns):
+            non_null, distinct, lowest, highest, width = row[1 + position * 5:6 + position * 5]
+            if distinct is not None and row_estimate and row_estimate > total and non_null \
+                    and distinct >= non_null * 0.95:
+                distinct = int(round(distinct * row_estimate / total))
+            sampled[column[0]] = {
+                'null_fraction': round((total - non_null) / total, 4) if total else None,
+                'distinct_estimate': distinct,
+                'min': lowest,
+                'max': highest,
+                'most_common_values': None,
+                'average_width': round(float(width), 2) if width is not None else None,
+                'source': 'sample',
+            }
+        return sampled
+
+    @staticmethod
+    def _distinct(data_type):
+        return (data_type or '').lower() not in UNCOMPARABLE_TYPES
+
+    @staticmethod
+    def _ordered(data_type):
+        return (data_type or '').lower() in ORDERED_TYPES
+
+    @staticmethod
+    def _empty_profile():
+        return {
+            'null_fraction': None,
+            'distinct_estimate': None,
+            'min': None,
+            'max': None,
+            'most_common_values': None,
+            'average_width': None,
+            'source': None,
+        }
@@ -0,0 +1,65 @@
+import heapq
+
+HASH_SPACE = 2 ** 32
+
+INTEGER_TYPES = {'smallint', 'integer', 'int', 'bigint', 'tinyint', 'mediumint', 'serial', 'bigserial'}
+UUID_TYPES = {'uuid', 'uniqueidentifier'}
+STRING_TYPES = {'char', 'character', 'varchar', 'character varying', 'nchar', 'nvarchar'}
+
+
+def key_family(data_type, max_length):
+    data_type = (data_type or '').lower()
+    if data_type in INTEGER_TYPES:
+        return 'integer'
+    if data_type in UUID_TYPES:
+        return 'uuid'
+    if data_type in STRING_TYPES and max_length is not None and 0 < max_length <= 64:
+        return 'string'
+    return None
+
+
+class ColumnSketch:
+    def __init__(self, table, column, family, size, threshold, declared_key=False, fraction=1.0):
+        self.table = table
+        self.column = column
+        self.family = family
+        self.size = size
+        self.threshold = threshold
+        self.declared_key = declared_key
+        self.fraction = fraction
+        self.hashes = []
+        self.rows = 0
+        self.distinct = 0
+
+    def update(self, hashes):
+        seen = set()
+        for value_hash in hashes:
+            if value_hash is None or value_hash >= self.threshold:
+                continue
+            self.rows += 1
+            seen.add(value_hash)
+        self.distinct = len(seen)
+        self.hashes = heapq.nsmallest(self.size, seen)
+
+    def update_lowest(self, hashes):
+        self.threshold = HASH_SPACE
+        self.hashes = sorted(hashes)[:self.size]
+        self.rows = 0
+        self.distinct = len(self.hashes)
+
+    @property
+    def tau(self):
+        if len(self.hashes) == self.size:
+            return self.hashes[-1]
+        return self.threshold - 1
+
+    @property
+    def uniqueness(self):
+        return self.distinct / self.rows if self.rows else 0.0
+
+    def estimate_distinct(self):
+        if not self.hashes:
+            return 0
+        if len(self.hashes) < self.size:
+            return round(len(self.hashes) * HASH_SPACE / self.threshold)
+        return round((self.size - 1) * HASH_SPACE / (self.tau + 1))
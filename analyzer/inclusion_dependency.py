@@ -0,0 +1,137 @@
+import math
+from bisect import bisect_right
+from collections import Counter
+
+from analyzer.column_sketch import HASH_SPACE, ColumnSketch, key_family
+from explorer import ConnectionPool
+
+
+class InclusionDependencyFinder:
+    def __init__(self, adapter, pool=None, sample_rows=2000, sketch_size=64, min_containment=0.95, min_overlap=4,
+                 unique_ratio=0.98, max_postings=256, max_candidates=3, query_timeout=30, scan_rows=1000000):
+        self.adapter = adapter
+        self.pool = pool or ConnectionPool(adapter)
+        self.sample_rows = sample_rows
+        self.sketch_size = sketch_size
+        self.min_containment = min_containment
+        self.min_overlap = min_overlap
+        self.unique_ratio = unique_ratio
+        self.max_postings = max_postings
+        self.max_candidates = max_candidates
+        self.query_timeout = query_timeout
+        self.scan_rows = scan_rows if adapter._tablesample_clause(50) is not None else None
+        self.skipped = {}
+
+    def discover(self, schema, tables):
+        return self.find(self.build_sketches(schema, tables))
+
+    def build_sketches(self, schema, tables):
+        tasks = []
+        for table_name, table_data in tables.items():
+            primary_key = [constraint[2] for constraint in table_data['constraints'] if constraint[1] == 'PRIMARY KEY']
+            fraction = self._fraction(table_data['row_count'])
+            sketches = []
+            for column in table_data['columns']:
+                family = key_family(column[1], column[2])
+                if family is None:
+                    continue
+                sketches.append(ColumnSketch(
+                    table_name,
+                    column[0],
+                    family,
+                    self.sketch_size,
+                    self._threshold(table_data['row_count'], fraction),
+                    declared_key=primary_key == [column[0]],
+                    fraction=fraction,
+                ))
+            if sketches:
+                tasks.append(sketches)
+
+        results = self.pool.map(lambda adapter, sketches: self._fill(adapter, schema, sketches), tasks)
+        return [sketch for sketches in results for sketch in sketches]
+
+    def find(self, sketches):
+        referenced = [sketch for sketch in sketches
+                      if sketch.hashes and (sketch.declared_key or sketch.uniqueness >= self.unique_ratio)]
+        postings = {}
+        for ref_id, sketch in enumerate(referenced):
+            for value_hash in sketch.hashes:
+                postings.setdefault(value_hash, []).append(ref_id)
+
+        dependencies = []
+        for sketch in sketches:
+            if not sketch.hashes or sketch.declared_key:
+                continue
+
+            usable = [value_hash for value_hash in sketch.hashes
+                      if len(postings.get(value_hash, ())) <= self.max_postings]
+            hits = Counter()
+            for value_hash in usable:
+                hits.update(postings.get(value_hash, ()))
+
+            candidates = []
+            for ref_id, count in hits.items():
+                ref = referenced[ref_id]
+                if ref is sketch or ref.family != sketch.family:
+                    continue
+                considered = bisect_right(usable, ref.tau)
+                if count < min(self.min_overlap, max(1, int(considered * ref.fraction))):
+                    continue
+                containment = min(1.0, count / (considered * ref.fraction))
+                if containment < self.min_containment:
+                    continue
+                spread = abs(math.log((ref.estimate_distinct() or 1) / (sketch.estimate_distinct() or 1)))
+                candidates.append((-containment, spread, ref.table, ref.column, ref))
+
+            for negative_containment, _, _, _, ref in sorted(candidates)[:self.max_candidates]:
+                dependencies.append({
+                    'from_table': sketch.table,
+                    'from_column': sketch.column,
+                    'to_table': ref.table,
+                    'to_column': ref.column,
+                    'containment': round(-negative_containment, 4),
+                    'method': 'inclusion',
+                })
+
+        dependencies.sort(key=lambda x: (x['from_table'], x['from_column'], -x['containment']))
+        return dependencies
+
+    def _fill(self, adapter, schema, sketches):
+        threshold = sketches[0].threshold
+        percent = sketches[0].fraction * 100
+        try:
+            rows = adapter.get_hash_sample(schema, sketches[0].table, [sketch.column for sketch in sketches],
+                                           threshold, timeout=self.query_timeout, percent=percent)
+        except adapter.query_errors as error:
+            self._skip(adapter, schema, sketches, error)
+            return []
+
+        for position, sketch in enumerate(sketches):
+            sketch.update(row[position * 2 + 1] for row in rows if row[position * 2] is not None)
+            if threshold < HASH_SPACE and len(sketch.hashes) < self.min_overlap:
+                try:
+                    sketch.update_lowest(adapter.get_lowest_hashes(schema, sketch.table, sketch.column,
+                                                                   self.sketch_size, timeout=self.query_timeout,
+                                                                   percent=percent))
+                except adapter.query_errors as error:
+                    self._skip(adapter, schema, [sketch], error)
+        return sketches
+
+    def _skip(self, adapter, schema, sketches, error):
+        adapter._note_failure(error)
+        adapter._reset()
+        self.skipped.setdefault(schema, []).append({
+            'table': sketches[0].table,
+            'columns': [sketch.column for sketch in sketches],
+            'error': f"{type(error).__name__}: {str(error).strip()}",
+        })
+
+    def _fraction(self, row_estimate):
+        if not row_estimate or self.scan_rows is None or row_estimate <= self.scan_rows:
+            return 1.0
+        return self.scan_rows / row_estimate
+
+    def _threshold(self, row_estimate, fraction=1.0):
+        if not row_estimate or row_estimate * fraction <= self.sample_rows:
+            return HASH_SPACE
+        return max(1, int(HASH_SPACE * self.sample_rows / (row_estimate * fraction)))
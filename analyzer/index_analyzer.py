@@ -0,0 +1,107 @@
+ISSUES = ('unindexed_foreign_key', 'duplicate', 'redundant', 'unused')
+PREFIX_METHODS = ('btree',)
+
+
+class IndexAnalyzer:
+    def __init__(self, adapter, ignored_tables=()):
+        self.adapter = adapter
+        self.ignored_tables = set(ignored_tables)
+
+    def analyze(self, schema, foreign_keys=()):
+        indexes = {table_name: table_indexes
+                   for table_name, table_indexes in self.adapter.get_index_details(schema).items()
+                   if table_name not in self.ignored_tables}
+        constraints = self._group_foreign_keys(foreign_keys)
+
+        findings = []
+        supported = {}
+        for (table_name, constraint_name), (columns, foreign_table) in constraints.items():
+            supporting = self._supporting_indexes(indexes.get(table_name, {}), columns)
+            for name in supporting:
+                supported.setdefault((table_name, name), constraint_name)
+            if not supporting:
+                findings.append({
+                    'issue': 'unindexed_foreign_key',
+                    'table': table_name,
+                    'columns': columns,
+                    'constraint_name': constraint_name,
+                    'foreign_table': foreign_table,
+                })
+
+        for table_name, table_indexes in indexes.items():
+            duplicates = self._duplicates(table_indexes)
+            for name, index in table_indexes.items():
+                if name in duplicates:
+                    findings.append(self._finding('duplicate', table_name, name, index, duplicate_of=duplicates[name]))
+                else:
+                    covered_by = self._covering_index(table_indexes, name, index)
+                    if covered_by is not None:
+                        findings.append(self._finding('redundant', table_name, name, index, covered_by=covered_by))
+                if index['scans'] == 0 and not index['unique'] and not index['primary']:
+                    finding = self._finding('unused', table_name, name, index)
+                    if (table_name, name) in supported:
+                        finding['supports_foreign_key'] = supported[(table_name, name)]
+                    findings.append(finding)
+
+        findings.sort(key=lambda finding: (ISSUES.index(finding['issue']), finding['table'],
+                                           finding.get('index') or '', finding.get('constraint_name') or ''))
+        return findings
+
+    @staticmethod
+    def _group_foreign_keys(foreign_keys):
+        constraints = {}
+        for relationship in foreign_keys:
+            key = (relationship['table'], relationship['constraint_name'])
+            columns, _ = constraints.setdefault(key, ([], relationship['foreign_table']))
+            if relationship['column'] not in columns:
+                columns.append(relationship['column'])
+        return constraints
+
+    @staticmethod
+    def _supporting_indexes(table_indexes, columns):
+        return [name for name, index in table_indexes.items()
+                if index['condition'] is None and _prefix_capable(index) and len(index['columns']) >= len(columns)
+                and set(index['columns'][:len(columns)]) == set(columns)]
+
+    @staticmethod
+    def _duplicates(table_indexes):
+        keepers = {}
+        duplicates = {}
+        ranked = sorted(table_indexes.items(),
+                        key=lambda item: (not item[1]['primary'], not item[1]['unique'], item[0]))
+        for name, index in ranked:
+            if None in index['columns']:
+                continue
+            key = ((index['method'] or '').lower(), index['condition'], tuple(index['columns']))
+            if key in keepers:
+                duplicates[name] = keepers[key]
+            else:
+                keepers[key] = name
+        return duplicates
+
+    @staticmethod
+    def _covering_index(table_indexes, name, index):
+        columns = index['columns']
+        if index['unique'] or index['condition'] is not None or None in columns or not _prefix_capable(index):
+            return None
+        covering = [other for other, candidate in table_indexes.items()
+                    if other != name and candidate['condition'] is None and _prefix_capable(candidate)
+                    and len(candidate['columns']) > len(columns) and candidate['columns'][:len(columns)] == columns]
+        if not covering:
+            return None
+        return min(covering, key=lambda other: (len(table_indexes[other]['columns']), other))
+
+    @staticmethod
+    def _finding(issue, table_name, name, index, **related):
+        return dict({
+            'issue': issue,
+            'table': table_name,
+            'index': name,
+            'columns': index['columns'],
+            'size': index['size'],
+            'scans': index['scans'],
+        }, **related)
+
+
+def _prefix_capable(index):
+    return (index['method'] or '').lower() in PREFIX_METHODS
@@ -0,0 +1,145 @@
+import re
+
+from analyzer.column_sketch import INTEGER_TYPES, UUID_TYPES
+
+WORDS = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+
+TABLE_PREFIXES = ('tbl', 'tb', 'tab', 't')
+TABLE_SUFFIXES = ('tbl', 'tab')
+KEY_PREFIXES = ('fk', 'id')
+KEY_SUFFIXES = ('id', 'fk')
+KEY_TYPES = INTEGER_TYPES | UUID_TYPES
+
+IRREGULAR = {
+    'people': 'person', 'children': 'child', 'men': 'man', 'women': 'woman', 'mice': 'mouse', 'geese': 'goose',
+    'feet': 'foot', 'teeth': 'tooth', 'indices': 'index', 'matrices': 'matrix', 'vertices': 'vertex',
+    'criteria': 'criterion', 'phenomena': 'phenomenon', 'analyses': 'analysis', 'theses': 'thesis',
+}
+
+CONFIDENCE_LEVELS = ('high', 'medium', 'low')
+
+
+def split_words(name):
+    return [word.lower() for word in WORDS.findall(name)]
+
+
+def key_variants(words):
+    key = ''.join(words)
+    yield key
+    if words[-1] in IRREGULAR:
+        yield key[:-len(words[-1])] + IRREGULAR[words[-1]]
+    if key.endswith('ies') and len(key) > 3:
+        yield key[:-3] + 'y'
+    if key.endswith('es') and len(key) > 2:
+        yield key[:-2]
+    if key.endswith('s') and not key.endswith('ss') and len(key) > 1:
+        yield key[:-1]
+
+
+def referenced_words(column, data_type=None):
+    folded = column.lower()
+    if not folded.endswith(KEY_SUFFIXES) and not folded.startswith(KEY_PREFIXES):
+        return []
+    words = split_words(column)
+    if not words:
+        return []
+    if len(words) > 1 and words[-1] in KEY_SUFFIXES:
+        words = words[:-1]
+    elif len(words) > 1 and words[0] in KEY_PREFIXES:
+        words = words[1:]
+    elif len(words[-1]) > 2 and words[-1].endswith('id') and (data_type or '').lower() in KEY_TYPES:
+        words = words[:-1] + [words[-1][:-2]]
+    else:
+        return []
+    if len(words) > 1 and words[0] in KEY_PREFIXES:
+        words = words[1:]
+    return words
+
+
+class NameIndex:
+    def __init__(self, table_prefixes=TABLE_PREFIXES, table_suffixes=TABLE_SUFFIXES, cross_schema=True):
+        self.table_prefixes = set(table_prefixes)
+        self.table_suffixes = set(table_suffixes)
+        self.cross_schema = cross_schema
+        self.keys = {}
+        self.schemas = {}
+        self.primary_keys = {}
+        self.literals = {}
+        self._resolved = {}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            table_prefixes=config.get('table_prefixes', TABLE_PREFIXES),
+            table_suffixes=config.get('table_suffixes', TABLE_SUFFIXES),
+            cross_schema=config.get('cross_schema', True),
+        )
+
+    def __len__(self):
+        return len(self.primary_keys)
+
+    def add_table(self, schema, table, primary_key=None):
+        words = split_words(table)
+        if not words:
+            return
+        self.schemas.setdefault(''.join(split_words(schema)), schema)
+        self.primary_keys[(schema, table)] = primary_key
+        self.literals[(schema, table)] = ''.join(words)
+
+        stripped = list(words)
+        if len(stripped) > 1 and stripped[0] in self.table_prefixes:
+            stripped = stripped[1:]
+        if len(stripped) > 1 and stripped[-1] in self.table_suffixes:
+            stripped = stripped[:-1]
+        keys = set(key_variants(words)) | set(key_variants(stripped))
+        for key in keys:
+            self.keys.setdefault(key, {}).setdefault(schema, []).append(table)
+        self._resolved.clear()
+
+    def resolve(self, schema, table, column, data_type=None):
+        key_typed = (data_type or '').lower() in KEY_TYPES
+        match = self._resolved.get((schema, column, key_typed), False)
+        if match is False:
+            words = referenced_words(column, data_type)
+            match = self._match_local(schema, words) if words else None
+            if match is None and words and self.cross_schema:
+                match = self._match_elsewhere(schema, words)
+            self._resolved[(schema, column, key_typed)] = match
+        if match is None:
+            return None
+
+        to_schema, to_table, level = match
+        primary_key = self.primary_keys[(to_schema, to_table)]
+        if (to_schema, to_table) == (schema, table) and column == primary_key:
+            return None
+        return to_schema, to_table, primary_key or 'id', CONFIDENCE_LEVELS[level]
+
+    def _match_local(self, schema, words):
+        for start in range(len(words)):
+            qualified = self.schemas.get(''.join(words[:start])) if start else None
+            for target_schema in (qualified, schema) if qualified else (schema,):
+                for position, key in enumerate(key_variants(words[start:])):
+                    target = self._lookup(key, target_schema)
+                    if target is not None:
+                        exact = start == 0 and position == 0 and self.literals[(target_schema, target)] == key
+                        return target_schema, target, 0 if exact else 1
+        return None
+
+    def _match_elsewhere(self, schema, words):
+        for start in range(len(words)):
+            for position, key in enumerate(key_variants(words[start:])):
+                others = [(other, tables) for other, tables in self.keys.get(key, {}).items() if other != schema]
+                if len(others) == 1 and len(others[0][1]) == 1:
+                    other, (target,) = others[0]
+                    exact = start == 0 and position == 0 and self.literals[(other, target)] == key
+                    return other, target, 1 if exact else 2
+        return None
+
+    def _lookup(self, key, schema):
+        tables = self.keys.get(key, {}).get(schema)
+        if not tables:
+            return None
+        for table in tables:
+            if self.literals[(schema, table)] == key:
+                return table
+        return min(tables, key=lambda name: (len(name), name))
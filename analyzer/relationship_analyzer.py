@@ -1,16 +1,24 @@
-from explorer import PostgreSQLAdapter, SQLServerAdapter, MySQLAdapter
+from analyzer.name_index import NameIndex
+from explorer import ConnectionPool, PostgreSQLAdapter, SQLServerAdapter, MySQLAdapter
 
 
 class RelationshipAnalyzer:
-    def __init__(self, adapter, ignored_tables):
+    def __init__(self, adapter, ignored_tables, pool=None, snapshot=None, row_counter=None, name_index=None,
+                 inference=None):
         self.adapter = adapter
         self.ignored_tables = ignored_tables
+        self.pool = pool or ConnectionPool(adapter)
+        self.snapshot = snapshot
+        self.row_counter = row_counter
+        self.name_index = name_index
+        self.inference = inference or {}
 
     def get_foreign_keys(self, schema):
-        cursor = self.adapter.conn.cursor()
+        if self.snapshot is not None:
+            return self._build_foreign_keys(self.snapshot.foreign_keys(schema))
 
         if isinstance(self.adapter, PostgreSQLAdapter):
-            cursor.execute("""
+            sql, params = """
                            SELECT tc.table_name,
                                   kcu.column_name,
                                   ccu.table_name  AS foreign_table_name,
@@ -26,9 +34,9 @@ class RelationshipAnalyzer:
                            WHERE tc.constraint_type = 'FOREIGN KEY'
                              AND tc.table_schema = %s
                            ORDER BY tc.table_name, kcu.ordinal_position;
-                           """, (schema,))
+                           """, (schema,)
         elif isinstance(self.adapter, MySQLAdapter):
-            cursor.execute(f"""
+            sql, params = f"""
                 SELECT
                     tc.TABLE_NAME,
                     kcu.COLUMN_NAME,
@@ -42,9 +50,9 @@ class RelationshipAnalyzer:
                 WHERE tc.CONSTRAINT_TYPE = 'FOREIGN KEY'
                     AND tc.TABLE_SCHEMA = '{schema}'
                 ORDER BY tc.TABLE_NAME, kcu.ORDINAL_POSITION;
-            """)
+            """, ()
         elif isinstance(self.adapter, SQLServerAdapter):
-            cursor.execute("""
+            sql, params = """
                            SELECT OBJECT_NAME(fk.parent_object_id)                             AS table_name,
                                   COL_NAME(fkc.parent_object_id, fkc.parent_column_id)         AS column_name,
                                   OBJECT_NAME(fk.referenced_object_id)                         AS foreign_table_name,
@@ -59,10 +67,13 @@ class RelationshipAnalyzer:
                                                ON t.schema_id = s.schema_id
                            WHERE s.name = ?
                            ORDER BY table_name;
-                           """, (schema,))
+                           """, (schema,)
 
+        return self._build_foreign_keys(self.adapter.iter_rows(sql, params))
+
+    def _build_foreign_keys(self, rows):
         relationships = []
-        for row in cursor.fetchall():
+        for row in rows:
             if row[0] not in self.ignored_tables and row[2] not in self.ignored_tables:
                 relationships.append({
                     'table': row[0],
@@ -73,126 +84,105 @@ class RelationshipAnalyzer:
                 })
         return relationships
 
-    def get_table_stats(self, schema):
-        stats = []
-        tables = self.adapter.get_tables(schema)
-
-        for table_name, _ in tables:
-            if table_name in self.ignored_tables:
-                continue
-
-            try:
-                row_count = self.adapter.get_table_row_count(schema, table_name)
-                table_size = self.adapter.get_table_size(schema, table_name)
-
-                stats.append({
-                    'table': table_name,
-                    'size': table_size,
-                    'row_count': row_count
-                })
-            except Exception:
-                continue
-
+    def get_table_stats(self, schema, top_n=None, min_rows=None):
+        recounted = self._recounted(schema)
+        requested = top_n + len(self.ignored_tables) if top_n is not None and not recounted else None
+        tables = {}
+        table_types = {}
+        for table_name, row_count, heap_size, index_size, toast_size, size, table_type in self.adapter.get_table_stats(
+                schema, requested, None if recounted else min_rows):
+            if table_name not in self.ignored_tables:
+                table_types[table_name] = table_type
+                tables[table_name] = {
+                    'size': size,
+                    'row_count': row_count,
+                    'heap_size': heap_size,
+                    'index_size': index_size,
+                    'toast_size': toast_size,
+                }
+
+        if self.snapshot is not None:
+            for table_name, table_data in self.snapshot.tables(schema).items():
+                if table_name in tables and 'row_count_method' in table_data:
+                    tables[table_name]['row_count'] = table_data['row_count']
+                    tables[table_name]['row_count_method'] = table_data['row_count_method']
+        elif self.row_counter is not None:
+            counted = {table_name: {'type': table_types.get(table_name), 'row_count': table_data['row_count']}
+                       for table_name, table_data in tables.items()}
+            self.row_counter.apply(schema, counted)
+            for table_name, table_data in counted.items():
+                tables[table_name].update(table_data)
+                del tables[table_name]['type']
+
+        stats = [{'table': table_name, **table_data} for table_name, table_data in tables.items()]
+        if recounted and min_rows is not None:
+            stats = [entry for entry in stats if entry['row_count'] is not None and entry['row_count'] >= min_rows]
         stats.sort(key=lambda x: x.get('row_count', 0) or 0, reverse=True)
-        return stats
-
-    def infer_relationships(self, schema):
-        cursor = self.adapter.conn.cursor()
-
-        if isinstance(self.adapter, PostgreSQLAdapter):
-            cursor.execute("""
-                           SELECT c.table_name,
-                                  c.column_name,
-                                  c.data_type
-                           FROM information_schema.columns c
-                           WHERE c.table_schema = %s
-                             AND c.column_name LIKE '%%_id'
-                             AND c.column_name != 'id'
-                           ORDER BY c.table_name, c.column_name;
-                           """, (schema,))
-        elif isinstance(self.adapter, MySQLAdapter):
-            cursor.execute(f"""
-                SELECT
-                    c.TABLE_NAME,
-                    c.COLUMN_NAME,
-                    c.DATA_TYPE
-                FROM information_schema.COLUMNS c
-                WHERE c.TABLE_SCHEMA = '{schema}'
-                    AND c.COLUMN_NAME LIKE '%%_id'
-                    AND c.COLUMN_NAME != 'id'
-                ORDER BY c.TABLE_NAME, c.COLUMN_NAME;
-            """)
-        elif isinstance(self.adapter, SQLServerAdapter):
-            cursor.execute("""
-                           SELECT c.TABLE_NAME,
-                                  c.COLUMN_NAME,
-                                  c.DATA_TYPE
-                           FROM INFORMATION_SCHEMA.COLUMNS c
-                           WHERE c.TABLE_SCHEMA = ?
-                             AND c.COLUMN_NAME LIKE '%_id'
-                             AND c.COLUMN_NAME != 'id'
-                           ORDER BY c.TABLE_NAME, c.COLUMN_NAME;
-                           """, (schema,))
-
-        potential_fks = cursor.fetchall()
+        return stats[:top_n] if top_n is not None else stats
 
-        if isinstance(self.adapter, PostgreSQLAdapter):
-            cursor.execute("""
-                           SELECT table_name
-                           FROM information_schema.tables
-                           WHERE table_schema = %s
-                             AND table_type = 'BASE TABLE';
-                           """, (schema,))
-        elif isinstance(self.adapter, MySQLAdapter):
-            cursor.execute(f"""
-                SELECT TABLE_NAME
-                FROM information_schema.TABLES
-                WHERE TABLE_SCHEMA = '{schema}'
-                    AND TABLE_TYPE = 'BASE TABLE';
-            """)
-        elif isinstance(self.adapter, SQLServerAdapter):
-            cursor.execute("""
-                           SELECT TABLE_NAME
-                           FROM INFORMATION_SCHEMA.TABLES
-                           WHERE TABLE_SCHEMA = ?
-                             AND TABLE_TYPE = 'BASE TABLE';
-                           """, (schema,))
+    def _recounted(self, schema):
+        if self.snapshot is not None:
+            return any(table_data.get('row_count_method', 'estimate') != 'estimate'
+                       for table_data in self.snapshot.tables(schema).values())
+        return self.row_counter is not None
 
-        all_tables = {row[0] for row in cursor.fetchall() if row[0] not in self.ignored_tables}
+    def infer_relationships(self, schema):
+        name_index = self.get_name_index()
+        if self.snapshot is not None:
+            columns = self.snapshot.columns(schema)
+        else:
+            columns = self.adapter.iter_catalog_rows(schema, 'columns')
 
         inferred_relationships = []
-
-        for table_name, column_name, data_type in potential_fks:
+        for table_name, column_name, data_type, *_ in columns:
             if table_name in self.ignored_tables:
                 continue
-
-            potential_table = column_name[:-3]
-
-            singular_forms = [
-                potential_table,
-                potential_table + 's',
-                potential_table + 'es',
-                potential_table[:-1] if potential_table.endswith('ies') else None,
-            ]
-
-            if '_' in potential_table:
-                parts = potential_table.split('_')
-                singular_forms.append(parts[-1])
-                singular_forms.append(parts[-1] + 's')
-
-            matched_table = None
-            for form in singular_forms:
-                if form and form in all_tables:
-                    matched_table = form
-                    break
-
-            if matched_table:
-                inferred_relationships.append({
-                    'from_table': table_name,
-                    'from_column': column_name,
-                    'to_table': matched_table,
-                    'to_column': 'id',
-                    'confidence': 'high' if potential_table == matched_table else 'medium'
-                })
-
+            match = name_index.resolve(schema, table_name, column_name, data_type)
+            if match is None:
+                continue
+            to_schema, to_table, to_column, confidence = match
+            relationship = {'from_table': table_name, 'from_column': column_name}
+            if to_schema != schema:
+                relationship['to_schema'] = to_schema
+            relationship.update(to_table=to_table, to_column=to_column, confidence=confidence)
+            inferred_relationships.append(relationship)
+
+        inferred_relationships.sort(key=lambda x: (x['from_table'], x['from_column']))
         return inferred_relationships
+
+    def get_name_index(self):
+        if self.name_index is None:
+            name_index = NameIndex.from_config(self.inference)
+            schemas = self.snapshot.schemas if self.snapshot is not None else self.adapter.get_schemas()
+            for schema in schemas:
+                for table_name, primary_key in self._primary_keys(schema).items():
+                    name_index.add_table(schema, table_name, primary_key)
+            self.name_index = name_index
+        return self.name_index
+
+    def _primary_keys(self, schema):
+        if self.snapshot is not None:
+            tables = [table_name for table_name, table_data in self.snapshot.tables(schema).items()
+                      if table_data['type'] == 'BASE TABLE']
+            constraints = ((table_name, *constraint) for table_name, table_data in self.snapshot.tables(schema).items()
+                           for constraint in table_data['constraints'])
+        else:
+            tables = [table_name for table_name, table_type in self.adapter.get_tables(schema)
+                      if table_type == 'BASE TABLE']
+            constraints = self.adapter.iter_catalog_rows(schema, 'constraints')
+
+        key_columns = {table_name: set() for table_name in tables if table_name not in self.ignored_tables}
+        for table_name, _, constraint_type, column, *_ in constraints:
+            if constraint_type == 'PRIMARY KEY' and table_name in key_columns and column is not None:
+                key_columns[table_name].add(column)
+        return {table_name: next(iter(columns)) if columns else None
+                for table_name, columns in key_columns.items() if len(columns) <= 1}
+
+    def discover_relationships(self, schema, finder):
+        if self.snapshot is not None:
+            tables = self.snapshot.tables(schema)
+        else:
+            tables = self.adapter.get_schema_catalog(schema)
+        tables = {table_name: table_data for table_name, table_data in tables.items()
+                  if table_name not in self.ignored_tables and table_data['type'] == 'BASE TABLE'}
+        return finder.discover(schema, tables)
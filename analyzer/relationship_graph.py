@@ -0,0 +1,267 @@
+import heapq
+from array import array
+
+
+class RelationshipGraph:
+    def __init__(self, tables, sources, targets, from_columns, to_columns, kinds):
+        self.tables = list(tables)
+        self.ids = {table: table_id for table_id, table in enumerate(self.tables)}
+        self.sources = array('q', sources)
+        self.targets = array('q', targets)
+        self.from_columns = list(from_columns)
+        self.to_columns = list(to_columns)
+        self.kinds = list(kinds)
+        self._build_adjacency()
+        self._build_components()
+
+    @classmethod
+    def from_relationships(cls, **relationships_by_kind):
+        tables = {}
+        edges = []
+        for kind, all_relationships in relationships_by_kind.items():
+            for schema, relationships in (all_relationships or {}).items():
+                for relationship in relationships:
+                    source = f"{schema}.{relationship.get('table', relationship.get('from_table'))}"
+                    target = (f"{relationship.get('to_schema', schema)}."
+                              f"{relationship.get('foreign_table', relationship.get('to_table'))}")
+                    tables.setdefault(source, None)
+                    tables.setdefault(target, None)
+                    edges.append((source, target, relationship.get('column', relationship.get('from_column')),
+                                  relationship.get('foreign_column', relationship.get('to_column')), kind))
+
+        ids = {table: table_id for table_id, table in enumerate(sorted(tables))}
+        return cls(
+            sorted(tables),
+            [ids[edge[0]] for edge in edges],
+            [ids[edge[1]] for edge in edges],
+            [edge[2] for edge in edges],
+            [edge[3] for edge in edges],
+            [edge[4] for edge in edges],
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        edges = data['edges']
+        return cls(data['tables'], edges['source'], edges['target'], edges['from_column'], edges['to_column'],
+                   edges['kind'])
+
+    def to_dict(self):
+        return {
+            'tables': self.tables,
+            'edges': {
+                'source': list(self.sources),
+                'target': list(self.targets),
+                'from_column': self.from_columns,
+                'to_column': self.to_columns,
+                'kind': self.kinds,
+            },
+            'components': self.components(),
+            'load_order': self.load_order(),
+            'cycles': self.cycles(),
+        }
+
+    def _build_adjacency(self):
+        node_count = len(self.tables)
+        self.offsets = _csr_offsets(node_count, list(self.sources) + list(self.targets))
+        self.incident = array('q', bytes(8 * len(self.sources) * 2))
+        cursor = array('q', self.offsets[:-1])
+        for edge_id, (source, target) in enumerate(zip(self.sources, self.targets)):
+            for node in (source, target):
+                self.incident[cursor[node]] = edge_id
+                cursor[node] += 1
+
+        self.out_offsets = _csr_offsets(node_count, self.sources)
+        self.out_targets = array('q', bytes(8 * len(self.sources)))
+        cursor = array('q', self.out_offsets[:-1])
+        for source, target in zip(self.sources, self.targets):
+            self.out_targets[cursor[source]] = target
+            cursor[source] += 1
+
+    def _build_components(self):
+        parent = list(range(len(self.tables)))
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for source, target in zip(self.sources, self.targets):
+            root_source, root_target = find(source), find(target)
+            if root_source != root_target:
+                parent[max(root_source, root_target)] = min(root_source, root_target)
+        self.component_ids = array('q', (find(node) for node in range(len(self.tables))))
+
+    def components(self):
+        grouped = {}
+        for node, component in enumerate(self.component_ids):
+            grouped.setdefault(component, []).append(self.tables[node])
+        return sorted(grouped.values(), key=lambda tables: (-len(tables), tables[0]))
+
+    def component_of(self, table):
+        component = self.component_ids[self.ids[table]]
+        return [self.tables[node] for node, other in enumerate(self.component_ids) if other == component]
+
+    def load_order(self):
+        members = sorted(self._strong_components())
+        component_of = array('q', bytes(8 * len(self.tables)))
+        for component, nodes in enumerate(members):
+            for node in nodes:
+                component_of[node] = component
+
+        edges = [(component_of[source], component_of[target]) for source, target in zip(self.sources, self.targets)
+                 if component_of[source] != component_of[target]]
+        indegree = array('q', bytes(8 * len(members)))
+        for source, _ in edges:
+            indegree[source] += 1
+
+        dependents = _csr_offsets(len(members), [target for _, target in edges])
+        children = array('q', bytes(8 * len(edges)))
+        cursor = array('q', dependents[:-1])
+        for source, target in edges:
+            children[cursor[target]] = source
+            cursor[target] += 1
+
+        ready = [component for component in range(len(members)) if indegree[component] == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            component = heapq.heappop(ready)
+            order += members[component]
+            for child in children[dependents[component]:dependents[component + 1]]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    heapq.heappush(ready, child)
+        return [self.tables[node] for node in order]
+
+    def unload_order(self):
+        return self.load_order()[::-1]
+
+    def cycles(self):
+        cycles = []
+        for members in self._strong_components():
+            node = members[0]
+            self_loop = node in self.out_targets[self.out_offsets[node]:self.out_offsets[node + 1]]
+            if len(members) > 1 or self_loop:
+                cycles.append(sorted(self.tables[member] for member in members))
+        return sorted(cycles)
+
+    def _strong_components(self):
+        index_of = [-1] * len(self.tables)
+        lowlink = [0] * len(self.tables)
+        on_stack = [False] * len(self.tables)
+        stack = []
+        components = []
+        counter = 0
+
+        for root in range(len(self.tables)):
+            if index_of[root] != -1:
+                continue
+            work = [(root, self.out_offsets[root])]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+
+            while work:
+                node, position = work[-1]
+                if position < self.out_offsets[node + 1]:
+                    work[-1] = (node, position + 1)
+                    target = self.out_targets[position]
+                    if index_of[target] == -1:
+                        index_of[target] = lowlink[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = True
+                        work.append((target, self.out_offsets[target]))
+                    elif on_stack[target]:
+                        lowlink[node] = min(lowlink[node], index_of[target])
+                    continue
+
+                work.pop()
+                if work:
+                    lowlink[work[-1][0]] = min(lowlink[work[-1][0]], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        members.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(members))
+        return components
+
+    def join_path(self, from_table, to_table):
+        if from_table not in self.ids or to_table not in self.ids:
+            return None
+        start, goal = self.ids[from_table], self.ids[to_table]
+        if start == goal:
+            return []
+        if self.component_ids[start] != self.component_ids[goal]:
+            return None
+
+        forward, backward = {start: None}, {goal: None}
+        forward_frontier, backward_frontier = [start], [goal]
+        meeting = None
+        while forward_frontier and backward_frontier and meeting is None:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meeting = self._expand(forward_frontier, forward, backward)
+            else:
+                backward_frontier, meeting = self._expand(backward_frontier, backward, forward)
+        if meeting is None:
+            return None
+
+        path = []
+        node = meeting
+        while forward[node] is not None:
+            previous, edge_id = forward[node]
+            path.append(self._join_step(edge_id, previous))
+            node = previous
+        path.reverse()
+
+        node = meeting
+        while backward[node] is not None:
+            following, edge_id = backward[node]
+            path.append(self._join_step(edge_id, node))
+            node = following
+        return path
+
+    def _expand(self, frontier, seen, other):
+        next_frontier = []
+        for node in frontier:
+            for edge_id in self.incident[self.offsets[node]:self.offsets[node + 1]]:
+                neighbor = self.targets[edge_id] if self.sources[edge_id] == node else self.sources[edge_id]
+                if neighbor in seen:
+                    continue
+                seen[neighbor] = (node, edge_id)
+                if neighbor in other:
+                    return next_frontier, neighbor
+                next_frontier.append(neighbor)
+        return next_frontier, None
+
+    def _join_step(self, edge_id, from_node):
+        if self.sources[edge_id] == from_node:
+            return {
+                'from_table': self.tables[from_node],
+                'from_column': self.from_columns[edge_id],
+                'to_table': self.tables[self.targets[edge_id]],
+                'to_column': self.to_columns[edge_id],
+                'kind': self.kinds[edge_id],
+            }
+        return {
+            'from_table': self.tables[from_node],
+            'from_column': self.to_columns[edge_id],
+            'to_table': self.tables[self.sources[edge_id]],
+            'to_column': self.from_columns[edge_id],
+            'kind': self.kinds[edge_id],
+        }
+
+
+def _csr_offsets(node_count, nodes):
+    offsets = array('q', bytes(8 * (node_count + 1)))
+    for node in nodes:
+        offsets[node + 1] += 1
+    for position in range(node_count):
+        offsets[position + 1] += offsets[position]
+    return offsets
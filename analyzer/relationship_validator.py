@@ -0,0 +1,49 @@
+import time
+
+from explorer import ConnectionPool
+
+
+class RelationshipValidator:
+    def __init__(self, adapter, pool=None, sample_rows=1000, time_budget=60, query_timeout=5, row_estimates=None):
+        self.adapter = adapter
+        self.pool = pool or ConnectionPool(adapter)
+        self.sample_rows = sample_rows
+        self.query_timeout = query_timeout
+        self.row_estimates = row_estimates or {}
+        self.deadline = time.monotonic() + time_budget
+
+    def validate(self, schema, relationships):
+        return self.pool.map(lambda adapter, relationship: self._validate_one(adapter, schema, relationship),
+                             relationships)
+
+    def _validate_one(self, adapter, schema, relationship):
+        result = dict(relationship, validated=False, sampled_rows=0, containment=None)
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            return result
+
+        row_estimate = self.row_estimates.get((schema, relationship['from_table']))
+        if row_estimate is None:
+            row_estimate = adapter.get_table_row_count(schema, relationship['from_table'])
+
+        try:
+            sampled, matched = adapter.get_containment_sample(
+                schema,
+                relationship['from_table'],
+                relationship['from_column'],
+                relationship['to_table'],
+                relationship['to_column'],
+                self.sample_rows,
+                row_estimate=row_estimate,
+                timeout=min(self.query_timeout, remaining),
+                to_schema=relationship.get('to_schema'),
+            )
+        except Exception:
+            adapter._reset()
+            return result
+
+        result['validated'] = True
+        result['sampled_rows'] = sampled
+        if sampled:
+            result['containment'] = round(matched / sampled, 4)
+        return result
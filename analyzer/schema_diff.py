@@ -0,0 +1,153 @@
+import json
+import os
+
+from writer.binary_format import BinaryCatalogReader
+from writer.catalog_hash import HASHES_SUFFIX, VOLATILE_FIELDS, CatalogHasher, load_hashes
+
+NAMED_FIELDS = ('columns', 'constraints', 'indexes')
+
+
+class FileCatalogSource:
+    def __init__(self, path):
+        self.path = path
+        self.base, self.extension = os.path.splitext(path)
+        self._data = None
+
+    def hashes(self):
+        if os.path.exists(self.base + HASHES_SUFFIX):
+            return load_hashes(self.base + HASHES_SUFFIX)
+        hasher = CatalogHasher(self._schemas())
+        for _ in hasher.track(self._iter_tables()):
+            pass
+        return hasher.hashes()
+
+    def tables(self, schema, names):
+        names = set(names)
+        if self.extension == '.msgpack':
+            with BinaryCatalogReader(self.path) as reader:
+                return {name: reader.read(schema, name) for name in names}
+        return {table_name: table_data for table_schema, table_name, table_data in self._iter_tables()
+                if table_schema == schema and table_name in names}
+
+    def _schemas(self):
+        if self.extension == '.msgpack':
+            with BinaryCatalogReader(self.path) as reader:
+                return reader.schemas()
+        if self.extension in ('.jsonl', '.ndjson'):
+            return []
+        return list(self._load())
+
+    def _iter_tables(self):
+        if self.extension == '.msgpack':
+            with BinaryCatalogReader(self.path) as reader:
+                yield from reader
+        elif self.extension in ('.jsonl', '.ndjson'):
+            with open(self.path, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        yield record.pop('schema'), record.pop('table'), record
+        else:
+            for schema, tables in self._load().items():
+                for table_name, table_data in tables.items():
+                    yield schema, table_name, table_data
+
+    def _load(self):
+        if self._data is None:
+            with open(self.path, 'r') as f:
+                if self.extension in ('.yaml', '.yml'):
+                    import yaml
+                    self._data = yaml.safe_load(f) or {}
+                elif self.extension == '.json':
+                    self._data = json.load(f)
+                else:
+                    raise ValueError(f"Unsupported snapshot format: {self.path}")
+        return self._data
+
+
+class LiveCatalogSource:
+    def __init__(self, explorer):
+        self.explorer = explorer
+        self.table_types = {}
+
+    def hashes(self):
+        schemas = self.explorer.adapter.get_schemas()
+        hasher = CatalogHasher(schemas)
+        for schema, table_name, table_data in self.explorer.iter_tables(schemas):
+            hasher.add(schema, table_name, table_data)
+            self.table_types[(schema, table_name)] = table_data['type']
+        return hasher.hashes()
+
+    def tables(self, schema, names):
+        tables = [(name, self.table_types[(schema, name)]) for name in names]
+        return self.explorer.adapter.get_schema_catalog(schema, tables)
+
+
+class SchemaDiff:
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+
+    def compare(self):
+        old_hashes = self.old.hashes()
+        new_hashes = self.new.hashes()
+
+        diff = {
+            'added_schemas': sorted(set(new_hashes) - set(old_hashes)),
+            'removed_schemas': sorted(set(old_hashes) - set(new_hashes)),
+            'schemas': {},
+        }
+        for schema in sorted(set(old_hashes) & set(new_hashes)):
+            if old_hashes[schema]['hash'] == new_hashes[schema]['hash']:
+                continue
+            schema_diff = self._compare_schema(schema, old_hashes[schema]['tables'], new_hashes[schema]['tables'])
+            if schema_diff:
+                diff['schemas'][schema] = schema_diff
+        return diff
+
+    def _compare_schema(self, schema, old_tables, new_tables):
+        altered = sorted(name for name in set(old_tables) & set(new_tables) if old_tables[name] != new_tables[name])
+        schema_diff = {
+            'added_tables': sorted(set(new_tables) - set(old_tables)),
+            'removed_tables': sorted(set(old_tables) - set(new_tables)),
+            'altered_tables': {},
+        }
+        if altered:
+            old_data = self.old.tables(schema, altered)
+            new_data = self.new.tables(schema, altered)
+            for table_name in altered:
+                changes = self._compare_table(old_data.get(table_name, {}), new_data.get(table_name, {}))
+                if changes:
+                    schema_diff['altered_tables'][table_name] = changes
+        return schema_diff if any(schema_diff.values()) else None
+
+    @staticmethod
+    def _compare_table(old, new):
+        old, new = _normalize(old), _normalize(new)
+        changes = {}
+        for key in sorted(set(old) | set(new)):
+            if key in VOLATILE_FIELDS or old.get(key) == new.get(key):
+                continue
+            if key not in NAMED_FIELDS:
+                changes[key] = {'old': old.get(key), 'new': new.get(key)}
+                continue
+
+            old_items, new_items = _by_name(old.get(key, [])), _by_name(new.get(key, []))
+            changes[key] = {
+                'added': sorted(set(new_items) - set(old_items)),
+                'removed': sorted(set(old_items) - set(new_items)),
+                'altered': sorted(name for name in set(old_items) & set(new_items)
+                                  if old_items[name] != new_items[name]),
+            }
+        return changes
+
+
+def _normalize(value):
+    return json.loads(json.dumps(value, default=str))
+
+
+def _by_name(rows):
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(str(row[0]), []).append(row)
+    return {name: sorted(group, key=lambda row: json.dumps(row)) for name, group in grouped.items()}
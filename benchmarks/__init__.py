@@ -0,0 +1,2 @@
+from .synthetic_catalog import generate_catalog
+from .standin_adapter import StandInAdapter
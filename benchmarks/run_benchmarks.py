@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from analyzer import RelationshipAnalyzer
+from benchmarks.standin_adapter import StandInAdapter
+from benchmarks.synthetic_catalog import generate_catalog
+from explorer import CatalogSnapshot, StructureExplorer
+from writer import OutputWriter
+
+FORMATS = ('json', 'jsonl', 'msgpack', 'sqlite', 'yaml', 'xml')
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def explore_and_write(adapter, workers, directory):
+    explorer = StructureExplorer(adapter, set(), workers=workers, chunk_size=200)
+    schemas = adapter.get_schemas()
+    OutputWriter('json').write_tables(schemas, explorer.iter_tables(schemas), os.path.join(directory, 'db_structure'))
+
+
+def infer_all(adapter, snapshot):
+    analyzer = RelationshipAnalyzer(adapter, set(), snapshot=snapshot)
+    return [analyzer.infer_relationships(schema) for schema in snapshot.schemas]
+
+
+def run_size(size, shape, formats, latency, workers, repeat, directory):
+    catalog = generate_catalog(tables=size, **shape)
+    adapter = StandInAdapter.from_catalog(catalog, latency=latency)
+    adapter.connect()
+    snapshot = CatalogSnapshot(catalog)
+    analyzer = RelationshipAnalyzer(adapter, set())
+
+    benchmarks = [
+        ('db_explorer', lambda: explore_and_write(adapter, workers, directory)),
+        ('infer_relationships', lambda: infer_all(adapter, snapshot)),
+        ('get_table_stats', lambda: [analyzer.get_table_stats(schema) for schema in snapshot.schemas]),
+    ]
+    for format_type in formats:
+        writer = OutputWriter(format_type, store_file=os.path.join(directory, f"catalog_{format_type}"))
+        benchmarks.append((f"write_{format_type}", lambda writer=writer: writer.write_tables(
+            snapshot.schemas, snapshot.iter_tables(), os.path.join(directory, f"structure_{writer.format_type}"))))
+
+    results = []
+    for name, fn in benchmarks:
+        try:
+            seconds = timed(fn, repeat)
+        except ImportError as error:
+            results.append({'benchmark': name, 'tables': size, 'seconds': None, 'skipped': str(error)})
+            continue
+        results.append({'benchmark': name, 'tables': size, 'seconds': round(seconds, 6),
+                        'tables_per_second': round(size / seconds, 1) if seconds else None})
+    adapter.close()
+    return results
+
+
+def compare(results, baseline, threshold):
+    previous = {(entry['benchmark'], entry['tables']): entry['seconds'] for entry in baseline['results']}
+    regressions = []
+    for entry in results:
+        before = previous.get((entry['benchmark'], entry['tables']))
+        if not before or entry['seconds'] is None:
+            continue
+        ratio = entry['seconds'] / before
+        entry['baseline_seconds'] = before
+        entry['ratio'] = round(ratio, 3)
+        if ratio > threshold:
+            regressions.append(entry)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark exploration, analysis and output against a synthetic "
+                                                 "catalog served by an in-memory stand-in adapter.")
+    parser.add_argument('--sizes', default='1000,10000,100000', help="comma-separated table counts")
+    parser.add_argument('--schemas', type=int, default=1)
+    parser.add_argument('--columns', type=int, default=12)
+    parser.add_argument('--foreign-keys', type=int, default=2)
+    parser.add_argument('--undeclared-keys', type=int, default=1)
+    parser.add_argument('--wide-tables', type=int, default=0)
+    parser.add_argument('--wide-columns', type=int, default=10000)
+    parser.add_argument('--formats', default=','.join(FORMATS))
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every stand-in query")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25, help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    shape = {
+        'schemas': args.schemas,
+        'columns': args.columns,
+        'foreign_keys': args.foreign_keys,
+        'undeclared_keys': args.undeclared_keys,
+        'wide_tables': args.wide_tables,
+        'wide_columns': args.wide_columns,
+        'seed': args.seed,
+    }
+    formats = [format_type for format_type in args.formats.split(',') if format_type]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (int(size) for size in args.sizes.split(',')):
+            for entry in run_size(size, shape, formats, args.latency, args.workers, args.repeat, directory):
+                results.append(entry)
+                seconds = 'skipped' if entry['seconds'] is None else f"{entry['seconds']:.3f}s"
+                print(f"{entry['benchmark']:<22} {size:>8} tables  {seconds}", flush=True)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for entry in regressions:
+            print(f"regression: {entry['benchmark']} at {entry['tables']} tables took {entry['seconds']:.3f}s, "
+                  f"{entry['ratio']}x the baseline {entry['baseline_seconds']:.3f}s")
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'shape': shape,
+            'latency': args.latency,
+            'workers': args.workers,
+            'repeat': args.repeat,
+            'results': results,
+        }, f, indent=2)
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
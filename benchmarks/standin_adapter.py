@@ -0,0 +1,145 @@
+import itertools
+import time
+
+from benchmarks.synthetic_catalog import ROW_WIDTH
+from explorer.database_adapter import DatabaseAdapter
+
+
+class StandInCursor:
+    def __init__(self, adapter):
+        self.adapter = adapter
+        self.rows = iter(())
+
+    def execute(self, sql, params):
+        self.rows = iter(self.adapter._rows(sql, params))
+
+    def fetchmany(self, size):
+        return list(itertools.islice(self.rows, size))
+
+    def close(self):
+        self.rows = iter(())
+
+
+class StandInAdapter(DatabaseAdapter):
+    def __init__(self, config):
+        super().__init__(config)
+        self.catalog = config['catalog']
+        self.latency = config.get('latency', 0)
+        self.row_latency = config.get('row_latency', 0)
+        self.rows = config.setdefault('rows', {})
+
+    @classmethod
+    def from_catalog(cls, catalog, latency=0, row_latency=0):
+        return cls({'type': 'standin', 'catalog': catalog, 'latency': latency, 'row_latency': row_latency})
+
+    def open_connection(self):
+        return object()
+
+    def get_schemas(self):
+        return [row[0] for row in self._fetch(*self._schemas_query())]
+
+    def get_tables(self, schema):
+        return self._fetch(*self._tables_query(schema))
+
+    def get_columns(self, schema, table):
+        return self._fetch(('table', schema, table, 'columns'), ())
+
+    def get_constraints(self, schema, table):
+        return self._fetch(('table', schema, table, 'constraints'), ())
+
+    def get_indexes(self, schema, table):
+        return self._fetch(('table', schema, table, 'indexes'), ())
+
+    def get_table_row_count(self, schema, table):
+        return self.catalog[schema][table]['row_count']
+
+    def get_table_size(self, schema, table):
+        return self.catalog[schema][table]['size']
+
+    def get_column_statistics(self, schema):
+        return {}
+
+    def _schemas_query(self):
+        return ('schemas', None), ()
+
+    def _tables_query(self, schema):
+        return ('tables', schema), ()
+
+    def _catalog_queries(self, schema, tables=None):
+        return {key: (('catalog', schema, key), (tables,))
+                for key in ('columns', 'constraints', 'indexes', 'estimates')}
+
+    def _fingerprints_query(self, schema):
+        return ('fingerprints', schema), ()
+
+    def _table_stats_query(self, schema, top_n=None, min_rows=None):
+        return ('table_stats', schema, top_n, min_rows), ()
+
+    def _containment_query(self, schema, from_table, from_column, to_table, to_column, sample_rows, fraction,
+                           to_schema=None):
+        return ('containment', schema, sample_rows), ()
+
+    def _hash_expression(self, column):
+        return f"hash({self.quote_identifier(column)})"
+
+    def close(self):
+        self.conn = None
+
+    def _execute(self, sql, params):
+        return self._fetched(self._rows(sql, params))
+
+    def _stream_cursor(self):
+        return StandInCursor(self)
+
+    def _rows(self, sql, params):
+        kind, schema, *args = sql
+        rows = getattr(self, f"_rows_{kind}")(schema, *args, *params)
+        delay = self.latency + self.row_latency * len(rows)
+        if delay:
+            time.sleep(delay)
+        return rows
+
+    def _rows_schemas(self, _):
+        return [(schema,) for schema in sorted(self.catalog)]
+
+    def _rows_tables(self, schema):
+        return sorted((table_name, table_data['type']) for table_name, table_data in self.catalog[schema].items())
+
+    def _rows_table(self, schema, table, key):
+        return list(self.catalog[schema][table][key])
+
+    def _rows_catalog(self, schema, key, tables):
+        grouped = self._schema_rows(schema)[key]
+        rows = []
+        for table_name in grouped if tables is None else tables:
+            rows += grouped.get(table_name, ())
+        return rows
+
+    def _rows_fingerprints(self, schema):
+        return [(table_name, f"{len(table_data['columns'])}/{len(table_data['constraints'])}")
+                for table_name, table_data in self.catalog[schema].items()]
+
+    def _rows_table_stats(self, schema, top_n, min_rows):
+        rows = []
+        for table_name, table_data in self.catalog[schema].items():
+            row_count = table_data['row_count']
+            if min_rows is not None and row_count < min_rows:
+                continue
+            heap = row_count * ROW_WIDTH + 8192
+            index = row_count * 16 * len(table_data['indexes'])
+            rows.append((table_name, row_count, heap, index, 0, heap + index, table_data['type']))
+        rows.sort(key=lambda row: (-row[1], row[0]))
+        return rows[:top_n] if top_n is not None else rows
+
+    def _rows_containment(self, schema, sample_rows):
+        return [(sample_rows, sample_rows)]
+
+    def _schema_rows(self, schema):
+        if schema not in self.rows:
+            grouped = {'columns': {}, 'constraints': {}, 'indexes': {}, 'estimates': {}}
+            for table_name, table_data in self.catalog[schema].items():
+                for key in ('columns', 'constraints', 'indexes'):
+                    grouped[key][table_name] = [(table_name,) + tuple(row) for row in table_data[key]]
+                grouped['estimates'][table_name] = [(table_name, table_data['row_count'], table_data['size'])]
+            self.rows[schema] = grouped
+        return self.rows[schema]
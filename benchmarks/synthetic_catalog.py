@@ -0,0 +1,84 @@
+import random
+
+COLUMN_TYPES = (
+    ('integer', None),
+    ('bigint', None),
+    ('character varying', 255),
+    ('text', None),
+    ('numeric', None),
+    ('boolean', None),
+    ('timestamp without time zone', None),
+    ('date', None),
+)
+ROW_WIDTH = 64
+
+
+def generate_catalog(schemas=1, tables=1000, columns=12, foreign_keys=2, undeclared_keys=1, wide_tables=0,
+                     wide_columns=10000, view_ratio=0.05, seed=0):
+    rng = random.Random(seed)
+    catalog = {}
+    per_schema, remainder = divmod(tables, max(1, schemas))
+    for schema_position in range(schemas):
+        schema = f"schema{schema_position}"
+        table_count = per_schema + (1 if schema_position < remainder else 0)
+        names = [f"entity{position}s" for position in range(table_count)]
+        catalog[schema] = {}
+        for position, table_name in enumerate(names):
+            width = wide_columns if position < wide_tables else columns
+            if position and rng.random() < view_ratio:
+                catalog[schema][table_name] = _view(rng, width)
+                continue
+            targets = rng.sample(range(position), min(position, foreign_keys + undeclared_keys)) if position else []
+            catalog[schema][table_name] = _table(rng, schema, table_name, width, [names[t] for t in targets],
+                                                 foreign_keys)
+    return catalog
+
+
+def _table(rng, schema, table_name, width, targets, foreign_keys):
+    columns = [('id', 'integer', None, 'NO', f"nextval('{table_name}_id_seq'::regclass)", 1)]
+    constraints = [(f"{table_name}_pkey", 'PRIMARY KEY', 'id', schema, table_name, 'id')]
+    indexes = [(f"{table_name}_pkey",
+                f"CREATE UNIQUE INDEX {table_name}_pkey ON {schema}.{table_name} USING btree (id)")]
+
+    for position, target in enumerate(targets):
+        column = f"{target[:-1]}_id"
+        columns.append((column, 'integer', None, 'YES', None, len(columns) + 1))
+        if position < foreign_keys:
+            constraints.append((f"{table_name}_{column}_fkey", 'FOREIGN KEY', column, schema, target, 'id'))
+            if rng.random() < 0.5:
+                index = f"{table_name}_{column}_idx"
+                indexes.append((index, f"CREATE INDEX {index} ON {schema}.{table_name} USING btree ({column})"))
+
+    while len(columns) < width:
+        data_type, length = rng.choice(COLUMN_TYPES)
+        nullable = 'YES' if rng.random() < 0.7 else 'NO'
+        columns.append((f"col{len(columns)}", data_type, length, nullable, None, len(columns) + 1))
+
+    row_count = min(int(rng.lognormvariate(8, 3)), 10 ** 10)
+    return {
+        'type': 'BASE TABLE',
+        'row_count': row_count,
+        'size': pretty_size(row_count * ROW_WIDTH + 8192),
+        'columns': columns,
+        'constraints': constraints,
+        'indexes': indexes,
+    }
+
+
+def _view(rng, width):
+    columns = [(f"col{position}", *rng.choice(COLUMN_TYPES), 'YES', None, position + 1) for position in range(width)]
+    return {
+        'type': 'VIEW',
+        'row_count': 0,
+        'size': '0 bytes',
+        'columns': columns,
+        'constraints': [],
+        'indexes': [],
+    }
+
+
+def pretty_size(size):
+    for unit in ('bytes', 'kB', 'MB', 'GB', 'TB'):
+        if size < 10 * 1024 or unit == 'TB':
+            return f"{size} {unit}"
+        size = int(size / 1024 + 0.5)
@@ -1,9 +1,75 @@
+import asyncio
 import json
 
-from explorer import get_adapter
+from analyzer import ColumnProfiler
+from explorer import (AsyncStructureExplorer, ConnectionPool, Instrumentation, MetadataCache, QueryScheduler,
+                      RowCounter, StructureExplorer, get_adapter, get_async_adapter)
 from writer import OutputWriter
 
 
+def load_cache(db_config, options):
+    if not options.get('cache_file'):
+        return None
+    target = f"{db_config['type']}://{db_config['host']}:{db_config['port']}/{db_config['database']}"
+    return MetadataCache(options['cache_file'], target).load()
+
+
+def load_row_counter(adapter, options):
+    if not options.get('row_counts'):
+        return None
+    return RowCounter.from_config(adapter, options['row_counts'])
+
+
+def load_instrumentation(options):
+    if not options.get('instrumentation'):
+        return None
+    return Instrumentation.from_config(options['instrumentation'])
+
+
+def open_adapter(db_config, options, instrumentation):
+    adapter = get_adapter(db_config['type'], db_config)
+    if instrumentation is not None:
+        instrumentation.attach(adapter)
+    QueryScheduler.from_config(options).attach(adapter)
+    return adapter
+
+
+def record_tables(tables, catalogs):
+    for schema, table_name, table_data in tables:
+        catalogs[schema][table_name] = {key: table_data[key] for key in ('type', 'row_count', 'columns')}
+        yield schema, table_name, table_data
+
+
+def profile_columns(adapter, options, catalogs):
+    profile_config = options['column_profile']
+    with ConnectionPool(adapter, options.get('workers', 1)) as pool:
+        profiler = ColumnProfiler(
+            adapter,
+            pool,
+            sample_rows=profile_config.get('sample_rows', 10000),
+            time_budget=profile_config.get('time_budget_seconds', 60),
+            query_timeout=profile_config.get('query_timeout_seconds', 10),
+            most_common=profile_config.get('most_common_values', 5),
+        )
+        return {schema: profiler.profile(schema, catalog) for schema, catalog in catalogs.items()}
+
+
+async def explore_async(db_config, options):
+    ignored_tables = set(options.get('ignored_tables', []))
+    adapter = get_async_adapter(db_config['type'], db_config, options.get('workers', 4), options.get('timeout_seconds'))
+    await adapter.connect()
+    try:
+        explorer = AsyncStructureExplorer(
+            adapter,
+            ignored_tables,
+            chunk_size=options.get('chunk_size', 200),
+            cache=load_cache(db_config, options),
+        )
+        return await explorer.explore()
+    finally:
+        await adapter.close()
+
+
 def main():
     with open('config.json', 'r') as f:
         config = json.load(f)
@@ -13,42 +79,54 @@ def main():
     options = config.get('options', {})
     ignored_tables = set(options.get('ignored_tables', []))
 
-    adapter = get_adapter(db_config['type'], db_config)
+    writer = OutputWriter(output_config.get('format', 'json'), store_file=output_config.get('store_file', 'db_catalog'))
+    structure_file = output_config.get('structure_file', 'db_structure')
+    instrumentation = load_instrumentation(options)
+
+    if options.get('engine') == 'async':
+        all_data = asyncio.run(explore_async(db_config, options))
+        row_counter = load_row_counter(open_adapter(db_config, options, instrumentation), options)
+        if row_counter is not None:
+            with row_counter:
+                for schema, catalog in all_data.items():
+                    row_counter.apply(schema, catalog)
+        tables = ((schema, name, data) for schema, catalog in all_data.items() for name, data in catalog.items())
+        writer.write_tables(list(all_data), tables, structure_file)
+        if options.get('column_profile'):
+            adapter = open_adapter(db_config, options, instrumentation)
+            adapter.connect()
+            writer.write(profile_columns(adapter, options, all_data), f"{structure_file}_profile", 'profile')
+            adapter.close()
+        if instrumentation is not None:
+            instrumentation.save()
+        return
+
+    adapter = open_adapter(db_config, options, instrumentation)
     adapter.connect()
+    row_counter = load_row_counter(adapter, options)
 
+    explorer = StructureExplorer(
+        adapter,
+        ignored_tables,
+        workers=options.get('workers', 1),
+        chunk_size=options.get('chunk_size', 200),
+        cache=load_cache(db_config, options),
+        row_counter=row_counter,
+    )
     schemas = adapter.get_schemas()
-    all_data = {}
-
-    for schema in schemas:
-        tables = adapter.get_tables(schema)
-        all_data[schema] = {}
-
-        for table_name, table_type in tables:
-            if table_name in ignored_tables:
-                continue
-
-            try:
-                row_count = adapter.get_table_row_count(schema, table_name)
-                table_size = adapter.get_table_size(schema, table_name)
-                columns = adapter.get_columns(schema, table_name)
-                constraints = adapter.get_constraints(schema, table_name)
-                indexes = adapter.get_indexes(schema, table_name)
-
-                all_data[schema][table_name] = {
-                    'type': table_type,
-                    'row_count': row_count,
-                    'size': table_size,
-                    'columns': columns,
-                    'constraints': constraints,
-                    'indexes': indexes,
-                }
-            except Exception:
-                continue
-
-    writer = OutputWriter(output_config.get('format', 'json'))
-    writer.write(all_data, output_config.get('structure_file', 'db_structure'))
+    catalogs = {schema: {} for schema in schemas}
+    tables = explorer.iter_tables(schemas)
+    if options.get('column_profile'):
+        tables = record_tables(tables, catalogs)
+    writer.write_tables(schemas, tables, structure_file)
+    if options.get('column_profile'):
+        writer.write(profile_columns(adapter, options, catalogs), f"{structure_file}_profile", 'profile')
 
+    if row_counter is not None:
+        row_counter.close()
     adapter.close()
+    if instrumentation is not None:
+        instrumentation.save()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,55 @@
+import json
+import sys
+
+from analyzer import FileCatalogSource, LiveCatalogSource, SchemaDiff
+from explorer import Instrumentation, QueryScheduler, StructureExplorer, get_adapter
+from writer import OutputWriter
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("usage: diff_schemas.py OLD_SNAPSHOT [NEW_SNAPSHOT]")
+
+    with open('config.json', 'r') as f:
+        config = json.load(f)
+
+    db_config = config['database']
+    output_config = config['output']
+    options = config.get('options', {})
+    ignored_tables = set(options.get('ignored_tables', []))
+    instrumentation = None
+    if options.get('instrumentation'):
+        instrumentation = Instrumentation.from_config(options['instrumentation'])
+
+    adapter = None
+    if len(sys.argv) == 3:
+        new = FileCatalogSource(sys.argv[2])
+    else:
+        adapter = get_adapter(db_config['type'], db_config)
+        if instrumentation is not None:
+            instrumentation.attach(adapter)
+        QueryScheduler.from_config(options).attach(adapter)
+        adapter.connect()
+        new = LiveCatalogSource(StructureExplorer(
+            adapter,
+            ignored_tables,
+            workers=options.get('workers', 1),
+            chunk_size=options.get('chunk_size', 200),
+        ))
+
+    diff = SchemaDiff(FileCatalogSource(sys.argv[1]), new).compare()
+    if adapter is not None:
+        adapter.close()
+
+    format_type = output_config.get('format', 'json')
+    writer = OutputWriter('json' if format_type == 'sqlite' else format_type)
+    writer.write(diff, output_config.get('diff_file', 'db_diff'))
+    if instrumentation is not None:
+        instrumentation.save()
+
+    if diff['added_schemas'] or diff['removed_schemas'] or diff['schemas']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import json
+import multiprocessing
+import os
+import re
+import time
+from multiprocessing.connection import wait
+
+from explorer import Instrumentation, MetadataCache, QueryScheduler, RowCounter, StructureExplorer, get_adapter
+from writer import OutputWriter
+from writer.output_writer import format_bytes
+
+TOTAL_FIELDS = ('schemas', 'tables', 'views', 'columns', 'rows', 'size')
+
+
+def target_name(target):
+    name = target.get('name') or f"{target.get('host', 'localhost')}_{target.get('database', '')}"
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+
+
+def explore_target(db_config, options, output_config, directory):
+    os.makedirs(directory, exist_ok=True)
+    structure_file = os.path.join(directory, output_config.get('structure_file', 'db_structure'))
+    writer = OutputWriter(
+        output_config.get('format', 'json'),
+        output_config.get('human_readable_sizes', True),
+        os.path.join(directory, output_config.get('store_file', 'db_catalog')),
+    )
+
+    instrumentation = None
+    if options.get('instrumentation'):
+        instrumentation = Instrumentation.from_config(options['instrumentation'])
+        for key in ('report_file', 'trace_file'):
+            if getattr(instrumentation, key):
+                setattr(instrumentation, key, os.path.join(directory, getattr(instrumentation, key)))
+
+    adapter = get_adapter(db_config['type'], db_config)
+    if instrumentation is not None:
+        instrumentation.attach(adapter)
+    QueryScheduler.from_config(options).attach(adapter)
+    adapter.connect()
+    row_counter = RowCounter.from_config(adapter, options['row_counts']) if options.get('row_counts') else None
+
+    cache = None
+    if options.get('cache_file'):
+        target = f"{db_config['type']}://{db_config.get('host')}:{db_config.get('port')}/{db_config.get('database')}"
+        cache = MetadataCache(os.path.join(directory, options['cache_file']), target).load()
+
+    explorer = StructureExplorer(
+        adapter,
+        set(options.get('ignored_tables', [])),
+        workers=options.get('workers', 1),
+        chunk_size=options.get('chunk_size', 200),
+        cache=cache,
+        row_counter=row_counter,
+    )
+    schemas = adapter.get_schemas()
+    summary = {'type': db_config['type'], 'schemas': len(schemas), 'tables': 0, 'views': 0, 'columns': 0, 'rows': 0,
+               'size': 0}
+    writer.write_tables(schemas, _count_tables(explorer.iter_tables(schemas), summary), structure_file)
+
+    all_stats = {}
+    for schema in schemas:
+        stats = adapter.get_table_stats(schema)
+        all_stats[schema] = [{'table': table, 'size': size, 'row_count': row_count, 'heap_size': heap_size,
+                              'index_size': index_size, 'toast_size': toast_size}
+                             for table, row_count, heap_size, index_size, toast_size, size, _ in stats]
+        summary['size'] += sum(entry['size'] or 0 for entry in all_stats[schema])
+    writer.write_stats(all_stats, os.path.join(directory, output_config.get('stats_file', 'db_stats')))
+
+    if row_counter is not None:
+        row_counter.close()
+    adapter.close()
+    if instrumentation is not None:
+        instrumentation.save()
+    return summary
+
+
+def _count_tables(tables, summary):
+    for schema, table_name, table_data in tables:
+        summary['views' if table_data['type'] == 'VIEW' else 'tables'] += 1
+        summary['columns'] += len(table_data['columns'])
+        summary['rows'] += max(table_data.get('row_count') or 0, 0)
+        yield schema, table_name, table_data
+
+
+def _run_target(connection, db_config, options, output_config, directory):
+    try:
+        connection.send(('ok', explore_target(db_config, options, output_config, directory)))
+    except BaseException as error:
+        connection.send(('failed', f"{type(error).__name__}: {str(error).strip()}"))
+    finally:
+        connection.close()
+
+
+class FleetRunner:
+    def __init__(self, targets, output_config, output_dir='fleet', processes=4, target_timeout=None):
+        self.targets = targets
+        self.output_config = output_config
+        self.output_dir = output_dir
+        self.processes = max(1, processes)
+        self.target_timeout = target_timeout
+        self.context = multiprocessing.get_context()
+
+    def run(self):
+        pending = list(self.targets)
+        running = {}
+        results = {}
+        while pending or running:
+            while pending and len(running) < self.processes:
+                name, db_config, options = pending.pop(0)
+                receiver, sender = self.context.Pipe(duplex=False)
+                process = self.context.Process(
+                    target=_run_target,
+                    args=(sender, db_config, options, self.output_config, os.path.join(self.output_dir, name)),
+                    daemon=True,
+                )
+                process.start()
+                sender.close()
+                running[receiver] = (name, db_config['type'], process, time.monotonic())
+
+            for receiver in wait(list(running), timeout=self._wait_timeout(running)):
+                name, db_type, process, started = running.pop(receiver)
+                try:
+                    status, payload = receiver.recv()
+                except EOFError:
+                    status, payload = 'failed', f"worker exited with code {process.exitcode}"
+                process.join()
+                receiver.close()
+                results[name] = self._result(status, payload, db_type, started)
+
+            if self.target_timeout is not None:
+                now = time.monotonic()
+                for receiver, (name, db_type, process, started) in list(running.items()):
+                    if now - started >= self.target_timeout:
+                        process.terminate()
+                        process.join()
+                        receiver.close()
+                        del running[receiver]
+                        results[name] = self._result('timed_out', f"no result after {self.target_timeout}s",
+                                                     db_type, started)
+        return {name: results[name] for name, _, _ in self.targets}
+
+    def _wait_timeout(self, running):
+        if self.target_timeout is None:
+            return None
+        now = time.monotonic()
+        return max(0, min(started + self.target_timeout - now for _, _, _, started in running.values()))
+
+    @staticmethod
+    def _result(status, payload, db_type, started):
+        result = {'status': status, 'type': db_type, 'elapsed_seconds': round(time.monotonic() - started, 3)}
+        if status == 'ok':
+            result.update(payload)
+        else:
+            result['error'] = payload
+        return result
+
+
+def summarize(results):
+    totals = {'targets': len(results), 'ok': 0, 'failed': 0, 'timed_out': 0, **{key: 0 for key in TOTAL_FIELDS}}
+    by_type = {}
+    for result in results.values():
+        totals[result['status']] += 1
+        if result['status'] != 'ok':
+            continue
+        group = by_type.setdefault(result['type'], {'targets': 0, **{key: 0 for key in TOTAL_FIELDS}})
+        group['targets'] += 1
+        for key in TOTAL_FIELDS:
+            totals[key] += result[key]
+            group[key] += result[key]
+    return {'totals': totals, 'by_type': by_type, 'targets': results}
+
+
+def main():
+    with open('config.json', 'r') as f:
+        config = json.load(f)
+
+    fleet = config['fleet']
+    output_config = config.get('output', {})
+    options = config.get('options', {})
+    defaults = dict(config.get('database', {}), **fleet.get('defaults', {}))
+
+    targets = []
+    for target in fleet['targets']:
+        db_config = dict(defaults, **{key: value for key, value in target.items() if key not in ('name', 'options')})
+        targets.append((target_name(target), db_config, dict(options, **target.get('options', {}))))
+    if len({name for name, _, _ in targets}) != len(targets):
+        raise ValueError("Fleet target names must be unique")
+
+    output_dir = fleet.get('output_dir', 'fleet')
+    os.makedirs(output_dir, exist_ok=True)
+    runner = FleetRunner(
+        targets,
+        output_config,
+        output_dir=output_dir,
+        processes=fleet.get('processes', 4),
+        target_timeout=fleet.get('target_timeout_seconds'),
+    )
+    summary = summarize(runner.run())
+
+    if output_config.get('human_readable_sizes', True):
+        for entry in [summary['totals'], *summary['by_type'].values(), *summary['targets'].values()]:
+            if 'size' in entry:
+                entry['size'] = format_bytes(entry['size'])
+
+    format_type = output_config.get('format', 'json')
+    writer = OutputWriter('json' if format_type in ('sqlite', 'jsonl', 'ndjson') else format_type)
+    writer.write(summary, os.path.join(output_dir, fleet.get('summary_file', 'fleet_summary')))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,14 @@
 from .mysql_adapter import MySQLAdapter
 from .postgresql_adapter import PostgreSQLAdapter
 from .sql_server_adapter import SQLServerAdapter
-from .get_adapter import get_adapter
\ No newline at end of file
+from .get_adapter import get_adapter
+from .connection_pool import ConnectionPool
+from .structure_explorer import StructureExplorer
+from .async_structure_explorer import AsyncStructureExplorer
+from .get_async_adapter import get_async_adapter
+from .metadata_cache import MetadataCache
+from .catalog_snapshot import CatalogSnapshot
+from .row_counter import RowCounter
+from .instrumentation import Instrumentation
+from .query_scheduler import QueryScheduler
+from .catalog import Catalog
@@ -0,0 +1,138 @@
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncDatabaseAdapter(ABC):
+    def __init__(self, adapter, size=4):
+        self.adapter = adapter
+        self.config = adapter.config
+        self.size = max(1, size)
+        self.partitions = adapter.partitions
+        self._idle = None
+        self._connections = []
+
+    async def connect(self):
+        self._idle = asyncio.LifoQueue()
+        conn = await self.open_connection()
+        self._connections.append(conn)
+        self._idle.put_nowait(conn)
+
+    @abstractmethod
+    async def open_connection(self):
+        pass
+
+    @abstractmethod
+    async def _execute(self, conn, sql, params):
+        pass
+
+    @abstractmethod
+    async def _close_connection(self, conn):
+        pass
+
+    async def _rollback(self, conn):
+        pass
+
+    async def get_schemas(self):
+        query = self.adapter._schemas_query()
+        if query is None:
+            return self.adapter.get_schemas()
+        return [row[0] for row in await self._fetch(*query)]
+
+    async def get_tables(self, schema):
+        return await self._fetch(*self.adapter._tables_query(schema))
+
+    async def get_schema_catalog(self, schema, tables=None):
+        if tables is None:
+            tables = await self.get_tables(schema)
+        if not tables:
+            return {}
+
+        queries = self.adapter._catalog_queries(schema, self.adapter._catalog_filter(tables))
+        rows = await asyncio.gather(*(self._fetch_or_empty(sql, params) for sql, params in queries.values()))
+        results = {key: self.adapter._group_by_table(result) for key, result in zip(queries, rows)}
+        return self.adapter._assemble_catalog(tables, results)
+
+    async def get_partitions(self, schema):
+        query = self.adapter._partitions_query(schema) if self.partitions != 'expand' else None
+        if query is None:
+            return {}
+        return self.adapter._group_partitions(await self._fetch(*query))
+
+    async def get_table_fingerprints(self, schema):
+        rows = await self._fetch(*self.adapter._fingerprints_query(schema))
+        return {name: str(fingerprint) for name, fingerprint in rows if fingerprint is not None}
+
+    async def get_table_estimates(self, schema, tables):
+        if not tables:
+            return {}
+        sql, params = self.adapter._catalog_queries(schema, self.adapter._catalog_filter(tables))['estimates']
+        return {row[0]: (row[1], row[2]) for row in await self._fetch(sql, params)}
+
+    async def close(self):
+        connections, self._connections = self._connections, []
+        for conn in connections:
+            await self._close_connection(conn)
+
+    async def _fetch(self, sql, params=()):
+        conn = await self._checkout()
+        try:
+            return await self._execute(conn, sql, params)
+        except Exception:
+            await self._rollback(conn)
+            raise
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def _fetch_or_empty(self, sql, params=()):
+        try:
+            return await self._fetch(sql, params)
+        except Exception:
+            return []
+
+    async def _checkout(self):
+        if self._idle.empty() and len(self._connections) < self.size:
+            placeholder = object()
+            self._connections.append(placeholder)
+            try:
+                conn = await self.open_connection()
+            finally:
+                self._connections.remove(placeholder)
+            self._connections.append(conn)
+            return conn
+        return await self._idle.get()
+
+
+class ExecutorAsyncAdapter(AsyncDatabaseAdapter):
+    def __init__(self, adapter, size=4):
+        super().__init__(adapter, size)
+        self._executor = ThreadPoolExecutor(max_workers=self.size)
+
+    async def open_connection(self):
+        return await self._run(self.adapter.spawn)
+
+    async def get_schemas(self):
+        return await self._fetch_with(lambda conn: conn.get_schemas())
+
+    async def _execute(self, conn, sql, params):
+        return await self._run(conn._fetch, sql, params)
+
+    async def _rollback(self, conn):
+        await self._run(conn._reset)
+
+    async def _close_connection(self, conn):
+        await self._run(conn.close)
+
+    async def close(self):
+        await super().close()
+        self._executor.shutdown(wait=False)
+
+    async def _fetch_with(self, fn):
+        conn = await self._checkout()
+        try:
+            return await self._run(fn, conn)
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
@@ -0,0 +1,27 @@
+from explorer.async_adapter import AsyncDatabaseAdapter
+
+
+class AsyncMySQLAdapter(AsyncDatabaseAdapter):
+    async def open_connection(self):
+        import aiomysql
+
+        conn = await aiomysql.connect(
+            host=self.config['host'],
+            port=self.config['port'],
+            db=self.config['database'],
+            user=self.config['user'],
+            password=self.config['password'],
+            autocommit=True,
+        )
+        async with conn.cursor() as cursor:
+            await cursor.execute("SET SESSION TRANSACTION READ ONLY")
+            await cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s", (self.adapter._statement_timeout_ms(),))
+        return conn
+
+    async def _execute(self, conn, sql, params):
+        async with conn.cursor() as cursor:
+            await cursor.execute(sql, params or None)
+            return [tuple(row) for row in await cursor.fetchall()]
+
+    async def _close_connection(self, conn):
+        conn.close()
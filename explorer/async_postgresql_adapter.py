@@ -0,0 +1,26 @@
+from explorer.async_adapter import AsyncDatabaseAdapter
+
+
+class AsyncPostgreSQLAdapter(AsyncDatabaseAdapter):
+    async def open_connection(self):
+        import psycopg
+
+        conn = await psycopg.AsyncConnection.connect(
+            host=self.config['host'],
+            port=self.config['port'],
+            dbname=self.config['database'],
+            user=self.config['user'],
+            password=self.config['password'],
+            autocommit=True,
+        )
+        await conn.execute("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY")
+        await conn.execute(f"SET statement_timeout = {self.adapter._statement_timeout_ms()}")
+        return conn
+
+    async def _execute(self, conn, sql, params):
+        async with conn.cursor() as cursor:
+            await cursor.execute(sql, params)
+            return [tuple(row) for row in await cursor.fetchall()]
+
+    async def _close_connection(self, conn):
+        await conn.close()
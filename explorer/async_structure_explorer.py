@@ -0,0 +1,59 @@
+import asyncio
+
+
+class AsyncStructureExplorer:
+    def __init__(self, adapter, ignored_tables, chunk_size=200, cache=None):
+        self.adapter = adapter
+        self.ignored_tables = ignored_tables
+        self.chunk_size = chunk_size
+        self.cache = cache
+
+    async def explore(self):
+        schemas = await self.adapter.get_schemas()
+        schema_tables = await asyncio.gather(*(self.adapter.get_tables(schema) for schema in schemas))
+        schema_tables = {
+            schema: [(name, ttype) for name, ttype in tables if name not in self.ignored_tables]
+            for schema, tables in zip(schemas, schema_tables)
+        }
+        partitioned = dict(zip(schemas, await asyncio.gather(*(self.adapter.get_partitions(schema)
+                                                                  for schema in schemas))))
+        found = {schema: {} for schema in schemas}
+        fingerprints = {}
+        tasks = []
+
+        if self.cache is not None:
+            results = await asyncio.gather(*(self.adapter.get_table_fingerprints(schema) for schema in schemas))
+            fingerprints = dict(zip(schemas, results))
+
+        for schema in schemas:
+            tables = schema_tables[schema]
+            if self.cache is not None:
+                found[schema], tables = self.cache.partition(schema, tables, fingerprints[schema])
+                if found[schema]:
+                    estimates = await self.adapter.get_table_estimates(schema, schema_tables[schema])
+                    self.cache.refresh_estimates(found[schema], estimates)
+            for start in range(0, len(tables), self.chunk_size):
+                tasks.append((schema, tables[start:start + self.chunk_size]))
+
+        semaphore = asyncio.Semaphore(self.adapter.size)
+
+        async def fetch(schema, tables):
+            async with semaphore:
+                return await self.adapter.get_schema_catalog(schema, tables)
+
+        results = await asyncio.gather(*(fetch(schema, tables) for schema, tables in tasks))
+        for (schema, _), catalog in zip(tasks, results):
+            found[schema].update(catalog)
+            if self.cache is not None:
+                self.cache.store(schema, catalog, fingerprints[schema])
+
+        all_data = {}
+        for schema in schemas:
+            all_data[schema] = {name: found[schema][name] for name, _ in schema_tables[schema] if name in found[schema]}
+            self.adapter.adapter._attach_partitions(all_data[schema], partitioned[schema])
+            if self.cache is not None:
+                self.cache.retain(schema, all_data[schema])
+        if self.cache is not None:
+            self.cache.retain_schemas(schemas)
+            self.cache.save()
+        return all_data
@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, max_entries=1024, ttl_seconds=300, clock=time.monotonic):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        expires = self.clock() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, predicate):
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+
+class Catalog:
+    def __init__(self, adapter, ignored_tables=(), max_tables=1024, ttl_seconds=300, prefetch_size=200):
+        self.adapter = adapter
+        self.ignored_tables = set(ignored_tables)
+        self.prefetch_size = max(1, prefetch_size)
+        self.listings = LRUCache(max(16, max_tables // 16), ttl_seconds)
+        self.cache = LRUCache(max_tables, ttl_seconds)
+
+    def schemas(self):
+        schemas = self.listings.get(None)
+        if schemas is MISSING:
+            schemas = self.adapter.get_schemas()
+            self.listings.put(None, schemas)
+        return list(schemas)
+
+    def tables(self, schema):
+        tables = self.listings.get(schema)
+        if tables is MISSING:
+            tables = {name: table_type for name, table_type in self.adapter.get_tables(schema)
+                      if name not in self.ignored_tables}
+            self.listings.put(schema, tables)
+        return dict(tables)
+
+    def table(self, schema, table):
+        data = self.cache.get((schema, table))
+        if data is MISSING:
+            tables = self.tables(schema)
+            if table not in tables:
+                raise KeyError(f"{schema}.{table}")
+            data = self._load(schema, [(table, tables[table])]).get(table)
+            if data is None:
+                raise KeyError(f"{schema}.{table}")
+        return data
+
+    def columns(self, schema, table):
+        return self.table(schema, table)['columns']
+
+    def constraints(self, schema, table):
+        return self.table(schema, table)['constraints']
+
+    def indexes(self, schema, table):
+        return self.table(schema, table)['indexes']
+
+    def iter_tables(self, schema):
+        tables = list(self.tables(schema).items())
+        for start in range(0, len(tables), self.prefetch_size):
+            chunk = tables[start:start + self.prefetch_size]
+            cached = {name: self.cache.get((schema, name)) for name, _ in chunk}
+            missing = [(name, table_type) for name, table_type in chunk if cached[name] is MISSING]
+            if missing:
+                cached.update(self._load(schema, missing))
+            for name, _ in chunk:
+                if cached.get(name, MISSING) is not MISSING:
+                    yield name, cached[name]
+
+    def prefetch(self, schema, tables=None):
+        listed = self.tables(schema)
+        names = listed if tables is None else [name for name in tables if name in listed]
+        missing = [(name, listed[name]) for name in names if self.cache.get((schema, name)) is MISSING]
+        for start in range(0, len(missing), self.prefetch_size):
+            self._load(schema, missing[start:start + self.prefetch_size])
+
+    def invalidate(self, schema=None, table=None):
+        if schema is None:
+            self.listings.discard(lambda key: True)
+            self.cache.discard(lambda key: True)
+        elif table is None:
+            self.listings.discard(lambda key: key == schema)
+            self.cache.discard(lambda key: key[0] == schema)
+        else:
+            self.cache.discard(lambda key: key == (schema, table))
+
+    def stats(self):
+        return {
+            'cached_tables': len(self.cache),
+            'hits': self.cache.hits,
+            'misses': self.cache.misses,
+        }
+
+    def _load(self, schema, tables):
+        loaded = self.adapter.get_schema_catalog(schema, tables)
+        for name, data in loaded.items():
+            self.cache.put((schema, name), data)
+        return loaded
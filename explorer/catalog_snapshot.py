@@ -0,0 +1,34 @@
+class CatalogSnapshot:
+    def __init__(self, data):
+        self.data = data
+
+    @classmethod
+    def capture(cls, explorer):
+        return cls(explorer.explore())
+
+    @property
+    def schemas(self):
+        return list(self.data)
+
+    def tables(self, schema):
+        return self.data.get(schema, {})
+
+    def iter_tables(self):
+        for schema, tables in self.data.items():
+            for table_name, table_data in tables.items():
+                yield schema, table_name, table_data
+
+    def row_estimates(self):
+        return {(schema, table_name): table_data['row_count'] for schema, table_name, table_data in self.iter_tables()}
+
+    def foreign_keys(self, schema):
+        for table_name, table_data in self.tables(schema).items():
+            for constraint in table_data['constraints']:
+                name, constraint_type, column, _, foreign_table, foreign_column = constraint
+                if constraint_type == 'FOREIGN KEY':
+                    yield table_name, column, foreign_table, foreign_column, name
+
+    def columns(self, schema):
+        for table_name, table_data in self.tables(schema).items():
+            for column in table_data['columns']:
+                yield (table_name,) + tuple(column)
@@ -0,0 +1,72 @@
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    def __init__(self, adapter, size=1, share_adapter=True):
+        self.adapter = adapter
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._shared = 1 if share_adapter else 0
+        if share_adapter:
+            self._idle.put(adapter)
+        self._spawned = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @contextmanager
+    def acquire(self):
+        adapter = self._checkout()
+        try:
+            yield adapter
+        finally:
+            self._idle.put(adapter)
+
+    def map(self, fn, items):
+        return list(self.imap(fn, items))
+
+    def imap(self, fn, items):
+        def run(item):
+            with self.acquire() as adapter:
+                return fn(adapter, item)
+
+        if self.size == 1:
+            for item in items:
+                yield run(item)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            pending = deque()
+            for item in items:
+                pending.append(executor.submit(run, item))
+                if len(pending) >= self.size * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def close(self):
+        with self._lock:
+            spawned, self._spawned = self._spawned, []
+        for adapter in spawned:
+            adapter.close()
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._spawned) + self._shared < self.size:
+                adapter = self.adapter.spawn()
+                self._spawned.append(adapter)
+                return adapter
+        return self._idle.get()
@@ -2,14 +2,35 @@ from abc import ABC, abstractmethod
 
 
 class DatabaseAdapter(ABC):
+    param_marker = '%s'
+    catalog_filter_limit = 500
+    query_errors = (Exception,)
+
     def __init__(self, config):
         self.config = config
         self.conn = None
+        self.instruments = None
+        self.scheduler = None
+        self.statement_timeout = config.get('timeout', 60)
+        self.fetch_batch_size = max(1, config.get('fetch_batch_size', 1000))
+        self.partitions = config.get('partitions', 'collapse')
 
-    @abstractmethod
     def connect(self):
+        self.conn = self.open_connection()
+
+    @abstractmethod
+    def open_connection(self):
         pass
 
+    def spawn(self):
+        adapter = type(self)(self.config)
+        if self.instruments is not None:
+            self.instruments.attach(adapter)
+        adapter.scheduler = self.scheduler
+        adapter.statement_timeout = self.statement_timeout
+        adapter.connect()
+        return adapter
+
     @abstractmethod
     def get_schemas(self):
         pass
@@ -38,6 +59,357 @@ class DatabaseAdapter(ABC):
     def get_table_size(self, schema, table):
         pass
 
+    @abstractmethod
+    def _tables_query(self, schema):
+        pass
+
+    @abstractmethod
+    def _catalog_queries(self, schema, tables=None):
+        pass
+
+    @abstractmethod
+    def _fingerprints_query(self, schema):
+        pass
+
+    @abstractmethod
+    def _table_stats_query(self, schema, top_n=None, min_rows=None):
+        pass
+
+    @abstractmethod
+    def get_column_statistics(self, schema):
+        pass
+
+    @abstractmethod
+    def _containment_query(self, schema, from_table, from_column, to_table, to_column, sample_rows, fraction,
+                           to_schema=None):
+        pass
+
+    @abstractmethod
+    def _hash_expression(self, column):
+        pass
+
     @abstractmethod
     def close(self):
         pass
+
+    def get_schema_catalog(self, schema, tables=None):
+        if tables is None:
+            tables = self.get_tables(schema)
+        if not tables:
+            return {}
+
+        results = {}
+        for key, (sql, params) in self._catalog_queries(schema, self._catalog_filter(tables)).items():
+            try:
+                results[key] = self._group_by_table(self._iter_rows(sql, params))
+            except Exception as error:
+                self._note_failure(error)
+                self._reset()
+                results[key] = {}
+        return self._assemble_catalog(tables, results)
+
+    def iter_catalog_rows(self, schema, key, tables=None):
+        sql, params = self._catalog_queries(schema, self._catalog_filter(tables) if tables else None)[key]
+        return self._iter_rows(sql, params)
+
+    def iter_rows(self, sql, params=()):
+        return self._iter_rows(sql, params)
+
+    def get_table_fingerprints(self, schema):
+        return {name: str(fingerprint) for name, fingerprint in self._iter_rows(*self._fingerprints_query(schema))
+                if fingerprint is not None}
+
+    def get_table_estimates(self, schema, tables):
+        if not tables:
+            return {}
+        sql, params = self._catalog_queries(schema, self._catalog_filter(tables))['estimates']
+        return {row[0]: (row[1], row[2]) for row in self._iter_rows(sql, params)}
+
+    def get_partitions(self, schema):
+        query = self._partitions_query(schema) if self.partitions != 'expand' else None
+        if query is None:
+            return {}
+        return self._group_partitions(self._iter_rows(*query))
+
+    def get_index_details(self, schema):
+        query = self._index_columns_query(schema)
+        if query is None:
+            return {}
+        indexes = {}
+        for table_name, name, method, unique, primary, condition, _, column in self._iter_rows(*query):
+            index = indexes.setdefault(table_name, {}).setdefault(name, {
+                'method': method,
+                'unique': bool(unique),
+                'primary': bool(primary),
+                'condition': condition,
+                'columns': [],
+                'scans': None,
+                'size': None,
+            })
+            index['columns'].append(column)
+
+        query = self._index_usage_query(schema)
+        if query is not None:
+            try:
+                for table_name, name, scans, size in self._iter_rows(*query):
+                    index = indexes.get(table_name, {}).get(name)
+                    if index is not None:
+                        index['scans'] = int(scans) if scans is not None else None
+                        index['size'] = int(size) if size is not None else None
+            except Exception as error:
+                self._note_failure(error)
+                self._reset()
+        return indexes
+
+    def get_table_stats(self, schema, top_n=None, min_rows=None):
+        return self._fetch(*self._table_stats_query(schema, top_n, min_rows))
+
+    def get_containment_sample(self, schema, from_table, from_column, to_table, to_column, sample_rows,
+                               row_estimate=None, timeout=None, to_schema=None):
+        fraction = 1.0
+        if row_estimate and row_estimate > 0:
+            fraction = min(1.0, sample_rows * 4 / row_estimate)
+        sql, params = self._containment_query(schema, from_table, from_column, to_table, to_column, sample_rows,
+                                              fraction, to_schema)
+        sampled, matched = self._fetch_with_timeout(sql, params, timeout)[0]
+        return sampled or 0, matched or 0
+
+    def get_profile_sample(self, schema, table, columns, sample_rows, row_estimate=None, timeout=None):
+        fraction = 1.0
+        if row_estimate and row_estimate > 0:
+            fraction = min(1.0, sample_rows * 4 / row_estimate)
+        sql, params = self._profile_query(schema, table, columns, sample_rows, fraction)
+        return self._fetch_with_timeout(sql, params, timeout)[0]
+
+    def _profile_query(self, schema, table, columns, sample_rows, fraction):
+        source, params = self._sample_source(schema, table, [column for column, _, _ in columns], sample_rows, fraction)
+        aggregates = []
+        for position, (_, distinct, ordered) in enumerate(columns):
+            value = f"s.c{position}"
+            aggregates += [
+                f"COUNT({value})",
+                f"COUNT(DISTINCT {value})" if distinct else "NULL",
+                f"MIN({value})" if ordered else "NULL",
+                f"MAX({value})" if ordered else "NULL",
+                f"AVG({self._width_expression(value)} * 1.0)",
+            ]
+        return f"SELECT COUNT(*), {', '.join(aggregates)} FROM ({source}) s;", params
+
+    def _sample_source(self, schema, table, columns, sample_rows, fraction):
+        selected = ', '.join(f"{self.quote_identifier(column)} AS c{position}"
+                             for position, column in enumerate(columns))
+        clause = self._tablesample_clause(fraction * 100) if fraction < 1 else None
+        return (f"SELECT {selected} FROM {self._qualified_name(schema, table)} {clause or ''} "
+                f"LIMIT {self.param_marker}", (sample_rows,))
+
+    def _width_expression(self, value):
+        return f"LENGTH({value})"
+
+    def get_hash_sample(self, schema, table, columns, threshold, timeout=None, percent=None):
+        sql, params = self._hash_sample_query(schema, table, columns, threshold, percent)
+        return self._fetch_with_timeout(sql, params, timeout)
+
+    def _hash_sample_query(self, schema, table, columns, threshold, percent=None):
+        selected = ', '.join(
+            f"{self.quote_identifier(column)} AS v{position}, {self._hash_expression(column)} AS h{position}"
+            for position, column in enumerate(columns)
+        )
+        condition = ' OR '.join(f"h{position} < {self.param_marker}" for position in range(len(columns)))
+        sql = f"""
+            SELECT *
+            FROM (SELECT {selected}
+                  FROM {self._qualified_name(schema, table)} {self._block_sample(percent)}) s
+            WHERE {condition};
+        """
+        return sql, (threshold,) * len(columns)
+
+    def get_lowest_hashes(self, schema, table, column, size, timeout=None, percent=None):
+        sql, params = self._lowest_hashes_query(schema, table, column, size, percent)
+        return [row[0] for row in self._fetch_with_timeout(sql, params, timeout)]
+
+    def _lowest_hashes_query(self, schema, table, column, size, percent=None):
+        return f"""
+            SELECT DISTINCT {self._hash_expression(column)} AS h
+            FROM {self._qualified_name(schema, table)} {self._block_sample(percent)}
+            WHERE {self.quote_identifier(column)} IS NOT NULL
+            ORDER BY h
+            LIMIT %s;
+        """, (size,)
+
+    def _block_sample(self, percent):
+        if percent is None or percent >= 100:
+            return ""
+        return self._tablesample_clause(percent) or ""
+
+    def get_sampled_row_count(self, schema, table, percent, key_column=None, timeout=None):
+        clause = self._tablesample_clause(percent)
+        if clause is None:
+            return None
+        sql = f"SELECT COUNT(*) FROM {self._qualified_name(schema, table)} {clause};"
+        sampled = self._fetch_with_timeout(sql, (), timeout)[0][0]
+        return int(round(sampled * 100 / percent))
+
+    def get_exact_row_count(self, schema, table, key_column=None, lower=None, upper=None, timeout=None):
+        sql = f"SELECT COUNT(*) FROM {self._qualified_name(schema, table)}"
+        params = ()
+        if key_column is not None:
+            column = self.quote_identifier(key_column)
+            sql += f" WHERE {column} >= {self.param_marker} AND {column} < {self.param_marker}"
+            params = (lower, upper)
+        return self._fetch_with_timeout(sql, params, timeout)[0][0]
+
+    def get_key_range(self, schema, table, column, timeout=None):
+        column = self.quote_identifier(column)
+        sql = f"SELECT MIN({column}), MAX({column}) FROM {self._qualified_name(schema, table)};"
+        return self._fetch_with_timeout(sql, (), timeout)[0]
+
+    def _tablesample_clause(self, percent):
+        return None
+
+    def quote_identifier(self, name):
+        return '"' + name.replace('"', '""') + '"'
+
+    def _qualified_name(self, schema, table):
+        return f"{self.quote_identifier(schema)}.{self.quote_identifier(table)}"
+
+    def _schemas_query(self):
+        return None
+
+    def _partitions_query(self, schema):
+        return None
+
+    def _index_columns_query(self, schema):
+        return None
+
+    def _index_usage_query(self, schema):
+        return None
+
+    def _catalog_filter(self, tables):
+        if len(tables) > self.catalog_filter_limit:
+            return None
+        return [name for name, _ in tables]
+
+    @staticmethod
+    def _assemble_catalog(tables, results):
+        catalog = {}
+        for table_name, table_type in tables:
+            estimates = results['estimates'].get(table_name)
+            row_count, size = estimates[0] if estimates else (None, None)
+            catalog[table_name] = {
+                'type': table_type,
+                'row_count': row_count,
+                'size': size,
+                'columns': results['columns'].get(table_name, []),
+                'constraints': results['constraints'].get(table_name, []),
+                'indexes': results['indexes'].get(table_name, []),
+            }
+        return catalog
+
+    def _table_filter(self, column, tables):
+        if tables is None:
+            return "", ()
+        placeholders = ', '.join([self.param_marker] * len(tables))
+        return f"AND {column} IN ({placeholders})", tuple(tables)
+
+    def _fetch(self, sql, params=()):
+        return self._scheduled(self._execute, sql, params)
+
+    def _fetch_with_timeout(self, sql, params, timeout):
+        if timeout is None:
+            return self._fetch(sql, params)
+        return self._scheduled(self._execute_with_timeout, sql, params, timeout)
+
+    def _scheduled(self, execute, sql, *args):
+        if self.scheduler is None:
+            return execute(sql, *args)
+        return self.scheduler.run(self, execute, sql, *args)
+
+    def _execute(self, sql, params):
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        return self._fetched([tuple(row) for row in cursor.fetchall()])
+
+    def _execute_with_timeout(self, sql, params, timeout):
+        return self._execute(sql, params)
+
+    def _iter_rows(self, sql, params=()):
+        cursor, rows = self._scheduled(self._open_stream, sql, params)
+        try:
+            while rows:
+                yield from self._fetched([tuple(row) for row in rows])
+                rows = cursor.fetchmany(self.fetch_batch_size)
+        finally:
+            self._close_stream(cursor)
+
+    def _open_stream(self, sql, params):
+        cursor = self._stream_cursor()
+        try:
+            cursor.execute(sql, params)
+            return cursor, cursor.fetchmany(self.fetch_batch_size)
+        except Exception:
+            self._close_stream(cursor)
+            raise
+
+    def _stream_cursor(self):
+        return self.conn.cursor()
+
+    def _close_stream(self, cursor):
+        cursor.close()
+
+    def _statement_timeout_ms(self, timeout=None):
+        timeout = self.statement_timeout if timeout is None else timeout
+        return max(1, int(timeout * 1000)) if timeout else 0
+
+    def _is_transient(self, error):
+        return False
+
+    def _recover(self):
+        try:
+            self._reset()
+        except Exception:
+            try:
+                self.close()
+            except Exception:
+                pass
+            self.connect()
+
+    def _fetched(self, rows):
+        if self.instruments is not None:
+            self.instruments.fetched(rows)
+        return rows
+
+    def _note_failure(self, error):
+        if self.instruments is not None:
+            self.instruments.failure(error)
+
+    def _note_retry(self, method=None, count=1):
+        if self.instruments is not None:
+            self.instruments.retry(method, count)
+
+    def _reset(self):
+        pass
+
+    def _group_partitions(self, rows):
+        partitioned = {}
+        for table_name, strategy, name, bound, row_count, size in rows:
+            info = partitioned.setdefault(table_name, {'strategy': strategy, 'count': 0})
+            info['count'] += 1
+            if self.partitions == 'details':
+                info.setdefault('details', []).append({'name': name, 'bound': bound, 'row_count': row_count,
+                                                       'size': size})
+        return partitioned
+
+    @staticmethod
+    def _attach_partitions(catalog, partitioned):
+        for table_name, data in catalog.items():
+            data.pop('partitions', None)
+            if table_name in partitioned:
+                data['partitions'] = partitioned[table_name]
+        return catalog
+
+    @staticmethod
+    def _group_by_table(rows):
+        grouped = {}
+        for row in rows:
+            grouped.setdefault(row[0], []).append(row[1:])
+        return grouped
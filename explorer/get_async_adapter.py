@@ -0,0 +1,21 @@
+import importlib.util
+
+from . import PostgreSQLAdapter, MySQLAdapter
+from .async_adapter import ExecutorAsyncAdapter
+from .async_mysql_adapter import AsyncMySQLAdapter
+from .async_postgresql_adapter import AsyncPostgreSQLAdapter
+from .get_adapter import get_adapter
+
+
+def get_async_adapter(db_type, config, size=4, timeout=None):
+    adapter = get_adapter(db_type, config)
+    if timeout is not None:
+        adapter.statement_timeout = timeout
+    native_adapters = [
+        (PostgreSQLAdapter, 'psycopg', AsyncPostgreSQLAdapter),
+        (MySQLAdapter, 'aiomysql', AsyncMySQLAdapter),
+    ]
+    for adapter_class, driver, async_class in native_adapters:
+        if isinstance(adapter, adapter_class) and importlib.util.find_spec(driver):
+            return async_class(adapter, size)
+    return ExecutorAsyncAdapter(adapter, size)
@@ -0,0 +1,339 @@
+import bisect
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+SIZE_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000, 10000000)
+UNINSTRUMENTED = {'connect', 'spawn', 'close', 'open_connection', 'quote_identifier'}
+SAMPLE_ROWS = 32
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for position, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bounds[position], self.max) if position < len(self.bounds) else self.max
+        return self.max
+
+    def cumulative(self):
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds + ('+Inf',), self.counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'min': self.min,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'buckets': {str(bound): count for bound, count in self.cumulative()},
+        }
+
+
+class CallStats:
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.rows = 0
+        self.bytes = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.row_sizes = Histogram(SIZE_BUCKETS)
+
+    def record(self, elapsed, rows, size, failed):
+        self.calls += 1
+        self.failures += failed
+        self.rows += rows
+        self.bytes += size
+        self.latency.observe(elapsed)
+        self.row_sizes.observe(rows)
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'retries': self.retries,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'latency_seconds': self.latency.to_dict(),
+            'rows_per_call': self.row_sizes.to_dict(),
+        }
+
+
+class _Frame:
+    __slots__ = ('method', 'schema', 'table', 'rows', 'bytes', 'fetches', 'error')
+
+    def __init__(self, method, schema, table):
+        self.method = method
+        self.schema = schema
+        self.table = table
+        self.rows = 0
+        self.bytes = 0
+        self.fetches = 0
+        self.error = None
+
+
+class Instrumentation:
+    def __init__(self, report_file=None, trace_file=None, trace_format='chrome', max_trace_events=200000,
+                 max_errors=50):
+        self.report_file = report_file
+        self.trace_file = trace_file
+        self.trace_format = trace_format
+        self.max_trace_events = max_trace_events
+        self.methods = {}
+        self.tables = {}
+        self.error_counts = {}
+        self.errors = deque(maxlen=max_errors)
+        self.trace_events = []
+        self.dropped_events = 0
+        self.started_at = datetime.now(timezone.utc)
+        self.origin = time.perf_counter()
+        self._signatures = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            report_file=config.get('report_file', 'db_run_report'),
+            trace_file=config.get('trace_file'),
+            trace_format=config.get('trace_format', 'chrome'),
+            max_trace_events=config.get('max_trace_events', 200000),
+        )
+
+    def attach(self, adapter):
+        adapter.instruments = self
+        for name, (schema_index, table_index) in self._arguments(type(adapter)).items():
+            setattr(adapter, name, self._wrap(name, getattr(adapter, name), schema_index, table_index))
+        return adapter
+
+    def fetched(self, rows):
+        frames = getattr(self._local, 'frames', None)
+        if not frames:
+            return
+        size = estimate_bytes(rows)
+        for frame in frames:
+            frame.rows += len(rows)
+            frame.bytes += size
+            frame.fetches += 1
+
+    def failure(self, error):
+        frames = getattr(self._local, 'frames', None)
+        if frames:
+            frames[-1].error = error
+
+    def retry(self, method=None, count=1):
+        if method is None:
+            frames = getattr(self._local, 'frames', None)
+            method = frames[-1].method if frames else 'query'
+        with self._lock:
+            self.methods.setdefault(method, CallStats()).retries += count
+
+    def report(self):
+        with self._lock:
+            return {
+                'started_at': self.started_at.isoformat(),
+                'elapsed_seconds': round(time.perf_counter() - self.origin, 3),
+                'methods': {name: stats.to_dict() for name, stats in sorted(self.methods.items())},
+                'tables': {
+                    schema: {table: stats.to_dict() for table, stats in sorted(tables.items())}
+                    for schema, tables in sorted(self.tables.items())
+                },
+                'error_counts': dict(sorted(self.error_counts.items())),
+                'recent_errors': list(self.errors),
+                'dropped_trace_events': self.dropped_events,
+            }
+
+    def save(self):
+        if self.report_file:
+            _write_atomic(self.report_file + '.json', json.dumps(self.report(), indent=2, default=str))
+        if self.trace_file:
+            if self.trace_format == 'prometheus':
+                _write_atomic(self.trace_file + '.prom', self.prometheus())
+            else:
+                with self._lock:
+                    trace = {'traceEvents': list(self.trace_events), 'displayTimeUnit': 'ms'}
+                _write_atomic(self.trace_file + '.json', json.dumps(trace, default=str))
+
+    def prometheus(self, prefix='dbexplorer_adapter'):
+        with self._lock:
+            methods = sorted(self.methods.items())
+            lines = [f"# TYPE {prefix}_call_duration_seconds histogram"]
+            for method, stats in methods:
+                label = f'method="{_label(method)}"'
+                for bound, count in stats.latency.cumulative():
+                    lines.append(f'{prefix}_call_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f"{prefix}_call_duration_seconds_sum{{{label}}} {stats.latency.sum:.6f}")
+                lines.append(f"{prefix}_call_duration_seconds_count{{{label}}} {stats.latency.count}")
+            for counter in ('calls', 'failures', 'retries', 'rows', 'bytes'):
+                lines.append(f"# TYPE {prefix}_{counter}_total counter")
+                for method, stats in methods:
+                    lines.append(f'{prefix}_{counter}_total{{method="{_label(method)}"}} {getattr(stats, counter)}')
+        return '\n'.join(lines) + '\n'
+
+    def _arguments(self, adapter_class):
+        if adapter_class not in self._signatures:
+            arguments = {}
+            for name, member in inspect.getmembers(adapter_class, inspect.isfunction):
+                if name.startswith('_') or name in UNINSTRUMENTED:
+                    continue
+                parameters = list(inspect.signature(member).parameters)[1:]
+                schema_index = parameters.index('schema') if 'schema' in parameters else None
+                table_index = next((parameters.index(key) for key in ('table', 'from_table') if key in parameters),
+                                   None)
+                arguments[name] = (schema_index, table_index)
+            self._signatures[adapter_class] = arguments
+        return self._signatures[adapter_class]
+
+    def _wrap(self, name, method, schema_index, table_index):
+        def call(*args, **kwargs):
+            frames = self._frames()
+            schema = args[schema_index] if schema_index is not None and schema_index < len(args) else None
+            table = args[table_index] if table_index is not None and table_index < len(args) else None
+            frame = _Frame(name, schema, table)
+            frames.append(frame)
+            start = time.perf_counter()
+            result = None
+            try:
+                result = method(*args, **kwargs)
+                if inspect.isgenerator(result):
+                    return self._stream(frame, result, start)
+                return result
+            except Exception as error:
+                frame.error = error
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                frames.pop()
+                if not frame.fetches and isinstance(result, list):
+                    frame.rows, frame.bytes = len(result), estimate_bytes(result)
+                    for parent in frames:
+                        parent.rows += frame.rows
+                        parent.bytes += frame.bytes
+                if not inspect.isgenerator(result):
+                    self._record(frame, start, elapsed)
+
+        call.__wrapped__ = method
+        return call
+
+    def _stream(self, frame, rows, start):
+        try:
+            while True:
+                frames = self._frames()
+                frames.append(frame)
+                try:
+                    row = next(rows)
+                except StopIteration:
+                    return
+                except Exception as error:
+                    frame.error = error
+                    raise
+                finally:
+                    frames.pop()
+                yield row
+        finally:
+            rows.close()
+            self._record(frame, start, time.perf_counter() - start)
+
+    def _frames(self):
+        frames = getattr(self._local, 'frames', None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def _record(self, frame, start, elapsed):
+        failed = frame.error is not None
+        with self._lock:
+            self.methods.setdefault(frame.method, CallStats()).record(elapsed, frame.rows, frame.bytes, failed)
+            if frame.table is not None:
+                tables = self.tables.setdefault(str(frame.schema), {})
+                tables.setdefault(str(frame.table), CallStats()).record(elapsed, frame.rows, frame.bytes, failed)
+            if failed:
+                error_type = type(frame.error).__name__
+                self.error_counts[error_type] = self.error_counts.get(error_type, 0) + 1
+                self.errors.append({
+                    'method': frame.method,
+                    'schema': frame.schema,
+                    'table': frame.table,
+                    'error': f"{error_type}: {str(frame.error).strip()}",
+                })
+            if self.trace_file and self.trace_format != 'prometheus':
+                if len(self.trace_events) >= self.max_trace_events:
+                    self.dropped_events += 1
+                else:
+                    self.trace_events.append({
+                        'name': frame.method,
+                        'cat': 'adapter',
+                        'ph': 'X',
+                        'ts': int((start - self.origin) * 1000000),
+                        'dur': int(elapsed * 1000000),
+                        'pid': os.getpid(),
+                        'tid': threading.get_ident(),
+                        'args': {'schema': frame.schema, 'table': frame.table, 'rows': frame.rows,
+                                 'failed': failed},
+                    })
+
+
+def estimate_bytes(rows):
+    if not rows:
+        return 0
+    sample = rows[:SAMPLE_ROWS]
+    size = 0
+    for row in sample:
+        for value in row if isinstance(row, (tuple, list)) else (row,):
+            size += _value_size(value)
+    return size * len(rows) // len(sample)
+
+
+def _value_size(value):
+    if value is None:
+        return 1
+    if isinstance(value, (str, bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, (bool, int, float)):
+        return 8
+    return len(str(value))
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _write_atomic(filename, content):
+    tmp_path = filename + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, filename)
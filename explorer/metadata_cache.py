@@ -0,0 +1,68 @@
+import json
+import os
+
+RUN_FIELDS = ('row_count', 'row_count_method')
+
+
+class MetadataCache:
+    version = 1
+
+    def __init__(self, path, target):
+        self.path = path
+        self.target = target
+        self.schemas = {}
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if data.get('version') == self.version and data.get('target') == self.target:
+            self.schemas = data.get('schemas', {})
+        return self
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': self.version, 'target': self.target, 'schemas': self.schemas}, f, default=str)
+        os.replace(tmp_path, self.path)
+
+    def partition(self, schema, tables, fingerprints):
+        entries = self.schemas.get(schema, {})
+        cached = {}
+        stale = []
+        for table_name, table_type in tables:
+            entry = entries.get(table_name)
+            fingerprint = fingerprints.get(table_name)
+            if entry and fingerprint is not None and entry['fingerprint'] == fingerprint:
+                cached[table_name] = dict(entry['data'], type=table_type)
+            else:
+                stale.append((table_name, table_type))
+        return cached, stale
+
+    def refresh_estimates(self, cached, estimates):
+        for table_name, data in cached.items():
+            data.pop('row_count_method', None)
+            data['row_count'], data['size'] = estimates.get(table_name, (None, None))
+
+    def store(self, schema, catalog, fingerprints):
+        entries = self.schemas.setdefault(schema, {})
+        for table_name, data in catalog.items():
+            fingerprint = fingerprints.get(table_name)
+            if fingerprint is None:
+                entries.pop(table_name, None)
+            else:
+                entries[table_name] = {'fingerprint': fingerprint,
+                                       'data': {key: value for key, value in data.items() if key not in RUN_FIELDS}}
+
+    def retain(self, schema, table_names):
+        entries = self.schemas.get(schema, {})
+        for table_name in set(entries) - set(table_names):
+            del entries[table_name]
+
+    def retain_schemas(self, schemas):
+        for schema in set(self.schemas) - set(schemas):
+            del self.schemas[schema]
@@ -1,17 +1,30 @@
+import base64
+import json
+import random
+
 import mysql.connector
 
 from explorer.database_adapter import DatabaseAdapter
 
+TRANSIENT_ERRORS = {1040, 1053, 1205, 1213, 2003, 2006, 2013, 2055, 3024}
+
 
 class MySQLAdapter(DatabaseAdapter):
-    def connect(self):
-        self.conn = mysql.connector.connect(
+    query_errors = (mysql.connector.Error,)
+
+    def open_connection(self):
+        conn = mysql.connector.connect(
             host=self.config['host'],
             port=self.config['port'],
             database=self.config['database'],
             user=self.config['user'],
             password=self.config['password']
         )
+        cursor = conn.cursor()
+        cursor.execute("SET SESSION TRANSACTION READ ONLY")
+        cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s", (self._statement_timeout_ms(),))
+        cursor.close()
+        return conn
 
     def get_schemas(self):
         if 'schema' in self.config and self.config['schema']:
@@ -19,14 +32,15 @@ class MySQLAdapter(DatabaseAdapter):
         return [self.config['database']]
 
     def get_tables(self, schema):
-        cursor = self.conn.cursor()
-        cursor.execute(f"""
+        return self._fetch(*self._tables_query(schema))
+
+    def _tables_query(self, schema):
+        return """
             SELECT TABLE_NAME, TABLE_TYPE
             FROM information_schema.TABLES
-            WHERE TABLE_SCHEMA = '{schema}'
+            WHERE TABLE_SCHEMA = %s
             ORDER BY TABLE_NAME;
-        """)
-        return [(name, ttype) for name, ttype in cursor.fetchall()]
+        """, (schema,)
 
     def get_columns(self, schema, table):
         cursor = self.conn.cursor()
@@ -44,7 +58,8 @@ class MySQLAdapter(DatabaseAdapter):
                 ORDER BY ORDINAL_POSITION;
             """)
             return cursor.fetchall()
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             return []
 
     def get_constraints(self, schema, table):
@@ -67,7 +82,8 @@ class MySQLAdapter(DatabaseAdapter):
                 ORDER BY tc.CONSTRAINT_TYPE, tc.CONSTRAINT_NAME;
             """)
             return cursor.fetchall()
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             return []
 
     def get_indexes(self, schema, table):
@@ -83,7 +99,8 @@ class MySQLAdapter(DatabaseAdapter):
                 ORDER BY INDEX_NAME;
             """)
             return cursor.fetchall()
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             return []
 
     def get_table_row_count(self, schema, table):
@@ -96,7 +113,8 @@ class MySQLAdapter(DatabaseAdapter):
             """)
             result = cursor.fetchone()
             return result[0] if result else None
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             return None
 
     def get_table_size(self, schema, table):
@@ -109,9 +127,264 @@ class MySQLAdapter(DatabaseAdapter):
             """)
             result = cursor.fetchone()
             return result[0] if result else None
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             return None
 
+    def _catalog_queries(self, schema, tables=None):
+        columns_filter, columns_params = self._table_filter('TABLE_NAME', tables)
+        constraints_filter, constraints_params = self._table_filter('tc.TABLE_NAME', tables)
+
+        return {
+            'columns': (f"""
+                SELECT
+                    TABLE_NAME,
+                    COLUMN_NAME,
+                    DATA_TYPE,
+                    CHARACTER_MAXIMUM_LENGTH,
+                    IS_NULLABLE,
+                    COLUMN_DEFAULT,
+                    ORDINAL_POSITION
+                FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA = %s {columns_filter}
+                ORDER BY TABLE_NAME, ORDINAL_POSITION;
+            """, (schema,) + columns_params),
+            'constraints': (f"""
+                SELECT
+                    tc.TABLE_NAME,
+                    tc.CONSTRAINT_NAME,
+                    tc.CONSTRAINT_TYPE,
+                    kcu.COLUMN_NAME,
+                    kcu.REFERENCED_TABLE_SCHEMA,
+                    kcu.REFERENCED_TABLE_NAME,
+                    kcu.REFERENCED_COLUMN_NAME
+                FROM information_schema.TABLE_CONSTRAINTS AS tc
+                LEFT JOIN information_schema.KEY_COLUMN_USAGE AS kcu
+                    ON tc.CONSTRAINT_NAME = kcu.CONSTRAINT_NAME
+                    AND tc.TABLE_SCHEMA = kcu.TABLE_SCHEMA
+                    AND tc.TABLE_NAME = kcu.TABLE_NAME
+                WHERE tc.TABLE_SCHEMA = %s {constraints_filter}
+                ORDER BY tc.TABLE_NAME, tc.CONSTRAINT_TYPE, tc.CONSTRAINT_NAME;
+            """, (schema,) + constraints_params),
+            'indexes': (f"""
+                SELECT
+                    TABLE_NAME,
+                    INDEX_NAME,
+                    CONCAT('INDEX ', INDEX_NAME, ' ON ', TABLE_NAME, ' (', GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX), ')')
+                FROM information_schema.STATISTICS
+                WHERE TABLE_SCHEMA = %s {columns_filter}
+                GROUP BY TABLE_NAME, INDEX_NAME
+                ORDER BY TABLE_NAME, INDEX_NAME;
+            """, (schema,) + columns_params),
+            'estimates': (f"""
+                SELECT
+                    TABLE_NAME,
+                    TABLE_ROWS,
+                    CONCAT(ROUND((DATA_LENGTH + INDEX_LENGTH) / 1024 / 1024, 2), ' MB')
+                FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = %s {columns_filter};
+            """, (schema,) + columns_params),
+        }
+
+    def _partitions_query(self, schema):
+        return """
+            SELECT
+                TABLE_NAME,
+                PARTITION_METHOD,
+                COALESCE(SUBPARTITION_NAME, PARTITION_NAME),
+                PARTITION_DESCRIPTION,
+                TABLE_ROWS,
+                CONCAT(ROUND((DATA_LENGTH + INDEX_LENGTH) / 1024 / 1024, 2), ' MB')
+            FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = %s
+                AND PARTITION_NAME IS NOT NULL
+            ORDER BY TABLE_NAME, PARTITION_ORDINAL_POSITION, SUBPARTITION_ORDINAL_POSITION;
+        """, (schema,)
+
+    def _index_columns_query(self, schema):
+        return """
+            SELECT
+                TABLE_NAME,
+                INDEX_NAME,
+                INDEX_TYPE,
+                NON_UNIQUE = 0,
+                INDEX_NAME = 'PRIMARY',
+                NULL,
+                SEQ_IN_INDEX,
+                CASE WHEN SUB_PART IS NULL THEN COLUMN_NAME ELSE CONCAT(COLUMN_NAME, '(', SUB_PART, ')') END
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = %s
+            ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX;
+        """, (schema,)
+
+    def _index_usage_query(self, schema):
+        return """
+            SELECT
+                u.OBJECT_NAME,
+                u.INDEX_NAME,
+                u.COUNT_STAR,
+                s.pages * @@innodb_page_size
+            FROM performance_schema.table_io_waits_summary_by_index_usage u
+            LEFT JOIN (
+                SELECT
+                    database_name,
+                    SUBSTRING_INDEX(table_name, '#', 1) AS table_name,
+                    index_name,
+                    SUM(stat_value) AS pages
+                FROM mysql.innodb_index_stats
+                WHERE database_name = %s
+                    AND stat_name = 'size'
+                GROUP BY database_name, SUBSTRING_INDEX(table_name, '#', 1), index_name
+            ) s ON s.database_name = u.OBJECT_SCHEMA
+                AND s.table_name = u.OBJECT_NAME
+                AND s.index_name = u.INDEX_NAME
+            WHERE u.OBJECT_SCHEMA = %s
+                AND u.INDEX_NAME IS NOT NULL;
+        """, (schema, schema)
+
+    def _fingerprints_query(self, schema):
+        return """
+            SELECT
+                TABLE_NAME,
+                CONCAT(CREATE_TIME, '/', COALESCE(UPDATE_TIME, ''))
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = %s;
+        """, (schema,)
+
+    def _table_stats_query(self, schema, top_n=None, min_rows=None):
+        threshold = "AND TABLE_ROWS >= %s" if min_rows is not None else ""
+        limit = "LIMIT %s" if top_n is not None else ""
+        params = (schema,) + tuple(value for value in (min_rows, top_n) if value is not None)
+        return f"""
+            SELECT
+                TABLE_NAME,
+                TABLE_ROWS,
+                DATA_LENGTH,
+                INDEX_LENGTH,
+                NULL,
+                DATA_LENGTH + INDEX_LENGTH,
+                TABLE_TYPE
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = %s {threshold}
+            ORDER BY TABLE_ROWS DESC, TABLE_NAME
+            {limit};
+        """, params
+
+    def get_column_statistics(self, schema):
+        statistics = {}
+        for table, column, histogram in self._fetch("""
+                SELECT TABLE_NAME, COLUMN_NAME, HISTOGRAM
+                FROM information_schema.COLUMN_STATISTICS
+                WHERE SCHEMA_NAME = %s;
+            """, (schema,)):
+            if isinstance(histogram, (bytes, bytearray)):
+                histogram = histogram.decode('utf-8')
+            if isinstance(histogram, str):
+                histogram = json.loads(histogram)
+            buckets = histogram.get('buckets', [])
+            singleton = histogram.get('histogram-type') == 'singleton'
+
+            most_common = []
+            if singleton:
+                previous = 0.0
+                for value, cumulative in buckets:
+                    most_common.append({'value': self._histogram_value(value),
+                                        'frequency': round(cumulative - previous, 4)})
+                    previous = cumulative
+                most_common.sort(key=lambda entry: entry['frequency'], reverse=True)
+
+            statistics.setdefault(table, {})[column] = {
+                'null_fraction': round(histogram.get('null-values', 0.0), 4),
+                'distinct_estimate': len(buckets) if singleton else sum(bucket[3] for bucket in buckets),
+                'min': self._histogram_value(buckets[0][0]) if buckets else None,
+                'max': self._histogram_value(buckets[-1][0 if singleton else 1]) if buckets else None,
+                'most_common_values': most_common,
+                'average_width': None,
+            }
+        return statistics
+
+    @staticmethod
+    def _histogram_value(value):
+        if isinstance(value, str) and value.startswith('base64:'):
+            encoded = value.split(':', 2)[2]
+            return base64.b64decode(encoded).decode('utf-8', errors='replace')
+        return value
+
+    def _containment_query(self, schema, from_table, from_column, to_table, to_column, sample_rows, fraction,
+                           to_schema=None):
+        sample_filter = "AND RAND() < %s" if fraction < 1 else ""
+        params = (fraction, sample_rows) if fraction < 1 else (sample_rows,)
+        return f"""
+            SELECT
+                COUNT(*),
+                SUM(EXISTS (SELECT 1
+                            FROM {self._qualified_name(to_schema or schema, to_table)} p
+                            WHERE p.{self.quote_identifier(to_column)} = s.v))
+            FROM (SELECT {self.quote_identifier(from_column)} AS v
+                  FROM {self._qualified_name(schema, from_table)}
+                  WHERE {self.quote_identifier(from_column)} IS NOT NULL {sample_filter}
+                  LIMIT %s) s;
+        """, params
+
+    def _hash_expression(self, column):
+        return f"CRC32({self.quote_identifier(column)})"
+
+    def _sample_source(self, schema, table, columns, sample_rows, fraction):
+        selected = ', '.join(f"{self.quote_identifier(column)} AS c{position}"
+                             for position, column in enumerate(columns))
+        if fraction < 1:
+            return (f"SELECT {selected} FROM {self._qualified_name(schema, table)} WHERE RAND() < %s LIMIT %s",
+                    (fraction, sample_rows))
+        return f"SELECT {selected} FROM {self._qualified_name(schema, table)} LIMIT %s", (sample_rows,)
+
+    def get_sampled_row_count(self, schema, table, percent, key_column=None, timeout=None, probes=10):
+        if key_column is None:
+            return None
+        lowest, highest = self.get_key_range(schema, table, key_column, timeout)
+        if not isinstance(lowest, int) or not isinstance(highest, int):
+            return None
+
+        span = highest - lowest + 1
+        width = max(1, int(span * percent / 100 / probes))
+        if width * probes >= span:
+            return self.get_exact_row_count(schema, table, timeout=timeout)
+
+        sampled = 0
+        for _ in range(probes):
+            start = random.randint(lowest, highest - width + 1)
+            sampled += self.get_exact_row_count(schema, table, key_column, start, start + width, timeout)
+        return int(round(sampled * span / (width * probes)))
+
+    def _execute_with_timeout(self, sql, params, timeout):
+        cursor = self.conn.cursor()
+        cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s", (self._statement_timeout_ms(timeout),))
+        try:
+            return self._execute(sql, params)
+        finally:
+            cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s", (self._statement_timeout_ms(),))
+
+    def _stream_cursor(self):
+        return self.conn.cursor(buffered=False)
+
+    def _close_stream(self, cursor):
+        if self.conn.unread_result:
+            self.conn.consume_results()
+        cursor.close()
+
+    def _is_transient(self, error):
+        if isinstance(error, (mysql.connector.OperationalError, mysql.connector.InterfaceError)):
+            return True
+        return getattr(error, 'errno', None) in TRANSIENT_ERRORS
+
+    def _reset(self):
+        if self.conn.unread_result:
+            self.conn.consume_results()
+        self.conn.ping(reconnect=False)
+        self.conn.rollback()
+
+    def quote_identifier(self, name):
+        return '`' + name.replace('`', '``') + '`'
+
     def close(self):
         if self.conn:
             self.conn.close()
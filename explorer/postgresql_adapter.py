@@ -1,49 +1,136 @@
+import itertools
+
 import psycopg2
 
 from explorer.database_adapter import DatabaseAdapter
 
+TRANSIENT_SQLSTATES = {
+    '40001', '40P01', '55P03', '57014', '57P03', '53000', '53100', '53200', '53300', '53400', '08000', '08003',
+    '08006',
+}
+CURSOR_IDS = itertools.count(1)
+
 
 class PostgreSQLAdapter(DatabaseAdapter):
-    def connect(self):
-        self.conn = psycopg2.connect(
+    query_errors = (psycopg2.Error,)
+
+    def open_connection(self):
+        conn = psycopg2.connect(
             host=self.config['host'],
             port=self.config['port'],
             database=self.config['database'],
             user=self.config['user'],
             password=self.config['password']
         )
-        cursor = self.conn.cursor()
+        cursor = conn.cursor()
         cursor.execute("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY")
-        cursor.execute(f"SET statement_timeout = '{self.config.get('timeout', 60)}s'")
-        self.conn.commit()
+        cursor.execute(f"SET statement_timeout = {self._statement_timeout_ms()}")
+        conn.commit()
+        return conn
 
     def get_schemas(self):
-        cursor = self.conn.cursor()
-        if 'schema' in self.config and self.config['schema']:
-            cursor.execute("""
-                           SELECT schema_name
-                           FROM information_schema.schemata
-                           WHERE schema_name = %s
-                           ORDER BY schema_name;
-                           """, (self.config['schema'],))
-        else:
-            cursor.execute("""
-                           SELECT schema_name
-                           FROM information_schema.schemata
-                           WHERE schema_name NOT IN ('pg_catalog', 'information_schema')
-                           ORDER BY schema_name;
-                           """)
-        return [row[0] for row in cursor.fetchall()]
+        return [row[0] for row in self._fetch(*self._schemas_query())]
 
     def get_tables(self, schema):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-                       SELECT table_name, table_type
-                       FROM information_schema.tables
-                       WHERE table_schema = %s
-                       ORDER BY table_name;
-                       """, (schema,))
-        return [(name, ttype) for name, ttype in cursor.fetchall()]
+        return self._fetch(*self._tables_query(schema))
+
+    def _schemas_query(self):
+        if 'schema' in self.config and self.config['schema']:
+            return """
+                   SELECT schema_name
+                   FROM information_schema.schemata
+                   WHERE schema_name = %s
+                   ORDER BY schema_name;
+                   """, (self.config['schema'],)
+        return """
+               SELECT schema_name
+               FROM information_schema.schemata
+               WHERE schema_name NOT IN ('pg_catalog', 'information_schema')
+               ORDER BY schema_name;
+               """, ()
+
+    def _tables_query(self, schema):
+        partitions = ""
+        if self.partitions != 'expand':
+            partitions = """AND NOT EXISTS (SELECT 1
+                                 FROM pg_class c
+                                          JOIN pg_namespace n ON n.oid = c.relnamespace
+                                 WHERE n.nspname = t.table_schema
+                                   AND c.relname = t.table_name
+                                   AND c.relispartition)"""
+        return f"""
+               SELECT table_name, table_type
+               FROM information_schema.tables t
+               WHERE table_schema = %s {partitions}
+               ORDER BY table_name;
+               """, (schema,)
+
+    def _partitions_query(self, schema):
+        return """
+               WITH RECURSIVE tree AS (SELECT r.oid AS root, r.oid AS relid
+                                       FROM pg_class r
+                                                JOIN pg_namespace n ON n.oid = r.relnamespace
+                                       WHERE n.nspname = %s
+                                         AND r.relkind = 'p'
+                                         AND NOT r.relispartition
+                                       UNION ALL
+                                       SELECT tree.root, i.inhrelid
+                                       FROM tree
+                                                JOIN pg_inherits i ON i.inhparent = tree.relid)
+               SELECT r.relname,
+                      CASE pt.partstrat WHEN 'r' THEN 'RANGE' WHEN 'l' THEN 'LIST' WHEN 'h' THEN 'HASH' END,
+                      c.relname,
+                      pg_get_expr(c.relpartbound, c.oid),
+                      GREATEST(c.reltuples, 0)::bigint,
+                      pg_size_pretty(pg_total_relation_size(c.oid))
+               FROM tree
+                        JOIN pg_class r ON r.oid = tree.root
+                        JOIN pg_partitioned_table pt ON pt.partrelid = tree.root
+                        JOIN pg_class c ON c.oid = tree.relid
+               WHERE c.relkind <> 'p'
+               ORDER BY r.relname, c.relname;
+               """, (schema,)
+
+    def _index_columns_query(self, schema):
+        partitions = "AND NOT t.relispartition" if self.partitions != 'expand' else ""
+        return f"""
+               SELECT t.relname,
+                      ic.relname,
+                      am.amname,
+                      x.indisunique,
+                      x.indisprimary,
+                      pg_get_expr(x.indpred, x.indrelid),
+                      k.position,
+                      COALESCE(a.attname, pg_get_indexdef(x.indexrelid, k.position::int, true))
+               FROM pg_index x
+                        JOIN pg_class t ON t.oid = x.indrelid
+                        JOIN pg_namespace n ON n.oid = t.relnamespace
+                        JOIN pg_class ic ON ic.oid = x.indexrelid
+                        JOIN pg_am am ON am.oid = ic.relam
+                        CROSS JOIN LATERAL unnest(x.indkey::int2[]) WITH ORDINALITY AS k(attnum, position)
+                        LEFT JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum AND k.attnum > 0
+               WHERE n.nspname = %s
+                 AND k.position <= x.indnkeyatts {partitions}
+               ORDER BY t.relname, ic.relname, k.position;
+               """, (schema,)
+
+    def _index_usage_query(self, schema):
+        index = "s.indexrelid"
+        if self.partitions != 'expand':
+            index = "COALESCE(pg_partition_root(s.indexrelid), s.indexrelid)"
+        return f"""
+               SELECT t.relname,
+                      ic.relname,
+                      sum(s.idx_scan)::bigint,
+                      sum(pg_relation_size(s.indexrelid))::bigint
+               FROM pg_stat_user_indexes s
+                        JOIN pg_index x ON x.indexrelid = {index}
+                        JOIN pg_class ic ON ic.oid = x.indexrelid
+                        JOIN pg_class t ON t.oid = x.indrelid
+                        JOIN pg_namespace n ON n.oid = t.relnamespace
+               WHERE n.nspname = %s
+               GROUP BY t.relname, ic.relname;
+               """, (schema,)
 
     def get_columns(self, schema, table):
         cursor = self.conn.cursor()
@@ -61,7 +148,8 @@ class PostgreSQLAdapter(DatabaseAdapter):
                            ORDER BY ordinal_position;
                            """, (schema, table))
             return cursor.fetchall()
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             self.conn.rollback()
             return []
 
@@ -87,7 +175,8 @@ class PostgreSQLAdapter(DatabaseAdapter):
                            ORDER BY tc.constraint_type, tc.constraint_name;
                            """, (schema, table))
             return cursor.fetchall()
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             self.conn.rollback()
             return []
 
@@ -103,7 +192,8 @@ class PostgreSQLAdapter(DatabaseAdapter):
                            ORDER BY i.indexname;
                            """, (schema, table))
             return cursor.fetchall()
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             self.conn.rollback()
             return []
 
@@ -116,7 +206,8 @@ class PostgreSQLAdapter(DatabaseAdapter):
                            WHERE oid = %s::regclass
                            """, (f"{schema}.{table}",))
             return cursor.fetchone()[0]
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             self.conn.rollback()
             return None
 
@@ -127,10 +218,260 @@ class PostgreSQLAdapter(DatabaseAdapter):
                 SELECT pg_size_pretty(pg_total_relation_size(%s || '.' || %s))
             """, (schema, table))
             return cursor.fetchone()[0]
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             self.conn.rollback()
             return None
 
+    def _catalog_queries(self, schema, tables=None):
+        columns_filter, columns_params = self._table_filter('table_name', tables)
+        constraints_filter, constraints_params = self._table_filter('tc.table_name', tables)
+        indexes_filter, indexes_params = self._table_filter('i.tablename', tables)
+        estimates_filter, estimates_params = self._table_filter('c.relname', tables)
+        roots_filter, roots_params = self._table_filter('r.relname', tables)
+
+        return {
+            'columns': (f"""
+                        SELECT table_name,
+                               column_name,
+                               data_type,
+                               character_maximum_length,
+                               is_nullable,
+                               column_default,
+                               ordinal_position
+                        FROM information_schema.columns
+                        WHERE table_schema = %s {columns_filter}
+                        ORDER BY table_name, ordinal_position;
+                        """, (schema,) + columns_params),
+            'constraints': (f"""
+                            SELECT tc.table_name,
+                                   tc.constraint_name,
+                                   tc.constraint_type,
+                                   kcu.column_name,
+                                   ccu.table_schema AS foreign_table_schema,
+                                   ccu.table_name   AS foreign_table_name,
+                                   ccu.column_name  AS foreign_column_name
+                            FROM information_schema.table_constraints AS tc
+                                     LEFT JOIN information_schema.key_column_usage AS kcu
+                                               ON tc.constraint_name = kcu.constraint_name
+                                                   AND tc.table_schema = kcu.table_schema
+                                     LEFT JOIN information_schema.constraint_column_usage AS ccu
+                                               ON ccu.constraint_name = tc.constraint_name
+                                                   AND ccu.table_schema = tc.table_schema
+                            WHERE tc.table_schema = %s {constraints_filter}
+                            ORDER BY tc.table_name, tc.constraint_type, tc.constraint_name;
+                            """, (schema,) + constraints_params),
+            'indexes': (f"""
+                        SELECT i.tablename,
+                               i.indexname,
+                               i.indexdef
+                        FROM pg_indexes i
+                        WHERE i.schemaname = %s {indexes_filter}
+                        ORDER BY i.tablename, i.indexname;
+                        """, (schema,) + indexes_params),
+            'estimates': (f"""
+                          WITH RECURSIVE tree AS (SELECT r.oid AS root, r.oid AS relid
+                                                  FROM pg_class r
+                                                           JOIN pg_namespace n ON n.oid = r.relnamespace
+                                                  WHERE n.nspname = %s
+                                                    AND r.relkind = 'p' {roots_filter}
+                                                  UNION ALL
+                                                  SELECT tree.root, i.inhrelid
+                                                  FROM tree
+                                                           JOIN pg_inherits i ON i.inhparent = tree.relid),
+                               totals AS (SELECT tree.root,
+                                                 sum(GREATEST(d.reltuples, 0))::bigint AS row_count,
+                                                 sum(pg_total_relation_size(d.oid))    AS size
+                                          FROM tree
+                                                   JOIN pg_class d ON d.oid = tree.relid
+                                          WHERE d.relkind <> 'p'
+                                          GROUP BY tree.root)
+                          SELECT c.relname,
+                                 COALESCE(t.row_count, c.reltuples::bigint),
+                                 pg_size_pretty(COALESCE(t.size, pg_total_relation_size(c.oid)))
+                          FROM pg_class c
+                                   JOIN pg_namespace n ON n.oid = c.relnamespace
+                                   LEFT JOIN totals t ON t.root = c.oid
+                          WHERE n.nspname = %s
+                            AND c.relkind IN ('r', 'p', 'v', 'm', 'f') {estimates_filter};
+                          """, (schema,) + roots_params + (schema,) + estimates_params),
+        }
+
+    def _fingerprints_query(self, schema):
+        return """
+               SELECT c.relname,
+                      concat_ws('/', c.xmin::text,
+                                (SELECT max(a.xmin::text::bigint) FROM pg_attribute a WHERE a.attrelid = c.oid),
+                                (SELECT max(i.xmin::text::bigint) FROM pg_index i WHERE i.indrelid = c.oid),
+                                (SELECT max(k.xmin::text::bigint) FROM pg_constraint k WHERE k.conrelid = c.oid))
+               FROM pg_class c
+                        JOIN pg_namespace n ON n.oid = c.relnamespace
+               WHERE n.nspname = %s
+                 AND c.relkind IN ('r', 'p', 'v', 'm', 'f');
+               """, (schema,)
+
+    def _table_stats_query(self, schema, top_n=None, min_rows=None):
+        if self.partitions != 'expand':
+            return self._partitioned_stats_query(schema, top_n, min_rows)
+        threshold = "AND c.reltuples >= %s" if min_rows is not None else ""
+        limit = "LIMIT %s" if top_n is not None else ""
+        params = (schema,) + tuple(value for value in (min_rows, top_n) if value is not None)
+        return f"""
+               SELECT c.relname,
+                      c.reltuples::bigint,
+                      pg_table_size(c.oid) - COALESCE(pg_total_relation_size(NULLIF(c.reltoastrelid, 0)), 0),
+                      pg_indexes_size(c.oid),
+                      COALESCE(pg_total_relation_size(NULLIF(c.reltoastrelid, 0)), 0),
+                      pg_total_relation_size(c.oid),
+                      {self._table_type('c')}
+               FROM pg_class c
+                        JOIN pg_namespace n ON n.oid = c.relnamespace
+               WHERE n.nspname = %s
+                 AND c.relkind IN ('r', 'p', 'v', 'm', 'f') {threshold}
+               ORDER BY c.reltuples DESC, c.relname
+               {limit};
+               """, params
+
+    def _partitioned_stats_query(self, schema, top_n=None, min_rows=None):
+        row_count = ("sum(CASE WHEN tree.root IS NULL THEN c.reltuples WHEN c.relkind = 'p' THEN 0 "
+                     "ELSE GREATEST(c.reltuples, 0) END)::bigint")
+        threshold = f"HAVING {row_count} >= %s" if min_rows is not None else ""
+        limit = "LIMIT %s" if top_n is not None else ""
+        params = (schema, schema) + tuple(value for value in (min_rows, top_n) if value is not None)
+        return f"""
+               WITH RECURSIVE tree AS (SELECT r.oid AS root, r.oid AS relid
+                                       FROM pg_class r
+                                                JOIN pg_namespace n ON n.oid = r.relnamespace
+                                       WHERE n.nspname = %s
+                                         AND r.relkind = 'p'
+                                         AND NOT r.relispartition
+                                       UNION ALL
+                                       SELECT tree.root, i.inhrelid
+                                       FROM tree
+                                                JOIN pg_inherits i ON i.inhparent = tree.relid)
+               SELECT r.relname,
+                      {row_count},
+                      sum(pg_table_size(c.oid)
+                          - COALESCE(pg_total_relation_size(NULLIF(c.reltoastrelid, 0)), 0))::bigint,
+                      sum(pg_indexes_size(c.oid))::bigint,
+                      sum(COALESCE(pg_total_relation_size(NULLIF(c.reltoastrelid, 0)), 0))::bigint,
+                      sum(pg_total_relation_size(c.oid))::bigint,
+                      {self._table_type('r')}
+               FROM pg_class c
+                        JOIN pg_namespace n ON n.oid = c.relnamespace
+                        LEFT JOIN tree ON tree.relid = c.oid
+                        JOIN pg_class r ON r.oid = COALESCE(tree.root, c.oid)
+               WHERE n.nspname = %s
+                 AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+               GROUP BY r.relname, r.relkind
+               {threshold}
+               ORDER BY 2 DESC, 1
+               {limit};
+               """, params
+
+    @staticmethod
+    def _table_type(alias):
+        return (f"CASE {alias}.relkind WHEN 'v' THEN 'VIEW' WHEN 'm' THEN 'MATERIALIZED VIEW' "
+                "WHEN 'f' THEN 'FOREIGN' ELSE 'BASE TABLE' END")
+
+    def get_column_statistics(self, schema):
+        statistics = {}
+        for table, column, null_frac, n_distinct, avg_width, values, frequencies, bounds, rows in self._fetch("""
+                SELECT DISTINCT ON (s.tablename, s.attname)
+                       s.tablename,
+                       s.attname,
+                       s.null_frac,
+                       s.n_distinct,
+                       s.avg_width,
+                       s.most_common_vals::text::text[],
+                       s.most_common_freqs,
+                       s.histogram_bounds::text::text[],
+                       c.reltuples
+                FROM pg_stats s
+                         JOIN pg_namespace n ON n.nspname = s.schemaname
+                         JOIN pg_class c ON c.relnamespace = n.oid AND c.relname = s.tablename
+                WHERE s.schemaname = %s
+                ORDER BY s.tablename, s.attname, s.inherited;
+                """, (schema,)):
+            if n_distinct < 0:
+                n_distinct = -n_distinct * max(rows, 0)
+            observed = (bounds[:1] + bounds[-1:] if bounds else []) + (values or [])
+            statistics.setdefault(table, {})[column] = {
+                'null_fraction': round(null_frac, 4),
+                'distinct_estimate': int(round(n_distinct)),
+                'min': min(observed, key=self._stats_value_key) if observed else None,
+                'max': max(observed, key=self._stats_value_key) if observed else None,
+                'most_common_values': [{'value': value, 'frequency': round(frequency, 4)}
+                                       for value, frequency in zip(values or [], frequencies or [])],
+                'average_width': avg_width,
+            }
+        return statistics
+
+    @staticmethod
+    def _stats_value_key(value):
+        try:
+            return 0, float(value), value
+        except ValueError:
+            return 1, 0.0, value
+
+    def _containment_query(self, schema, from_table, from_column, to_table, to_column, sample_rows, fraction,
+                           to_schema=None):
+        source = self._qualified_name(schema, from_table)
+        if fraction < 1:
+            source += f" TABLESAMPLE SYSTEM ({fraction * 100:.6f})"
+        return f"""
+                SELECT count(*),
+                       count(*) FILTER (WHERE EXISTS (SELECT 1
+                                                      FROM {self._qualified_name(to_schema or schema, to_table)} p
+                                                      WHERE p.{self.quote_identifier(to_column)} = s.v))
+                FROM (SELECT {self.quote_identifier(from_column)} AS v
+                      FROM {source}
+                      WHERE {self.quote_identifier(from_column)} IS NOT NULL
+                      LIMIT %s) s;
+                """, (sample_rows,)
+
+    def _hash_expression(self, column):
+        return f"('x' || substr(md5({self.quote_identifier(column)}::text), 1, 8))::bit(32)::bigint"
+
+    def _width_expression(self, value):
+        return f"pg_column_size({value})"
+
+    def _tablesample_clause(self, percent):
+        return f"TABLESAMPLE SYSTEM ({percent:.6f})"
+
+    def _execute_with_timeout(self, sql, params, timeout):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SET LOCAL statement_timeout = %s", (self._statement_timeout_ms(timeout),))
+            cursor.execute(sql, params)
+            return self._fetched([tuple(row) for row in cursor.fetchall()])
+        finally:
+            self.conn.rollback()
+
+    def _stream_cursor(self):
+        cursor = self.conn.cursor(name=f"dbexplorer_{next(CURSOR_IDS)}")
+        cursor.itersize = self.fetch_batch_size
+        return cursor
+
+    def _close_stream(self, cursor):
+        try:
+            cursor.close()
+        except psycopg2.Error:
+            pass
+
+    def _table_filter(self, column, tables):
+        if tables is None:
+            return "", ()
+        return f"AND {column} = ANY(%s)", (list(tables),)
+
+    def _is_transient(self, error):
+        if isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError)) and error.pgcode is None:
+            return True
+        return isinstance(error, psycopg2.Error) and error.pgcode in TRANSIENT_SQLSTATES
+
+    def _reset(self):
+        self.conn.rollback()
+
     def close(self):
         if self.conn:
             self.conn.close()
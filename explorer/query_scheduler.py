@@ -0,0 +1,135 @@
+import random
+import threading
+import time
+
+MAX_BASELINES = 4096
+
+
+class QueryScheduler:
+    def __init__(self, max_concurrency=4, min_concurrency=1, max_retries=3, timeout_seconds=None, backoff_seconds=0.5,
+                 max_backoff_seconds=30, latency_tolerance=3.0, min_latency_seconds=0.05, decrease_factor=0.5,
+                 cooldown_seconds=1.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max(0, max_retries)
+        self.timeout_seconds = timeout_seconds
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.latency_tolerance = latency_tolerance
+        self.min_latency_seconds = min_latency_seconds
+        self.decrease_factor = decrease_factor
+        self.cooldown_seconds = cooldown_seconds
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.baselines = {}
+        self.retries = 0
+        self.decreases = 0
+        self.lowest_limit = self.max_concurrency
+        self._last_decrease = 0
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls, options):
+        config = options.get('scheduler', {})
+        row_counts = options.get('row_counts') or {}
+        default_concurrency = max(options.get('workers', 1), row_counts.get('max_concurrency', 4) if row_counts else 1)
+        return cls(
+            max_concurrency=config.get('max_concurrency', default_concurrency),
+            min_concurrency=config.get('min_concurrency', 1),
+            max_retries=options.get('max_retries', 3),
+            timeout_seconds=options.get('timeout_seconds'),
+            backoff_seconds=config.get('backoff_seconds', 0.5),
+            max_backoff_seconds=config.get('max_backoff_seconds', 30),
+            latency_tolerance=config.get('latency_tolerance', 3.0),
+            min_latency_seconds=config.get('min_latency_seconds', 0.05),
+            decrease_factor=config.get('decrease_factor', 0.5),
+            cooldown_seconds=config.get('cooldown_seconds', 1.0),
+        )
+
+    def attach(self, adapter):
+        adapter.scheduler = self
+        if self.timeout_seconds is not None:
+            adapter.statement_timeout = self.timeout_seconds
+        return adapter
+
+    def run(self, adapter, execute, sql, *args):
+        attempt = 0
+        while True:
+            self._acquire()
+            start = time.monotonic()
+            try:
+                result = execute(sql, *args)
+            except Exception as error:
+                self._release()
+                transient = adapter._is_transient(error)
+                if transient:
+                    self._decrease()
+                adapter._recover()
+                if not transient or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                with self._condition:
+                    self.retries += 1
+                adapter._note_retry()
+                time.sleep(self._backoff(attempt))
+                continue
+            self._release()
+            self._observe(sql, time.monotonic() - start)
+            return result
+
+    def stats(self):
+        with self._condition:
+            return {
+                'limit': round(self.limit, 2),
+                'lowest_limit': self.lowest_limit,
+                'retries': self.retries,
+                'decreases': self.decreases,
+            }
+
+    def _acquire(self):
+        with self._condition:
+            while self.in_flight >= max(self.min_concurrency, int(self.limit)):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def _release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def _observe(self, sql, elapsed):
+        key = sql if isinstance(sql, (str, tuple)) else id(sql)
+        with self._condition:
+            baseline = self.baselines.get(key)
+            if baseline is None:
+                if len(self.baselines) < MAX_BASELINES:
+                    self.baselines[key] = elapsed
+            elif elapsed < baseline:
+                self.baselines[key] = elapsed
+            else:
+                self.baselines[key] = baseline + (elapsed - baseline) * 0.01
+        if baseline is not None and elapsed > self.min_latency_seconds and elapsed > baseline * self.latency_tolerance:
+            self._decrease()
+        else:
+            self._increase()
+
+    def _increase(self):
+        with self._condition:
+            if self.limit < self.max_concurrency:
+                previous = int(self.limit)
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+                if int(self.limit) > previous:
+                    self._condition.notify_all()
+
+    def _decrease(self):
+        with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown_seconds:
+                return
+            self._last_decrease = now
+            self.limit = max(float(self.min_concurrency), self.limit * self.decrease_factor)
+            self.lowest_limit = min(self.lowest_limit, int(self.limit))
+            self.decreases += 1
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempt - 1)))
@@ -0,0 +1,142 @@
+import fnmatch
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from explorer.connection_pool import ConnectionPool
+
+
+class RowCounter:
+    strategies = ('estimate', 'sampled', 'exact')
+
+    def __init__(self, adapter, default='estimate', tables=None, max_concurrency=4, deadline_seconds=None,
+                 chunk_rows=10000000, sample_percent=1.0, sample_min_rows=100000, query_timeout=None):
+        self.adapter = adapter
+        self.default = default
+        self.patterns = list((tables or {}).items())
+        self.max_concurrency = max(1, max_concurrency)
+        self.deadline_seconds = deadline_seconds
+        self.deadline = None
+        self.chunk_rows = chunk_rows
+        self.sample_percent = sample_percent
+        self.sample_min_rows = sample_min_rows
+        self.query_timeout = query_timeout
+        self.pool = None
+
+        for strategy in [default] + [strategy for _, strategy in self.patterns]:
+            if strategy not in self.strategies:
+                raise ValueError(f"Unsupported row count strategy: {strategy}")
+
+    @classmethod
+    def from_config(cls, adapter, config):
+        return cls(
+            adapter,
+            default=config.get('default', 'estimate'),
+            tables=config.get('tables'),
+            max_concurrency=config.get('max_concurrency', 4),
+            deadline_seconds=config.get('deadline_seconds'),
+            chunk_rows=config.get('chunk_rows', 10000000),
+            sample_percent=config.get('sample_percent', 1.0),
+            sample_min_rows=config.get('sample_min_rows', 100000),
+            query_timeout=config.get('query_timeout_seconds'),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        if self.deadline is None and self.deadline_seconds:
+            self.deadline = time.monotonic() + self.deadline_seconds
+
+    def strategy_for(self, schema, table):
+        for pattern, strategy in self.patterns:
+            if fnmatch.fnmatchcase(f"{schema}.{table}", pattern) or fnmatch.fnmatchcase(table, pattern):
+                return strategy
+        return self.default
+
+    def apply(self, schema, tables):
+        pending = []
+        for table_name, table_data in tables.items():
+            table_data['row_count_method'] = 'estimate'
+            strategy = self.strategy_for(schema, table_name)
+            if strategy != 'estimate' and table_data.get('type', 'BASE TABLE') == 'BASE TABLE':
+                pending.append((table_name, strategy))
+        if not pending:
+            return tables
+
+        self.start()
+        if self.pool is None:
+            self.pool = ConnectionPool(self.adapter, self.max_concurrency, share_adapter=False)
+
+        def count_table(task):
+            table_name, strategy = task
+            try:
+                return self._count(schema, table_name, tables[table_name], strategy)
+            except Exception:
+                return None, None
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for (table_name, _), (count, method) in zip(pending, executor.map(count_table, pending)):
+                if count is not None:
+                    tables[table_name]['row_count'] = count
+                    tables[table_name]['row_count_method'] = method
+        return tables
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def _count(self, schema, table, table_data, strategy):
+        estimate = table_data.get('row_count')
+        if self._expired():
+            return None, None
+
+        with self.pool.acquire() as adapter:
+            key_column = self._key_column(adapter, schema, table, table_data)
+            if strategy == 'sampled' and (estimate is None or estimate < 0 or estimate >= self.sample_min_rows):
+                count = adapter.get_sampled_row_count(schema, table, self.sample_percent, key_column,
+                                                      timeout=self._timeout())
+                if count is not None:
+                    return count, 'sampled'
+                return None, None
+
+            if key_column is None or not estimate or estimate <= self.chunk_rows:
+                return adapter.get_exact_row_count(schema, table, timeout=self._timeout()), 'exact'
+            lowest, highest = adapter.get_key_range(schema, table, key_column, timeout=self._timeout())
+
+        if not isinstance(lowest, int) or not isinstance(highest, int):
+            return self._exact_chunks(schema, table, [(None, None, None)]), 'exact'
+        chunks = math.ceil(estimate / self.chunk_rows)
+        width = math.ceil((highest - lowest + 1) / chunks)
+        ranges = [(key_column, start, start + width) for start in range(lowest, highest + 1, width)]
+        return self._exact_chunks(schema, table, ranges), 'exact'
+
+    def _exact_chunks(self, schema, table, ranges):
+        def count_range(key_range):
+            if self._expired():
+                raise TimeoutError(f"Row count deadline exceeded for {schema}.{table}")
+            with self.pool.acquire() as adapter:
+                return adapter.get_exact_row_count(schema, table, *key_range, timeout=self._timeout())
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            return sum(executor.map(count_range, ranges))
+
+    def _key_column(self, adapter, schema, table, table_data):
+        constraints = table_data.get('constraints')
+        if constraints is None:
+            constraints = adapter.get_constraints(schema, table)
+        key_columns = {constraint[2] for constraint in constraints if constraint[1] == 'PRIMARY KEY'}
+        return key_columns.pop() if len(key_columns) == 1 else None
+
+    def _timeout(self):
+        if self.deadline is None:
+            return self.query_timeout
+        remaining = max(0.001, self.deadline - time.monotonic())
+        return min(remaining, self.query_timeout) if self.query_timeout else remaining
+
+    def _expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
@@ -1,10 +1,17 @@
+import math
+
 import pyodbc
 
 from explorer.database_adapter import DatabaseAdapter
 
+TRANSIENT_SQLSTATES = {'HYT00', 'HYT01', '40001', '08S01', '08001', '08004'}
+
 
 class SQLServerAdapter(DatabaseAdapter):
-    def connect(self):
+    param_marker = '?'
+    query_errors = (pyodbc.Error,)
+
+    def open_connection(self):
         connection_string = (
             f"DRIVER={{ODBC Driver 17 for SQL Server}};"
             f"SERVER={self.config['host']},{self.config['port']};"
@@ -12,38 +19,41 @@ class SQLServerAdapter(DatabaseAdapter):
             f"UID={self.config['user']};"
             f"PWD={self.config['password']}"
         )
-        self.conn = pyodbc.connect(connection_string)
+        conn = pyodbc.connect(connection_string, readonly=True)
+        conn.timeout = int(math.ceil(self.statement_timeout or 0))
+        return conn
 
     def get_schemas(self):
-        cursor = self.conn.cursor()
-        if 'schema' in self.config and self.config['schema']:
-            cursor.execute("""
-                           SELECT SCHEMA_NAME
-                           FROM INFORMATION_SCHEMA.SCHEMATA
-                           WHERE SCHEMA_NAME = ?
-                           ORDER BY SCHEMA_NAME;
-                           """, (self.config['schema'],))
-        else:
-            cursor.execute("""
-                           SELECT SCHEMA_NAME
-                           FROM INFORMATION_SCHEMA.SCHEMATA
-                           WHERE SCHEMA_NAME NOT IN ('sys', 'information_schema', 'guest', 'db_owner', 'db_accessadmin',
-                                                     'db_securityadmin', 'db_ddladmin', 'db_backupoperator',
-                                                     'db_datareader', 'db_datawriter', 'db_denydatareader',
-                                                     'db_denydatawriter')
-                           ORDER BY SCHEMA_NAME;
-                           """)
-        return [row[0] for row in cursor.fetchall()]
+        return [row[0] for row in self._fetch(*self._schemas_query())]
 
     def get_tables(self, schema):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-                       SELECT TABLE_NAME, TABLE_TYPE
-                       FROM INFORMATION_SCHEMA.TABLES
-                       WHERE TABLE_SCHEMA = ?
-                       ORDER BY TABLE_NAME;
-                       """, (schema,))
-        return [(name, ttype) for name, ttype in cursor.fetchall()]
+        return self._fetch(*self._tables_query(schema))
+
+    def _schemas_query(self):
+        if 'schema' in self.config and self.config['schema']:
+            return """
+                   SELECT SCHEMA_NAME
+                   FROM INFORMATION_SCHEMA.SCHEMATA
+                   WHERE SCHEMA_NAME = ?
+                   ORDER BY SCHEMA_NAME;
+                   """, (self.config['schema'],)
+        return """
+               SELECT SCHEMA_NAME
+               FROM INFORMATION_SCHEMA.SCHEMATA
+               WHERE SCHEMA_NAME NOT IN ('sys', 'information_schema', 'guest', 'db_owner', 'db_accessadmin',
+                                         'db_securityadmin', 'db_ddladmin', 'db_backupoperator',
+                                         'db_datareader', 'db_datawriter', 'db_denydatareader',
+                                         'db_denydatawriter')
+               ORDER BY SCHEMA_NAME;
+               """, ()
+
+    def _tables_query(self, schema):
+        return """
+               SELECT TABLE_NAME, TABLE_TYPE
+               FROM INFORMATION_SCHEMA.TABLES
+               WHERE TABLE_SCHEMA = ?
+               ORDER BY TABLE_NAME;
+               """, (schema,)
 
     def get_columns(self, schema, table):
         cursor = self.conn.cursor()
@@ -61,7 +71,8 @@ class SQLServerAdapter(DatabaseAdapter):
                            ORDER BY ORDINAL_POSITION;
                            """, (schema, table))
             return cursor.fetchall()
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             return []
 
     def get_constraints(self, schema, table):
@@ -86,7 +97,8 @@ class SQLServerAdapter(DatabaseAdapter):
                            ORDER BY tc.CONSTRAINT_TYPE, tc.CONSTRAINT_NAME;
                            """, (schema, table))
             return cursor.fetchall()
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             return []
 
     def get_indexes(self, schema, table):
@@ -103,7 +115,8 @@ class SQLServerAdapter(DatabaseAdapter):
                            ORDER BY i.name;
                            """, (schema, table))
             return cursor.fetchall()
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             return []
 
     def get_table_row_count(self, schema, table):
@@ -119,7 +132,8 @@ class SQLServerAdapter(DatabaseAdapter):
             """, (schema, table))
             result = cursor.fetchone()
             return result[0] if result else None
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             return None
 
     def get_table_size(self, schema, table):
@@ -138,9 +152,284 @@ class SQLServerAdapter(DatabaseAdapter):
             """, (schema, table))
             result = cursor.fetchone()
             return f"{result[0]} MB" if result else None
-        except Exception:
+        except Exception as error:
+            self._note_failure(error)
             return None
 
+    def _catalog_queries(self, schema, tables=None):
+        columns_filter, columns_params = self._table_filter('TABLE_NAME', tables)
+        constraints_filter, constraints_params = self._table_filter('tc.TABLE_NAME', tables)
+        objects_filter, objects_params = self._table_filter('o.name', tables)
+
+        return {
+            'columns': (f"""
+                        SELECT TABLE_NAME,
+                               COLUMN_NAME,
+                               DATA_TYPE,
+                               CHARACTER_MAXIMUM_LENGTH,
+                               IS_NULLABLE,
+                               COLUMN_DEFAULT,
+                               ORDINAL_POSITION
+                        FROM INFORMATION_SCHEMA.COLUMNS
+                        WHERE TABLE_SCHEMA = ? {columns_filter}
+                        ORDER BY TABLE_NAME, ORDINAL_POSITION;
+                        """, (schema,) + columns_params),
+            'constraints': (f"""
+                            SELECT tc.TABLE_NAME,
+                                   tc.CONSTRAINT_NAME,
+                                   tc.CONSTRAINT_TYPE,
+                                   kcu.COLUMN_NAME,
+                                   ccu.TABLE_SCHEMA AS foreign_table_schema,
+                                   ccu.TABLE_NAME   AS foreign_table_name,
+                                   ccu.COLUMN_NAME  AS foreign_column_name
+                            FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS AS tc
+                                     LEFT JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE AS kcu
+                                               ON tc.CONSTRAINT_NAME = kcu.CONSTRAINT_NAME
+                                                   AND tc.TABLE_SCHEMA = kcu.TABLE_SCHEMA
+                                     LEFT JOIN INFORMATION_SCHEMA.CONSTRAINT_COLUMN_USAGE AS ccu
+                                               ON ccu.CONSTRAINT_NAME = tc.CONSTRAINT_NAME
+                                                   AND ccu.TABLE_SCHEMA = tc.TABLE_SCHEMA
+                            WHERE tc.TABLE_SCHEMA = ? {constraints_filter}
+                            ORDER BY tc.TABLE_NAME, tc.CONSTRAINT_TYPE, tc.CONSTRAINT_NAME;
+                            """, (schema,) + constraints_params),
+            'indexes': (f"""
+                        SELECT o.name,
+                               i.name AS index_name,
+                               'INDEX ' + i.name + ' ON ' + s.name + '.' + o.name
+                        FROM sys.indexes i
+                                 INNER JOIN sys.objects o ON i.object_id = o.object_id
+                                 INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
+                        WHERE s.name = ?
+                          AND i.name IS NOT NULL {objects_filter}
+                        ORDER BY o.name, i.name;
+                        """, (schema,) + objects_params),
+            'estimates': (f"""
+                SELECT
+                    o.name,
+                    (SELECT SUM(p.rows)
+                     FROM sys.partitions p
+                     WHERE p.object_id = o.object_id AND p.index_id IN (0, 1)),
+                    CAST(CAST(ROUND((((SELECT SUM(a.total_pages)
+                                       FROM sys.partitions p
+                                       INNER JOIN sys.allocation_units a ON p.partition_id = a.container_id
+                                       WHERE p.object_id = o.object_id) * 8) / 1024.00), 2)
+                              AS NUMERIC(36, 2)) AS VARCHAR(40)) + ' MB'
+                FROM sys.tables o
+                INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
+                WHERE s.name = ? {objects_filter};
+            """, (schema,) + objects_params),
+        }
+
+    def _partitions_query(self, schema):
+        return """
+               SELECT t.name,
+                      pf.type_desc,
+                      CAST(p.partition_number AS VARCHAR(10)),
+                      CAST(prv.value AS NVARCHAR(4000)),
+                      p.rows,
+                      CAST(CAST(ROUND((((SELECT SUM(a.total_pages)
+                                         FROM sys.allocation_units a
+                                         WHERE a.container_id = p.partition_id) * 8) / 1024.00), 2)
+                                AS NUMERIC(36, 2)) AS VARCHAR(40)) + ' MB'
+               FROM sys.tables t
+                        INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
+                        INNER JOIN sys.indexes i ON i.object_id = t.object_id AND i.index_id IN (0, 1)
+                        INNER JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+                        INNER JOIN sys.partition_functions pf ON pf.function_id = ps.function_id
+                        INNER JOIN sys.partitions p ON p.object_id = t.object_id AND p.index_id = i.index_id
+                        LEFT JOIN sys.partition_range_values prv
+                                  ON prv.function_id = pf.function_id AND prv.boundary_id = p.partition_number
+               WHERE s.name = ?
+               ORDER BY t.name, p.partition_number;
+               """, (schema,)
+
+    def _index_columns_query(self, schema):
+        return """
+               SELECT t.name,
+                      i.name,
+                      CASE WHEN i.type IN (1, 2) THEN 'BTREE' ELSE i.type_desc END,
+                      i.is_unique,
+                      i.is_primary_key,
+                      i.filter_definition,
+                      ic.key_ordinal,
+                      c.name
+               FROM sys.indexes i
+                        INNER JOIN sys.tables t ON t.object_id = i.object_id
+                        INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
+                        INNER JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+                        INNER JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+               WHERE s.name = ?
+                 AND i.type > 0
+                 AND ic.key_ordinal > 0
+                 AND ic.is_included_column = 0
+               ORDER BY t.name, i.name, ic.key_ordinal;
+               """, (schema,)
+
+    def _index_usage_query(self, schema):
+        return """
+               SELECT t.name,
+                      i.name,
+                      COALESCE(u.user_seeks + u.user_scans + u.user_lookups, 0),
+                      p.pages * 8192
+               FROM sys.indexes i
+                        INNER JOIN sys.tables t ON t.object_id = i.object_id
+                        INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
+                        LEFT JOIN sys.dm_db_index_usage_stats u
+                                  ON u.database_id = DB_ID() AND u.object_id = i.object_id
+                                      AND u.index_id = i.index_id
+                        LEFT JOIN (SELECT object_id, index_id, SUM(used_page_count) AS pages
+                                   FROM sys.dm_db_partition_stats
+                                   GROUP BY object_id, index_id) p
+                                  ON p.object_id = i.object_id AND p.index_id = i.index_id
+               WHERE s.name = ?
+                 AND i.type > 0;
+               """, (schema,)
+
+    def _fingerprints_query(self, schema):
+        return """
+               SELECT o.name,
+                      CONVERT(VARCHAR(33), o.modify_date, 126)
+               FROM sys.objects o
+                        INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
+               WHERE s.name = ?
+                 AND o.type IN ('U', 'V');
+               """, (schema,)
+
+    def _table_stats_query(self, schema, top_n=None, min_rows=None):
+        top = "TOP (?)" if top_n is not None else ""
+        threshold = "AND r.row_count >= ?" if min_rows is not None else ""
+        params = ((top_n,) if top_n is not None else ()) + (schema,) + ((min_rows,) if min_rows is not None else ())
+        return f"""
+            SELECT {top}
+                o.name,
+                r.row_count,
+                COALESCE(u.heap_pages, 0) * 8192,
+                COALESCE(u.index_pages, 0) * 8192,
+                COALESCE(u.lob_pages, 0) * 8192,
+                (COALESCE(u.heap_pages, 0) + COALESCE(u.index_pages, 0) + COALESCE(u.lob_pages, 0)) * 8192,
+                'BASE TABLE'
+            FROM sys.tables o
+            INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
+            OUTER APPLY (SELECT SUM(p.rows) AS row_count
+                         FROM sys.partitions p
+                         WHERE p.object_id = o.object_id AND p.index_id IN (0, 1)) r
+            OUTER APPLY (SELECT
+                             SUM(CASE WHEN p.index_id IN (0, 1) AND a.type <> 2
+                                      THEN CAST(a.total_pages AS BIGINT) ELSE 0 END) AS heap_pages,
+                             SUM(CASE WHEN p.index_id > 1 AND a.type <> 2
+                                      THEN CAST(a.total_pages AS BIGINT) ELSE 0 END) AS index_pages,
+                             SUM(CASE WHEN a.type = 2
+                                      THEN CAST(a.total_pages AS BIGINT) ELSE 0 END) AS lob_pages
+                         FROM sys.partitions p
+                         INNER JOIN sys.allocation_units a ON p.partition_id = a.container_id
+                         WHERE p.object_id = o.object_id) u
+            WHERE s.name = ? {threshold}
+            ORDER BY r.row_count DESC, o.name;
+        """, params
+
+    def get_column_statistics(self, schema):
+        steps = {}
+        for table, column, stats_id, rows, high_key, equal_rows, distinct_range_rows in self._fetch("""
+            SELECT
+                o.name,
+                c.name,
+                st.stats_id,
+                sp.rows,
+                CAST(h.range_high_key AS NVARCHAR(4000)),
+                h.equal_rows,
+                h.distinct_range_rows
+            FROM sys.stats st
+            INNER JOIN sys.objects o ON st.object_id = o.object_id
+            INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
+            INNER JOIN sys.stats_columns sc
+                ON sc.object_id = st.object_id AND sc.stats_id = st.stats_id AND sc.stats_column_id = 1
+            INNER JOIN sys.columns c ON c.object_id = sc.object_id AND c.column_id = sc.column_id
+            CROSS APPLY sys.dm_db_stats_properties(st.object_id, st.stats_id) sp
+            CROSS APPLY sys.dm_db_stats_histogram(st.object_id, st.stats_id) h
+            WHERE s.name = ? AND o.type = 'U'
+            ORDER BY o.name, c.name, st.stats_id, h.step_number;
+        """, (schema,)):
+            first = steps.setdefault((table, column), (stats_id, rows, []))
+            if first[0] == stats_id:
+                first[2].append((high_key, equal_rows, distinct_range_rows))
+
+        statistics = {}
+        for (table, column), (_, rows, histogram) in steps.items():
+            null_rows = sum(equal_rows for high_key, equal_rows, _ in histogram if high_key is None)
+            keyed = [step for step in histogram if step[0] is not None]
+            most_common = sorted(keyed, key=lambda step: step[1], reverse=True)
+            statistics.setdefault(table, {})[column] = {
+                'null_fraction': round(null_rows / rows, 4) if rows else None,
+                'distinct_estimate': int(round(len(keyed) + sum(step[2] for step in keyed))),
+                'min': keyed[0][0] if keyed else None,
+                'max': keyed[-1][0] if keyed else None,
+                'most_common_values': [{'value': high_key, 'frequency': round(equal_rows / rows, 4)}
+                                       for high_key, equal_rows, _ in most_common if rows and equal_rows],
+                'average_width': None,
+            }
+        return statistics
+
+    def _containment_query(self, schema, from_table, from_column, to_table, to_column, sample_rows, fraction,
+                           to_schema=None):
+        source = self._qualified_name(schema, from_table)
+        if fraction < 1:
+            source += f" TABLESAMPLE ({fraction * 100:.6f} PERCENT)"
+        return f"""
+                SELECT COUNT(*),
+                       SUM(CASE
+                               WHEN EXISTS (SELECT 1
+                                            FROM {self._qualified_name(to_schema or schema, to_table)} p
+                                            WHERE p.{self.quote_identifier(to_column)} = s.v) THEN 1
+                               ELSE 0 END)
+                FROM (SELECT TOP (?) {self.quote_identifier(from_column)} AS v
+                      FROM {source}
+                      WHERE {self.quote_identifier(from_column)} IS NOT NULL) s;
+                """, (sample_rows,)
+
+    def _hash_expression(self, column):
+        return (f"CAST(SUBSTRING(HASHBYTES('MD5', CONVERT(NVARCHAR(100), {self.quote_identifier(column)})), 1, 4) "
+                f"AS BIGINT)")
+
+    def _lowest_hashes_query(self, schema, table, column, size, percent=None):
+        return f"""
+                SELECT DISTINCT TOP (?) {self._hash_expression(column)} AS h
+                FROM {self._qualified_name(schema, table)} {self._block_sample(percent)}
+                WHERE {self.quote_identifier(column)} IS NOT NULL
+                ORDER BY h;
+                """, (size,)
+
+    def _sample_source(self, schema, table, columns, sample_rows, fraction):
+        selected = ', '.join(f"{self.quote_identifier(column)} AS c{position}"
+                             for position, column in enumerate(columns))
+        clause = self._tablesample_clause(fraction * 100) if fraction < 1 else ''
+        return f"SELECT TOP (?) {selected} FROM {self._qualified_name(schema, table)} {clause}", (sample_rows,)
+
+    def _width_expression(self, value):
+        return f"DATALENGTH({value})"
+
+    def _tablesample_clause(self, percent):
+        return f"TABLESAMPLE ({percent:.6f} PERCENT)"
+
+    def _execute_with_timeout(self, sql, params, timeout):
+        previous = self.conn.timeout
+        self.conn.timeout = max(1, int(math.ceil(timeout)))
+        try:
+            return self._execute(sql, params)
+        finally:
+            self.conn.timeout = previous
+
+    def _is_transient(self, error):
+        if isinstance(error, pyodbc.OperationalError):
+            return True
+        return bool(error.args) and error.args[0] in TRANSIENT_SQLSTATES
+
+    def _reset(self):
+        self.conn.rollback()
+        self.conn.cursor().execute("SELECT 1").fetchall()
+
+    def quote_identifier(self, name):
+        return '[' + name.replace(']', ']]') + ']'
+
     def close(self):
         if self.conn:
             self.conn.close()
@@ -0,0 +1,71 @@
+from explorer.connection_pool import ConnectionPool
+
+
+class StructureExplorer:
+    def __init__(self, adapter, ignored_tables, workers=1, chunk_size=200, cache=None, row_counter=None):
+        self.adapter = adapter
+        self.ignored_tables = ignored_tables
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.row_counter = row_counter
+
+    def explore(self):
+        schemas = self.adapter.get_schemas()
+        all_data = {schema: {} for schema in schemas}
+        for schema, table_name, data in self.iter_tables(schemas):
+            all_data[schema][table_name] = data
+        return all_data
+
+    def iter_tables(self, schemas=None):
+        if schemas is None:
+            schemas = self.adapter.get_schemas()
+        seen = {schema: [] for schema in schemas}
+
+        with ConnectionPool(self.adapter, self.workers) as pool:
+            for schema, catalog, fetched, fingerprints in pool.imap(self._fetch_chunk, self._chunks(pool, schemas)):
+                if self.cache is not None:
+                    self.cache.store(schema, fetched, fingerprints)
+                if self.row_counter is not None:
+                    self.row_counter.apply(schema, catalog)
+                for table_name, data in catalog.items():
+                    seen[schema].append(table_name)
+                    yield schema, table_name, data
+
+        if self.cache is not None:
+            for schema, table_names in seen.items():
+                self.cache.retain(schema, table_names)
+            self.cache.retain_schemas(schemas)
+            self.cache.save()
+
+    def _chunks(self, pool, schemas):
+        for schema in schemas:
+            fingerprints = None
+            cached = {}
+
+            with pool.acquire() as adapter:
+                tables = [(name, ttype) for name, ttype in adapter.get_tables(schema)
+                          if name not in self.ignored_tables]
+                partitioned = adapter.get_partitions(schema)
+                if self.cache is not None:
+                    fingerprints = adapter.get_table_fingerprints(schema)
+                    cached, _ = self.cache.partition(schema, tables, fingerprints)
+                    if cached:
+                        self.cache.refresh_estimates(cached, adapter.get_table_estimates(schema, tables))
+
+            for start in range(0, len(tables), self.chunk_size):
+                chunk = tables[start:start + self.chunk_size]
+                yield (schema, chunk, {name: cached[name] for name, _ in chunk if name in cached}, fingerprints,
+                       {name: partitioned[name] for name, _ in chunk if name in partitioned})
+
+    def _fetch_chunk(self, adapter, task):
+        schema, tables, cached, fingerprints, partitioned = task
+        stale = [(name, ttype) for name, ttype in tables if name not in cached]
+        fetched = adapter.get_schema_catalog(schema, stale) if stale else {}
+
+        catalog = {}
+        for name, _ in tables:
+            data = cached.get(name) or fetched.get(name)
+            if data is not None:
+                catalog[name] = data
+        return schema, adapter._attach_partitions(catalog, partitioned), fetched, fingerprints
@@ -0,0 +1,128 @@
+import json
+
+from analyzer import (ColumnProfiler, InclusionDependencyFinder, IndexAnalyzer, RelationshipAnalyzer,
+                      RelationshipGraph, RelationshipValidator)
+from explorer import (CatalogSnapshot, ConnectionPool, Instrumentation, QueryScheduler, RowCounter, StructureExplorer,
+                      get_adapter)
+from writer import OutputWriter
+
+
+def main():
+    with open('config.json', 'r') as f:
+        config = json.load(f)
+
+    db_config = config['database']
+    output_config = config['output']
+    options = config.get('options', {})
+    ignored_tables = set(options.get('ignored_tables', []))
+    instrumentation = None
+    if options.get('instrumentation'):
+        instrumentation = Instrumentation.from_config(options['instrumentation'])
+
+    adapter = get_adapter(db_config['type'], db_config)
+    if instrumentation is not None:
+        instrumentation.attach(adapter)
+    QueryScheduler.from_config(options).attach(adapter)
+    adapter.connect()
+    row_counter = RowCounter.from_config(adapter, options['row_counts']) if options.get('row_counts') else None
+
+    explorer = StructureExplorer(
+        adapter,
+        ignored_tables,
+        workers=options.get('workers', 1),
+        chunk_size=options.get('chunk_size', 200),
+        row_counter=row_counter,
+    )
+    snapshot = CatalogSnapshot.capture(explorer)
+    if row_counter is not None:
+        row_counter.close()
+
+    analyzer = RelationshipAnalyzer(adapter, ignored_tables, snapshot=snapshot, inference=options.get('inference'))
+    all_relationships = {schema: analyzer.get_foreign_keys(schema) for schema in snapshot.schemas}
+    all_inferred = {schema: analyzer.infer_relationships(schema) for schema in snapshot.schemas}
+    stats_options = options.get('stats', {})
+    all_stats = {schema: analyzer.get_table_stats(schema, stats_options.get('top_n'), stats_options.get('min_rows'))
+                 for schema in snapshot.schemas}
+    all_index_health = None
+    if options.get('index_health'):
+        index_analyzer = IndexAnalyzer(adapter, ignored_tables)
+        all_index_health = {schema: index_analyzer.analyze(schema, all_relationships[schema])
+                            for schema in snapshot.schemas}
+
+    all_discovered = None
+    all_skipped = None
+    all_profiles = None
+
+    with ConnectionPool(adapter, options.get('workers', 1)) as pool:
+        validation = options.get('validation')
+        if validation:
+            validator = RelationshipValidator(
+                adapter,
+                pool,
+                sample_rows=validation.get('sample_rows', 1000),
+                time_budget=validation.get('time_budget_seconds', 60),
+                query_timeout=validation.get('query_timeout_seconds', 5),
+                row_estimates=snapshot.row_estimates(),
+            )
+            all_inferred = {schema: validator.validate(schema, inferred) for schema, inferred in all_inferred.items()}
+
+        discovery = options.get('inclusion_discovery')
+        if discovery:
+            finder = InclusionDependencyFinder(
+                adapter,
+                pool,
+                sample_rows=discovery.get('sample_rows', 2000),
+                sketch_size=discovery.get('sketch_size', 64),
+                min_containment=discovery.get('min_containment', 0.95),
+                max_candidates=discovery.get('max_candidates', 3),
+                query_timeout=discovery.get('query_timeout_seconds', 30),
+                scan_rows=discovery.get('scan_rows', 1000000),
+            )
+            all_discovered = {schema: analyzer.discover_relationships(schema, finder) for schema in snapshot.schemas}
+            all_skipped = finder.skipped
+
+        column_profile = options.get('column_profile')
+        if column_profile:
+            profiler = ColumnProfiler(
+                adapter,
+                pool,
+                sample_rows=column_profile.get('sample_rows', 10000),
+                time_budget=column_profile.get('time_budget_seconds', 60),
+                query_timeout=column_profile.get('query_timeout_seconds', 10),
+                most_common=column_profile.get('most_common_values', 5),
+            )
+            all_profiles = {schema: profiler.profile(schema, snapshot.tables(schema)) for schema in snapshot.schemas}
+    adapter.close()
+
+    writer = OutputWriter(
+        output_config.get('format', 'json'),
+        output_config.get('human_readable_sizes', True),
+        output_config.get('store_file', 'db_catalog'),
+    )
+    structure_file = output_config.get('structure_file', 'db_structure')
+    relationships_file = output_config.get('relationships_file', 'db_relationships')
+    writer.write_tables(snapshot.schemas, snapshot.iter_tables(), structure_file)
+    if all_profiles is not None:
+        writer.write(all_profiles, f"{structure_file}_profile", 'profile')
+    writer.write(all_relationships, relationships_file, 'declared')
+    writer.write(all_inferred, f"{relationships_file}_inferred", 'inferred')
+    writer.write_stats(all_stats, output_config.get('stats_file', 'db_stats'))
+    if all_discovered is not None:
+        writer.write(all_discovered, f"{relationships_file}_discovered", 'discovered')
+    if all_skipped:
+        writer.write(all_skipped, f"{relationships_file}_discovered_skipped", 'discovered_skipped')
+    if options.get('relationship_graph'):
+        graph = RelationshipGraph.from_relationships(
+            declared=all_relationships,
+            inferred=all_inferred,
+            discovered=all_discovered,
+        )
+        writer.write(graph.to_dict(), f"{relationships_file}_graph", 'graph')
+    if all_index_health is not None:
+        writer.write_index_health(all_index_health, output_config.get('index_health_file', 'db_index_health'))
+    if instrumentation is not None:
+        instrumentation.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+from explorer import MetadataCache, RowCounter
+
+
+class CountingAdapter:
+    def spawn(self):
+        return self
+
+    def close(self):
+        pass
+
+    def get_exact_row_count(self, schema, table, *args, timeout=None):
+        return 42
+
+
+def test_cache_does_not_keep_counted_row_counts(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    cache = MetadataCache(path, 'target')
+    catalog = {'orders': {'type': 'BASE TABLE', 'row_count': 10, 'size': 8192, 'constraints': []}}
+    cache.store('s', catalog, {'orders': 'v1'})
+
+    with RowCounter(CountingAdapter(), default='exact', max_concurrency=1) as row_counter:
+        row_counter.apply('s', catalog)
+    cache.save()
+    assert catalog['orders']['row_count'] == 42
+    assert catalog['orders']['row_count_method'] == 'exact'
+
+    reloaded = MetadataCache(path, 'target').load()
+    assert reloaded.schemas['s']['orders']['data'] == {'type': 'BASE TABLE', 'size': 8192, 'constraints': []}
+
+    cached, stale = reloaded.partition('s', [('orders', 'BASE TABLE')], {'orders': 'v1'})
+    reloaded.refresh_estimates(cached, {'orders': (12, 16384)})
+    assert stale == []
+    assert cached['orders'] == {'type': 'BASE TABLE', 'row_count': 12, 'size': 16384, 'constraints': []}
@@ -0,0 +1,30 @@
+import pytest
+
+from analyzer import NameIndex
+from analyzer.name_index import referenced_words
+
+
+def build_index():
+    index = NameIndex()
+    for table in ('vals', 'pas', 'gus', 'vo', 'customers', 'orders'):
+        index.add_table('shop', table, 'id')
+    return index
+
+
+@pytest.mark.parametrize('column', ['valid', 'paid', 'guid', 'void', 'is_valid', 'prepaid'])
+@pytest.mark.parametrize('data_type', [None, 'boolean', 'varchar', 'text'])
+def test_words_ending_in_id_are_not_references(column, data_type):
+    assert referenced_words(column, data_type) == []
+    assert build_index().resolve('shop', 'orders', column, data_type) is None
+
+
+@pytest.mark.parametrize('column', ['customer_id', 'CustomerID', 'customerId', 'fk_customer', 'id_customer'])
+def test_separated_key_words_are_references(column):
+    assert build_index().resolve('shop', 'orders', column, 'varchar') == ('shop', 'customers', 'id', 'medium')
+
+
+def test_fused_id_suffix_needs_a_key_type():
+    index = build_index()
+    assert index.resolve('shop', 'orders', 'customerid', 'text') is None
+    assert index.resolve('shop', 'orders', 'customerid', 'integer') == ('shop', 'customers', 'id', 'medium')
+    assert index.resolve('shop', 'orders', 'customerid', 'uuid') == ('shop', 'customers', 'id', 'medium')
@@ -0,0 +1,47 @@
+from analyzer import RelationshipAnalyzer
+from explorer import RowCounter
+
+
+class StatsAdapter:
+    def __init__(self, estimates, counts):
+        self.estimates = estimates
+        self.counts = counts
+        self.requests = []
+
+    def spawn(self):
+        return self
+
+    def close(self):
+        pass
+
+    def get_table_stats(self, schema, top_n=None, min_rows=None):
+        self.requests.append((top_n, min_rows))
+        rows = [(table, estimate, 0, 0, 0, 0, 'BASE TABLE') for table, estimate in self.estimates.items()
+                if min_rows is None or estimate >= min_rows]
+        rows.sort(key=lambda row: -row[1])
+        return rows[:top_n] if top_n is not None else rows
+
+    def get_constraints(self, schema, table):
+        return []
+
+    def get_exact_row_count(self, schema, table, *args, timeout=None):
+        return self.counts[table]
+
+
+def test_table_stats_rank_and_filter_on_counted_rows():
+    adapter = StatsAdapter({'a': 500, 'b': 400, 'c': 50}, {'a': 10, 'b': 400, 'c': 900})
+    with RowCounter(adapter, default='exact', max_concurrency=1) as row_counter:
+        analyzer = RelationshipAnalyzer(adapter, set(), row_counter=row_counter)
+        stats = analyzer.get_table_stats('s', top_n=2, min_rows=100)
+
+    assert [(entry['table'], entry['row_count'], entry['row_count_method']) for entry in stats] == [
+        ('c', 900, 'exact'), ('b', 400, 'exact')]
+    assert adapter.requests == [(None, None)]
+
+
+def test_table_stats_filter_in_query_without_row_counter():
+    adapter = StatsAdapter({'a': 500, 'b': 400, 'c': 50}, {})
+    stats = RelationshipAnalyzer(adapter, {'x'}).get_table_stats('s', top_n=1, min_rows=100)
+
+    assert [(entry['table'], entry['row_count']) for entry in stats] == [('a', 500)]
+    assert adapter.requests == [(2, 100)]
@@ -0,0 +1,35 @@
+from analyzer import RelationshipGraph
+
+
+def reference(table, foreign_table):
+    return {'table': table, 'column': f"{foreign_table}_id", 'foreign_table': foreign_table, 'foreign_column': 'id'}
+
+
+def test_load_order_places_cycle_before_its_dependents():
+    graph = RelationshipGraph.from_relationships(declared={'s': [
+        reference('a', 'b'),
+        reference('b', 'a'),
+        reference('c', 'a'),
+        reference('aa', 'c'),
+    ]})
+
+    assert graph.load_order() == ['s.a', 's.b', 's.c', 's.aa']
+    assert graph.unload_order() == ['s.aa', 's.c', 's.b', 's.a']
+    assert graph.cycles() == [['s.a', 's.b']]
+
+
+def test_load_order_keeps_referenced_tables_first_around_cycles():
+    graph = RelationshipGraph.from_relationships(declared={'s': [
+        reference('orders', 'customers'),
+        reference('customers', 'orders'),
+        reference('customers', 'regions'),
+        reference('items', 'orders'),
+        reference('shipments', 'items'),
+        reference('regions', 'regions'),
+    ]})
+    position = {table: index for index, table in enumerate(graph.load_order())}
+
+    assert position['s.regions'] < position['s.customers']
+    assert position['s.customers'] < position['s.items'] and position['s.orders'] < position['s.items']
+    assert position['s.items'] < position['s.shipments']
+    assert graph.cycles() == [['s.customers', 's.orders'], ['s.regions']]
@@ -0,0 +1,32 @@
+from analyzer import RelationshipValidator
+
+
+class SampleAdapter:
+    def __init__(self, samples):
+        self.samples = samples
+
+    def get_containment_sample(self, schema, from_table, *args, **kwargs):
+        if isinstance(self.samples[from_table], Exception):
+            raise self.samples[from_table]
+        return self.samples[from_table]
+
+    def _reset(self):
+        pass
+
+
+def candidate(from_table, confidence):
+    return {'from_table': from_table, 'from_column': 'customer_id', 'to_table': 'customers', 'to_column': 'id',
+            'confidence': confidence}
+
+
+def test_validation_keeps_confidence_level_and_reports_containment():
+    adapter = SampleAdapter({'orders': (200, 150), 'empty': (0, 0), 'broken': RuntimeError('timeout')})
+    validator = RelationshipValidator(adapter, row_estimates={('s', 'orders'): 1, ('s', 'empty'): 0,
+                                                              ('s', 'broken'): 1})
+
+    orders, empty, broken = validator.validate('s', [candidate('orders', 'medium'), candidate('empty', 'high'),
+                                                     candidate('broken', 'low')])
+
+    assert [orders['confidence'], empty['confidence'], broken['confidence']] == ['medium', 'high', 'low']
+    assert [orders['containment'], empty['containment'], broken['containment']] == [0.75, None, None]
+    assert [orders['validated'], empty['validated'], broken['validated']] == [True, True, False]
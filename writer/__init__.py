@@ -1 +1,3 @@
-from .output_writer import OutputWriter
\ No newline at end of file
+from .output_writer import OutputWriter
+from .sqlite_store import SQLiteCatalogStore
+from .binary_format import BinaryCatalogReader
@@ -0,0 +1,86 @@
+import struct
+
+MAGIC = b'DBXP\x01'
+TRAILER = struct.Struct('>Q4s')
+TRAILER_MAGIC = b'DBXI'
+LENGTH = struct.Struct('>I')
+
+
+def _packer():
+    import msgpack
+    return msgpack.Packer(default=str, use_bin_type=True)
+
+
+class BinaryRecordWriter:
+    def __init__(self, f, schemas=()):
+        self.f = f
+        self.packer = _packer()
+        self.index = {schema: {} for schema in schemas}
+        self.offset = len(MAGIC)
+        f.write(MAGIC)
+
+    def write(self, schema, name, value):
+        payload = self.packer.pack([schema, name, value])
+        self.f.write(LENGTH.pack(len(payload)))
+        self.f.write(payload)
+        self.index.setdefault(schema, {})[name] = self.offset
+        self.offset += LENGTH.size + len(payload)
+
+    def close(self):
+        payload = self.packer.pack(self.index)
+        self.f.write(payload)
+        self.f.write(TRAILER.pack(self.offset, TRAILER_MAGIC))
+
+
+class BinaryCatalogReader:
+    def __init__(self, path):
+        import msgpack
+        self.unpackb = msgpack.unpackb
+        self.f = open(path, 'rb')
+        if self.f.read(len(MAGIC)) != MAGIC:
+            self.f.close()
+            raise ValueError(f"Not a binary catalog file: {path}")
+        self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def index(self):
+        if self._index is None:
+            self.f.seek(-TRAILER.size, 2)
+            trailer_offset = self.f.tell()
+            index_offset, magic = TRAILER.unpack(self.f.read(TRAILER.size))
+            if magic != TRAILER_MAGIC:
+                raise ValueError("Binary catalog file is truncated")
+            self.f.seek(index_offset)
+            self._index = self.unpackb(self.f.read(trailer_offset - index_offset), strict_map_key=False)
+        return self._index
+
+    def schemas(self):
+        return list(self.index())
+
+    def read(self, schema, name=None):
+        self.f.seek(self.index()[schema][name])
+        return self._read_record()[2]
+
+    def __iter__(self):
+        position, end = len(MAGIC), self._records_end()
+        while position < end:
+            self.f.seek(position)
+            length = LENGTH.unpack(self.f.read(LENGTH.size))[0]
+            yield tuple(self.unpackb(self.f.read(length), strict_map_key=False))
+            position += LENGTH.size + length
+
+    def _records_end(self):
+        self.f.seek(-TRAILER.size, 2)
+        return TRAILER.unpack(self.f.read(TRAILER.size))[0]
+
+    def _read_record(self):
+        length = LENGTH.unpack(self.f.read(LENGTH.size))[0]
+        return self.unpackb(self.f.read(length), strict_map_key=False)
+
+    def close(self):
+        self.f.close()
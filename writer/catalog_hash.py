@@ -0,0 +1,46 @@
+import hashlib
+import json
+import os
+
+VOLATILE_FIELDS = {'row_count', 'row_count_method', 'size', 'partitions'}
+HASHES_SUFFIX = '.hashes.json'
+
+
+def table_hash(table_data):
+    structure = {key: value for key, value in table_data.items() if key not in VOLATILE_FIELDS}
+    canonical = json.dumps(structure, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def schema_hash(table_hashes):
+    digest = hashlib.sha1()
+    for table_name in sorted(table_hashes):
+        digest.update(f"{table_name}\0{table_hashes[table_name]}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class CatalogHasher:
+    def __init__(self, schemas=()):
+        self.tables = {schema: {} for schema in schemas}
+
+    def track(self, tables):
+        for schema, table_name, table_data in tables:
+            self.add(schema, table_name, table_data)
+            yield schema, table_name, table_data
+
+    def add(self, schema, table_name, table_data):
+        self.tables.setdefault(schema, {})[table_name] = table_hash(table_data)
+
+    def hashes(self):
+        return {schema: {'hash': schema_hash(tables), 'tables': tables} for schema, tables in self.tables.items()}
+
+    def save(self, filename):
+        tmp_path = filename + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'schemas': self.hashes()}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, filename)
+
+
+def load_hashes(filename):
+    with open(filename, 'r') as f:
+        return json.load(f)['schemas']
@@ -1,14 +1,56 @@
 import json
-import dicttoxml
+
+from writer.binary_format import BinaryRecordWriter
+from writer.catalog_hash import HASHES_SUFFIX, CatalogHasher
+from writer.sqlite_store import SQLiteCatalogStore
+from writer.xml_writer import XMLStreamWriter
+
+
+SIZE_FIELDS = ('size', 'heap_size', 'index_size', 'toast_size')
+
+
+def format_bytes(size):
+    if not isinstance(size, int):
+        return size
+    for unit in ('bytes', 'kB', 'MB', 'GB', 'TB'):
+        if abs(size) < 10 * 1024 or unit == 'TB':
+            return f"{size} {unit}"
+        size = int(size / 1024 + (0.5 if size >= 0 else -0.5))
+
+
+def plain(value):
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, dict):
+        return {_plain_key(key): plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) or type(value).__name__ == 'Row':
+        return [plain(item) for item in value]
+    return str(value)
+
+
+def _plain_key(key):
+    if isinstance(key, str):
+        return key
+    if key is None or isinstance(key, bool):
+        return json.dumps(key)
+    return str(key)
 
 
 class OutputWriter:
-    def __init__(self, format_type='json'):
+    def __init__(self, format_type='json', human_readable_sizes=True, store_file='db_catalog'):
         self.format_type = format_type.lower()
+        self.human_readable_sizes = human_readable_sizes
+        self.store_file = store_file
 
-    def write(self, data, filename):
-        if self.format_type == 'json':
+    def write(self, data, filename, kind=None):
+        if self.format_type == 'sqlite':
+            self._write_sqlite(data, kind or filename)
+        elif self.format_type == 'json':
             self._write_json(data, filename + '.json')
+        elif self.format_type in ('jsonl', 'ndjson'):
+            self._write_jsonl(data, filename + '.jsonl')
+        elif self.format_type == 'msgpack':
+            self._write_msgpack(data, filename + '.msgpack')
         elif self.format_type == 'yaml':
             self._write_yaml(data, filename + '.yaml')
         elif self.format_type == 'xml':
@@ -16,16 +58,149 @@ class OutputWriter:
         else:
             self._write_json(data, filename + '.json')
 
+    def write_stats(self, all_stats, filename):
+        if self.human_readable_sizes and self.format_type != 'sqlite':
+            all_stats = {
+                schema: [{key: format_bytes(value) if key in SIZE_FIELDS else value for key, value in entry.items()}
+                         for entry in stats]
+                for schema, stats in all_stats.items()
+            }
+        self.write(all_stats, filename, 'stats')
+
+    def write_index_health(self, all_findings, filename):
+        if self.human_readable_sizes and self.format_type != 'sqlite':
+            all_findings = {
+                schema: [dict(finding, size=format_bytes(finding['size'])) if 'size' in finding else finding
+                         for finding in findings]
+                for schema, findings in all_findings.items()
+            }
+        self.write(all_findings, filename, 'index_health')
+
+    def write_tables(self, schemas, tables, filename):
+        schemas = list(schemas)
+        hasher = CatalogHasher(schemas)
+        tables = hasher.track(tables)
+
+        if self.format_type == 'sqlite':
+            self._store().write_tables(schemas, tables)
+        elif self.format_type in ('jsonl', 'ndjson'):
+            self._stream_jsonl(tables, filename + '.jsonl')
+        elif self.format_type == 'msgpack':
+            self._stream_msgpack(schemas, tables, filename + '.msgpack')
+        elif self.format_type == 'xml':
+            self._stream_xml(schemas, tables, filename + '.xml')
+        elif self.format_type == 'yaml':
+            all_data = {schema: {} for schema in schemas}
+            for schema, table_name, table_data in tables:
+                all_data[schema][table_name] = table_data
+            self.write(all_data, filename)
+        else:
+            self._stream_json(schemas, tables, filename + '.json')
+
+        hasher.save(filename + HASHES_SUFFIX)
+
+    def _store(self):
+        return SQLiteCatalogStore(self.store_file + '.sqlite')
+
+    def _write_sqlite(self, data, kind):
+        if kind == 'stats':
+            self._store().write_stats(data)
+        elif kind == 'profile':
+            self._store().write_profiles(data)
+        elif kind == 'graph':
+            self._store().write_graph(data)
+        elif kind == 'index_health':
+            self._store().write_index_health(data)
+        else:
+            self._store().write_relationships(data, kind)
+
     def _write_json(self, data, filename):
         with open(filename, 'w') as f:
             json.dump(data, f, indent=2, default=str)
 
+    def _write_jsonl(self, data, filename):
+        with open(filename, 'w') as f:
+            for schema, entries in data.items():
+                if isinstance(entries, dict):
+                    records = ({'schema': schema, 'table': name, **value} for name, value in entries.items())
+                else:
+                    records = ({'schema': schema, **entry} for entry in entries)
+                for record in records:
+                    f.write(json.dumps(record, default=str))
+                    f.write('\n')
+
+    def _stream_jsonl(self, tables, filename):
+        with open(filename, 'w') as f:
+            for schema, table_name, table_data in tables:
+                f.write(json.dumps({'schema': schema, 'table': table_name, **table_data}, default=str))
+                f.write('\n')
+
+    def _write_msgpack(self, data, filename):
+        with open(filename, 'wb') as f:
+            writer = BinaryRecordWriter(f)
+            for key, value in data.items():
+                writer.write(key, None, value)
+            writer.close()
+
+    def _stream_msgpack(self, schemas, tables, filename):
+        with open(filename, 'wb') as f:
+            writer = BinaryRecordWriter(f, schemas)
+            for schema, table_name, table_data in tables:
+                writer.write(schema, table_name, table_data)
+            writer.close()
+
+    def _stream_json(self, schemas, tables, filename):
+        with open(filename, 'w') as f:
+            writer = _NestedJSONWriter(f, list(schemas))
+            for schema, table_name, table_data in tables:
+                writer.write(schema, table_name, table_data)
+            writer.close()
+
     def _write_yaml(self, data, filename):
         import yaml
+        dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
         with open(filename, 'w') as f:
-            yaml.dump(json.loads(json.dumps(data, default=str)), f, default_flow_style=False)
+            yaml.dump(plain(data), f, Dumper=dumper, default_flow_style=False)
 
     def _write_xml(self, data, filename):
-        xml_data = dicttoxml.dicttoxml(data, custom_root='database', attr_type=False)
-        with open(filename, 'wb') as f:
-            f.write(xml_data)
+        with open(filename, 'w', encoding='utf-8') as f:
+            XMLStreamWriter(f).write_document(data)
+
+    def _stream_xml(self, schemas, tables, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            XMLStreamWriter(f).write_tables(schemas, tables)
+
+
+class _NestedJSONWriter:
+    def __init__(self, f, schemas):
+        self.f = f
+        self.schemas = schemas
+        self.position = -1
+        self.tables_written = 0
+
+    def write(self, schema, table_name, table_data):
+        while self.position < 0 or self.schemas[self.position] != schema:
+            self._next_schema()
+        value = json.dumps(table_data, indent=2, default=str).replace('\n', '\n    ')
+        self.f.write(',\n' if self.tables_written else '\n')
+        self.f.write(f'    {json.dumps(table_name)}: {value}')
+        self.tables_written += 1
+
+    def close(self):
+        while self.position < len(self.schemas) - 1:
+            self._next_schema()
+        self._close_schema()
+        self.f.write('\n}' if self.schemas else '{}')
+
+    def _next_schema(self):
+        if self.position + 1 >= len(self.schemas):
+            raise ValueError("Tables must be written in schema order")
+        self._close_schema()
+        self.position += 1
+        self.f.write(',\n' if self.position else '{\n')
+        self.f.write(f'  {json.dumps(self.schemas[self.position])}: {{')
+        self.tables_written = 0
+
+    def _close_schema(self):
+        if self.position >= 0:
+            self.f.write('\n  }' if self.tables_written else '}')
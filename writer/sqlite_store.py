@@ -0,0 +1,254 @@
+import json
+import sqlite3
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schemas (
+    name TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS tables (
+    schema_name TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    table_type TEXT,
+    row_count INTEGER,
+    size TEXT,
+    PRIMARY KEY (schema_name, table_name)
+);
+CREATE TABLE IF NOT EXISTS columns (
+    schema_name TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    column_name TEXT NOT NULL,
+    data_type TEXT,
+    max_length INTEGER,
+    is_nullable TEXT,
+    column_default TEXT,
+    ordinal_position INTEGER,
+    PRIMARY KEY (schema_name, table_name, column_name)
+);
+CREATE INDEX IF NOT EXISTS columns_by_name ON columns (column_name);
+CREATE TABLE IF NOT EXISTS constraints (
+    schema_name TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    constraint_name TEXT,
+    constraint_type TEXT,
+    column_name TEXT,
+    foreign_schema TEXT,
+    foreign_table TEXT,
+    foreign_column TEXT
+);
+CREATE INDEX IF NOT EXISTS constraints_by_table ON constraints (schema_name, table_name);
+CREATE INDEX IF NOT EXISTS constraints_by_foreign_table ON constraints (foreign_schema, foreign_table);
+CREATE TABLE IF NOT EXISTS indexes (
+    schema_name TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    index_name TEXT,
+    definition TEXT
+);
+CREATE INDEX IF NOT EXISTS indexes_by_table ON indexes (schema_name, table_name);
+CREATE TABLE IF NOT EXISTS relationships (
+    schema_name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    table_name TEXT,
+    column_name TEXT,
+    foreign_table TEXT,
+    foreign_column TEXT,
+    constraint_name TEXT,
+    confidence,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS relationships_by_table ON relationships (schema_name, table_name);
+CREATE INDEX IF NOT EXISTS relationships_by_foreign_table ON relationships (schema_name, foreign_table);
+CREATE TABLE IF NOT EXISTS stats (
+    schema_name TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    row_count INTEGER,
+    size INTEGER,
+    heap_size INTEGER,
+    index_size INTEGER,
+    toast_size INTEGER,
+    row_count_method TEXT,
+    PRIMARY KEY (schema_name, table_name)
+);
+CREATE TABLE IF NOT EXISTS column_profiles (
+    schema_name TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    column_name TEXT NOT NULL,
+    null_fraction REAL,
+    distinct_estimate INTEGER,
+    min_value TEXT,
+    max_value TEXT,
+    average_width REAL,
+    most_common_values TEXT,
+    source TEXT,
+    PRIMARY KEY (schema_name, table_name, column_name)
+);
+CREATE TABLE IF NOT EXISTS graph_tables (
+    table_name TEXT PRIMARY KEY,
+    component INTEGER,
+    load_position INTEGER
+);
+CREATE TABLE IF NOT EXISTS graph_cycles (
+    cycle INTEGER NOT NULL,
+    table_name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS index_health (
+    schema_name TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    issue TEXT NOT NULL,
+    index_name TEXT,
+    columns TEXT,
+    size INTEGER,
+    scans INTEGER,
+    related TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS index_health_by_table ON index_health (schema_name, table_name);
+"""
+
+INDEX_HEALTH_FIELDS = {'issue', 'table', 'index', 'columns', 'size', 'scans', 'duplicate_of', 'covered_by',
+                       'constraint_name'}
+RELATIONSHIP_FIELDS = {'table', 'from_table', 'column', 'from_column', 'foreign_table', 'to_table', 'foreign_column',
+                       'to_column', 'constraint_name', 'confidence'}
+
+
+class SQLiteCatalogStore:
+    def __init__(self, path, batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+
+    def write_tables(self, schemas, tables):
+        with self._transaction() as conn:
+            for table in ('schemas', 'tables', 'columns', 'constraints', 'indexes'):
+                conn.execute(f"DELETE FROM {table}")
+            conn.executemany("INSERT INTO schemas VALUES (?)", [(schema,) for schema in schemas])
+
+            batch = _Batch(conn, self.batch_size)
+            for schema, table_name, table_data in tables:
+                batch.add("INSERT INTO tables VALUES (?, ?, ?, ?, ?)", [(
+                    schema, table_name, table_data['type'], table_data['row_count'], _value(table_data['size'])
+                )])
+                batch.add("INSERT OR REPLACE INTO columns VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+                    (schema, table_name, *[_value(value) for value in column[:6]])
+                    for column in table_data['columns']
+                ])
+                batch.add("INSERT INTO constraints VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+                    (schema, table_name, *[_value(value) for value in constraint[:6]])
+                    for constraint in table_data['constraints']
+                ])
+                batch.add("INSERT INTO indexes VALUES (?, ?, ?, ?)", [
+                    (schema, table_name, *[_value(value) for value in index[:2]])
+                    for index in table_data['indexes']
+                ])
+            batch.flush()
+
+    def write_relationships(self, all_relationships, kind):
+        rows = []
+        for schema, relationships in all_relationships.items():
+            for relationship in relationships:
+                details = {key: value for key, value in relationship.items() if key not in RELATIONSHIP_FIELDS}
+                rows.append((
+                    schema,
+                    kind,
+                    relationship.get('table', relationship.get('from_table')),
+                    relationship.get('column', relationship.get('from_column')),
+                    relationship.get('foreign_table', relationship.get('to_table')),
+                    relationship.get('foreign_column', relationship.get('to_column')),
+                    relationship.get('constraint_name'),
+                    _value(relationship.get('confidence')),
+                    json.dumps(details, default=str) if details else None,
+                ))
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM relationships WHERE kind = ?", (kind,))
+            conn.executemany("INSERT INTO relationships VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def write_stats(self, all_stats):
+        rows = [(schema, entry['table'], entry.get('row_count'), entry.get('size'), entry.get('heap_size'),
+                 entry.get('index_size'), entry.get('toast_size'), entry.get('row_count_method'))
+                for schema, stats in all_stats.items() for entry in stats]
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM stats")
+            conn.executemany("INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def write_profiles(self, all_profiles):
+        rows = [(schema, table_name, column_name, profile['null_fraction'], profile['distinct_estimate'],
+                 _value(profile['min']), _value(profile['max']), profile['average_width'],
+                 json.dumps(profile['most_common_values'], default=str)
+                 if profile['most_common_values'] is not None else None,
+                 profile['source'])
+                for schema, tables in all_profiles.items()
+                for table_name, columns in tables.items()
+                for column_name, profile in columns.items()]
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM column_profiles")
+            conn.executemany("INSERT OR REPLACE INTO column_profiles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def write_graph(self, graph):
+        components = {table: component for component, tables in enumerate(graph['components']) for table in tables}
+        rows = [(table, components.get(table), position) for position, table in enumerate(graph['load_order'])]
+        cycles = [(cycle, table) for cycle, tables in enumerate(graph['cycles']) for table in tables]
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM graph_tables")
+            conn.execute("DELETE FROM graph_cycles")
+            conn.executemany("INSERT INTO graph_tables VALUES (?, ?, ?)", rows)
+            conn.executemany("INSERT INTO graph_cycles VALUES (?, ?)", cycles)
+
+    def write_index_health(self, all_findings):
+        rows = []
+        for schema, findings in all_findings.items():
+            for finding in findings:
+                details = {key: value for key, value in finding.items() if key not in INDEX_HEALTH_FIELDS}
+                rows.append((
+                    schema,
+                    finding['table'],
+                    finding['issue'],
+                    finding.get('index'),
+                    json.dumps(finding['columns'], default=str),
+                    finding.get('size'),
+                    finding.get('scans'),
+                    finding.get('duplicate_of', finding.get('covered_by', finding.get('constraint_name'))),
+                    json.dumps(details, default=str) if details else None,
+                ))
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM index_health")
+            conn.executemany("INSERT INTO index_health VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    @contextmanager
+    def _transaction(self):
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        try:
+            conn.executescript(SCHEMA)
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+
+class _Batch:
+    def __init__(self, conn, size):
+        self.conn = conn
+        self.size = size
+        self.pending = {}
+        self.count = 0
+
+    def add(self, sql, rows):
+        self.pending.setdefault(sql, []).extend(rows)
+        self.count += len(rows)
+        if self.count >= self.size:
+            self.flush()
+
+    def flush(self):
+        for sql, rows in self.pending.items():
+            self.conn.executemany(sql, rows)
+        self.pending = {}
+        self.count = 0
+
+
+def _value(value):
+    if value is None or isinstance(value, (int, float, str, bytes)):
+        return value
+    return str(value)
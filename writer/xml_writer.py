@@ -0,0 +1,134 @@
+import numbers
+import re
+from collections.abc import Iterable
+from xml.dom.minidom import parseString
+
+SIMPLE_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_.\-]*\Z')
+
+
+class XMLStreamWriter:
+    def __init__(self, f, root='database'):
+        self.f = f
+        self.root = root
+        self.names = {}
+
+    def open(self):
+        self.f.write(f'<?xml version="1.0" encoding="UTF-8" ?><{self.root}>')
+
+    def close(self):
+        self.f.write(f'</{self.root}>')
+
+    def start(self, key):
+        name, attributes = self._element_name(key)
+        self.f.write(f'<{name}{attributes}>')
+        return name
+
+    def end(self, name):
+        self.f.write(f'</{name}>')
+
+    def write_document(self, data):
+        self.open()
+        if isinstance(data, dict):
+            self.write_dict(data)
+        else:
+            self.write_list(data)
+        self.close()
+
+    def write_tables(self, schemas, tables):
+        self.open()
+        schemas = list(schemas)
+        position, current = -1, None
+        for schema, table_name, table_data in tables:
+            while position < 0 or schemas[position] != schema:
+                if current is not None:
+                    self.end(current)
+                position += 1
+                if position >= len(schemas):
+                    raise ValueError("Tables must be written in schema order")
+                current = self.start(schemas[position])
+            self.write_dict({table_name: table_data})
+        if current is not None:
+            self.end(current)
+        for schema in schemas[position + 1:]:
+            self.end(self.start(schema))
+        self.close()
+
+    def write_dict(self, data):
+        for key, value in data.items():
+            name = self.start(key)
+            if type(value) == bool:
+                self.f.write(str(value).lower())
+            elif isinstance(value, (numbers.Number, str)):
+                self.f.write(_escape(value))
+            elif hasattr(value, 'isoformat'):
+                self.f.write(_escape(value.isoformat()))
+            elif isinstance(value, dict):
+                self.write_dict(value)
+            elif isinstance(value, Iterable):
+                self.write_list(value)
+            elif value is not None:
+                raise TypeError(f"Unsupported data type: {value} ({type(value).__name__})")
+            self.end(name)
+
+    def write_list(self, items):
+        write = self.f.write
+        for item in items:
+            if isinstance(item, (numbers.Number, str)):
+                write(f'<item>{_escape(item)}</item>')
+            elif hasattr(item, 'isoformat'):
+                write(f'<item>{_escape(item.isoformat())}</item>')
+            elif isinstance(item, dict):
+                write('<item>')
+                self.write_dict(item)
+                write('</item>')
+            elif isinstance(item, Iterable):
+                write('<item >')
+                self.write_list(item)
+                write('</item>')
+            elif item is None:
+                write('<item></item>')
+            else:
+                raise TypeError(f"Unsupported data type: {item} ({type(item).__name__})")
+
+    def _element_name(self, key):
+        try:
+            return self.names[key]
+        except KeyError:
+            pass
+        except TypeError:
+            return _valid_element_name(key)
+        self.names[key] = _valid_element_name(key)
+        return self.names[key]
+
+
+def _escape(value):
+    if not isinstance(value, str):
+        return str(value)
+    return (value.replace('&', '&amp;').replace('"', '&quot;').replace('\'', '&apos;')
+            .replace('<', '&lt;').replace('>', '&gt;'))
+
+
+def _is_valid_name(name):
+    name = str(name)
+    if SIMPLE_NAME.match(name):
+        return True
+    try:
+        parseString(f'<?xml version="1.0" encoding="UTF-8" ?><{name}>foo</{name}>')
+        return True
+    except Exception:
+        return False
+
+
+def _valid_element_name(key):
+    key = _escape(key) if isinstance(key, str) else key
+    if _is_valid_name(key):
+        return str(key), ''
+    if str(key).isdigit():
+        return f'n{key}', ''
+    try:
+        return f'n{float(str(key))}', ''
+    except ValueError:
+        pass
+    if _is_valid_name(key.replace(' ', '_')):
+        return key.replace(' ', '_'), ''
+    return 'key', f' name="{key}"'